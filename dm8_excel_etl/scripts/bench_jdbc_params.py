@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""JDBC parameter benchmark: legacy per-value `_as_jdbc_param` vs the cached `JdbcAdapter`.
+
+The legacy path imports jpype, checks the JVM and looks up the Java class for every
+date/datetime value, then formats a string for `valueOf` to parse; the adapter resolves the
+classes once, picks converters per column and builds temporals from epoch millis.
+
+Runs without a JVM (both paths produce strings) and, when JPype1 is installed, again with a
+JVM started (`--jvm`, uses JPype's default JVM; no driver jar needed).
+
+    PYTHONPATH=src python scripts/bench_jdbc_params.py --rows 100000 [--jvm]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from etl.db import Db, adapt_param_rows  # noqa: E402
+
+COLUMN_TYPES = ["str", "int", "decimal", "date", "datetime", "str", "date", "datetime"]
+
+
+def _legacy_as_jdbc_param(value):
+    # Frozen copy of the pre-adapter `_as_jdbc_param`.
+    if isinstance(value, dt.datetime):
+        s = value.strftime("%Y-%m-%d %H:%M:%S")
+        if value.microsecond:
+            s = f"{s}.{value.microsecond:06d}"
+        try:
+            import jpype  # type: ignore[import-not-found]
+
+            if not jpype.isJVMStarted():
+                return s
+            Timestamp = jpype.JClass("java.sql.Timestamp")
+            return Timestamp.valueOf(s)
+        except Exception:
+            return s
+    if isinstance(value, dt.date):
+        s = value.isoformat()
+        try:
+            import jpype  # type: ignore[import-not-found]
+
+            if not jpype.isJVMStarted():
+                return s
+            Date = jpype.JClass("java.sql.Date")
+            return Date.valueOf(s)
+        except Exception:
+            return s
+    return value
+
+
+def _rows(n: int) -> list[tuple]:
+    base = dt.datetime(2024, 1, 1, 8, 30)
+    out = []
+    for i in range(n):
+        t = base + dt.timedelta(minutes=i)
+        out.append((f"po_{i}", i, f"{i / 100:.2f}", t.date(), t, "x", None, t.replace(microsecond=i % 1000)))
+    return out
+
+
+def _timed(label: str, fn, rows) -> float:
+    started = time.perf_counter()
+    fn(rows)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} rows={len(rows):<8} {elapsed:8.3f}s  {len(rows) / elapsed:12,.0f} rows/s")
+    return elapsed
+
+
+def _compare(rows: list[tuple]) -> None:
+    db = Db(conn=None, mode="jdbc", autocommit=False)
+    legacy = _timed("legacy per-value", lambda rs: [tuple(_legacy_as_jdbc_param(v) for v in r) for r in rs], rows)
+    adapter = _timed("adapter per-column", lambda rs: adapt_param_rows(db, rs, COLUMN_TYPES), rows)
+    print(f"speedup: {legacy / adapter:.2f}x")
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--jvm", action="store_true", help="Also run with a JVM started (needs JPype1)")
+    args = p.parse_args(argv)
+
+    rows = _rows(args.rows)
+    print("-- no JVM")
+    _compare(rows)
+    if args.jvm:
+        try:
+            import jpype  # type: ignore[import-not-found]
+        except ImportError:
+            print("JPype1 not installed; skipping the JVM run", file=sys.stderr)
+            return 0
+        if not jpype.isJVMStarted():
+            jpype.startJVM()
+        print("-- JVM started")
+        _compare(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Load benchmark: `load_job_file` end to end against a fake DB with simulated round-trips.
+
+The fake cursor sleeps `--insert-ms` per executemany batch plus `--row-us` per row (like a
+network round-trip that releases the GIL), so serial mode costs parse + insert while
+`--pipeline-depth N` should approach max(parse, insert). `--batch-size auto` shows where the
+adaptive batch size settles for that cost model.
+
+    PYTHONPATH=src python scripts/bench_load.py --rows 50000 --insert-ms 20 --pipeline-depth 4
+    PYTHONPATH=src python scripts/bench_load.py --rows 50000 --batch-size auto --row-us 20
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from bench_parse import write_csv  # noqa: E402
+from etl.config import PathsConfig, load_config  # noqa: E402
+from etl.db import Db  # noqa: E402
+from etl.loader import load_job_file  # noqa: E402
+
+
+class _SleepyCursor:
+    def __init__(self, delay: float, per_row: float = 0.0) -> None:
+        self.delay = delay
+        self.per_row = per_row
+        self.rows = 0
+        self.batches = 0
+
+    def executemany(self, sql, rows) -> None:
+        time.sleep(self.delay + self.per_row * len(rows))
+        self.rows += len(rows)
+        self.batches += 1
+
+    def execute(self, sql, params=None) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _SleepyConn:
+    def __init__(self, delay: float, per_row: float = 0.0) -> None:
+        self.cur = _SleepyCursor(delay, per_row)
+
+    def cursor(self) -> _SleepyCursor:
+        return self.cur
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--config", default=str(ROOT / "config/app.yaml"))
+    p.add_argument("--table", default="ods_po_exec")
+    p.add_argument("--rows", type=int, default=50_000)
+    p.add_argument("--batch-size", default="2000", help="Rows per executemany, or `auto`")
+    p.add_argument("--insert-ms", type=float, default=20.0, help="Simulated latency per executemany batch")
+    p.add_argument("--row-us", type=float, default=0.0, help="Simulated cost per inserted row")
+    p.add_argument("--pipeline-depth", type=int, default=4)
+    p.add_argument("--columnar", action="store_true")
+    args = p.parse_args(argv)
+    batch_size = args.batch_size if args.batch_size == "auto" else int(args.batch_size)
+
+    cfg = load_config(args.config)
+    job = next((j for j in cfg.jobs if j.name == args.table), None)
+    if job is None:
+        print(f"table not found in config: {args.table}", file=sys.stderr)
+        return 2
+    job = replace(job, mode="append", excel=replace(job.excel, pattern="*.csv", columnar=args.columnar))
+
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        source = root / f"{job.table}.csv"
+        write_csv(source, job.columns, args.rows)
+        paths = PathsConfig(root=root, inbox=root / "inbox", archive=root / "archive", badrows=root / "badrows", logs=root / "logs")
+        paths.inbox.mkdir()
+        cfg = replace(cfg, paths=paths)
+        print(f"table={job.table} rows={args.rows} batch_size={batch_size}")
+
+        timings = {}
+        for depth in (0, args.pipeline_depth):
+            f = paths.inbox / source.name
+            shutil.copy(source, f)
+            conn = _SleepyConn(args.insert_ms / 1000, args.row_us / 1e6)
+            started = time.perf_counter()
+            r = load_job_file(
+                Db(conn=conn, mode="odbc", autocommit=False),
+                cfg,
+                job,
+                f,
+                batch_id="bench",
+                batch_size=batch_size,
+                pipeline_depth=depth,
+            )
+            timings[depth] = time.perf_counter() - started
+            label = "serial" if depth == 0 else f"pipelined depth={depth}"
+            print(
+                f"{label:<20} ok={r.ok_rows:<8} inserted={conn.cur.rows:<8} "
+                f"batches={conn.cur.batches:<5} {timings[depth]:8.3f}s"
+            )
+        print(f"speedup: {timings[0] / timings[args.pipeline_depth]:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,6 @@
 -- ODS/MDM -> ADS 刷新脚本（来源：docs/erp/erp_ads.sql）
 -- 建议：全量导入场景下，ADS 采用 truncate + rebuild
+-- `-- @commit` 行划分提交段（run-sql --sql-commit section 时每个大屏一个事务）
 
 -- ============================================================================
 -- 大屏 1：预算与采购监控
@@ -321,6 +322,8 @@ FROM (
 ) e
 WHERE e.amt IS NOT NULL AND e.amt > 0;
 
+-- @commit
+
 -- ============================================================================
 -- 大屏 2：库存与出入库
 -- ============================================================================
@@ -559,6 +562,8 @@ FROM (
 ) x
 WHERE x.rank_no <= 100;
 
+-- @commit
+
 -- ============================================================================
 -- 大屏 3：物料全链路追踪
 -- ============================================================================
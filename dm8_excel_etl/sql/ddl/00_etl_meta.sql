@@ -8,6 +8,9 @@ CREATE TABLE etl_batch_log (
   total_rows   NUMBER(18,0),
   ok_rows      NUMBER(18,0),
   bad_rows     NUMBER(18,0),
+  inserted_rows  NUMBER(18,0),
+  updated_rows   NUMBER(18,0),
+  unchanged_rows NUMBER(18,0),
   started_at   TIMESTAMP,
   finished_at  TIMESTAMP,
   status       VARCHAR2(20),
@@ -16,3 +19,50 @@ CREATE TABLE etl_batch_log (
 );
 
 COMMENT ON TABLE etl_batch_log IS 'ETL-批次日志（每次导入/构建的记录）';
+
+-- 已有 etl_batch_log 的库升级（mode: upsert 的插入/更新/未变化行数）：
+-- ALTER TABLE etl_batch_log ADD inserted_rows NUMBER(18,0);
+-- ALTER TABLE etl_batch_log ADD updated_rows NUMBER(18,0);
+-- ALTER TABLE etl_batch_log ADD unchanged_rows NUMBER(18,0);
+
+-- 已导入文件清单（manifest.meta_table: true 时写入；本地 data/state/manifest.sqlite 为准）
+CREATE TABLE etl_file_manifest (
+  job_name     VARCHAR2(200) NOT NULL,
+  sha256       CHAR(64)      NOT NULL,
+  batch_id     VARCHAR2(64)  NOT NULL,
+  source_file  VARCHAR2(512) NOT NULL,
+  file_size    NUMBER(18,0),
+  loaded_at    TIMESTAMP,
+  CONSTRAINT pk_etl_file_manifest PRIMARY KEY (job_name, sha256, batch_id)
+);
+
+COMMENT ON TABLE etl_file_manifest IS 'ETL-已导入文件清单（按内容 SHA-256 去重）';
+
+-- 分段提交检查点（db.commit_every > 0 时随每次提交写入；文件导入完成后删除；load-ods --resume 以本地 data/state/checkpoints.json 为准）
+CREATE TABLE etl_load_checkpoint (
+  job_name     VARCHAR2(200) NOT NULL,
+  sha256       CHAR(64)      NOT NULL,
+  table_name   VARCHAR2(128) NOT NULL,
+  source_file  VARCHAR2(512) NOT NULL,
+  batch_id     VARCHAR2(64)  NOT NULL,
+  last_row     NUMBER(18,0)  NOT NULL,
+  total_rows   NUMBER(18,0),
+  ok_rows      NUMBER(18,0),
+  bad_rows     NUMBER(18,0),
+  updated_at   TIMESTAMP,
+  CONSTRAINT pk_etl_load_checkpoint PRIMARY KEY (job_name, sha256)
+);
+
+COMMENT ON TABLE etl_load_checkpoint IS 'ETL-分段提交检查点（已提交到的源文件行号）';
+
+-- 增量 MDM 构建水位（sql/mdm/01_build_mdm.sql 中的 {{watermark:<ODS 表>}}；构建提交成功后才推进）
+CREATE TABLE etl_mdm_watermark (
+  script_name  VARCHAR2(200) NOT NULL,
+  source_table VARCHAR2(128) NOT NULL,
+  watermark    TIMESTAMP     NOT NULL,
+  batch_id     VARCHAR2(64),
+  updated_at   TIMESTAMP,
+  CONSTRAINT pk_etl_mdm_watermark PRIMARY KEY (script_name, source_table)
+);
+
+COMMENT ON TABLE etl_mdm_watermark IS 'ETL-MDM 增量构建水位（各 ODS 来源已处理到的 etl_time）';
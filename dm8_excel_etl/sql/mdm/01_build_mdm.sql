@@ -1,4 +1,8 @@
 -- ODS -> MDM 构建脚本（来源：docs/erp/erp_mdm.sql）
+-- 增量构建：/*{{watermark:<ODS 表>}}*/ TIMESTAMP '1900-01-01 00:00:00' 由 run-sql/build-mdm 整体替换为该表上次构建已读到的
+-- etl_time（etl_mdm_watermark；没有记录时为 1900-01-01，即读全部行），构建提交成功后推进到构建开始时的 MAX(etl_time)。
+-- 须在 load-ods 结束后执行：与之并行时，尚未提交的导入中 etl_time 早于该 MAX 的行以后不会再被读到。
+-- 用 disql 等工具直接执行本文件时占位符只是注释，按默认时间读全部行（全量构建，不推进水位）
 
 -- 1) 项目维表：汇总多个 ODS 来源
 -- 说明：当前 ERP 导出为“中间表”，项目编码/名称在多张 ODS 表中已包含，因此不依赖 ods_proj_base_info。
@@ -16,9 +20,11 @@ USING (
       parent_proj_code,
       parent_proj_name
     FROM ods_proj_budget_exec_dtl
+    WHERE etl_time > /*{{watermark:ods_proj_budget_exec_dtl}}*/ TIMESTAMP '1900-01-01 00:00:00'
     UNION ALL
     SELECT proj_code, proj_name, NULL AS parent_proj_code, NULL AS parent_proj_name
     FROM ods_po_exec
+    WHERE etl_time > /*{{watermark:ods_po_exec}}*/ TIMESTAMP '1900-01-01 00:00:00'
     UNION ALL
     SELECT
       proj_code AS proj_code,
@@ -26,6 +32,7 @@ USING (
       NULL AS parent_proj_code,
       NULL AS parent_proj_name
     FROM ods_stock_io_flow
+    WHERE etl_time > /*{{watermark:ods_stock_io_flow}}*/ TIMESTAMP '1900-01-01 00:00:00'
     UNION ALL
     SELECT
       proj_code AS proj_code,
@@ -33,6 +40,7 @@ USING (
       NULL AS parent_proj_code,
       NULL AS parent_proj_name
     FROM ods_stock_onhand
+    WHERE etl_time > /*{{watermark:ods_stock_onhand}}*/ TIMESTAMP '1900-01-01 00:00:00'
   ) x
   WHERE proj_code IS NOT NULL
   GROUP BY proj_code
@@ -74,6 +82,7 @@ USING (
   FROM (
     SELECT item_code, item_name, NULL AS item_class, spec, model, uom AS base_uom, NULL AS enable_status
     FROM ods_po_exec
+    WHERE etl_time > /*{{watermark:ods_po_exec}}*/ TIMESTAMP '1900-01-01 00:00:00'
     UNION ALL
     SELECT
       item_code,
@@ -84,6 +93,7 @@ USING (
       COALESCE(main_uom, uom) AS base_uom,
       NULL AS enable_status
     FROM ods_stock_io_flow
+    WHERE etl_time > /*{{watermark:ods_stock_io_flow}}*/ TIMESTAMP '1900-01-01 00:00:00'
     UNION ALL
     SELECT
       item_code,
@@ -94,6 +104,7 @@ USING (
       uom AS base_uom,
       NULL AS enable_status
     FROM ods_stock_onhand
+    WHERE etl_time > /*{{watermark:ods_stock_onhand}}*/ TIMESTAMP '1900-01-01 00:00:00'
   ) x
   WHERE item_code IS NOT NULL
   GROUP BY item_code
@@ -124,6 +135,7 @@ USING (
     MAX(proj_budget_cat_name) AS cat_name
   FROM ods_proj_budget_exec_dtl
   WHERE proj_budget_cat_code IS NOT NULL
+    AND etl_time > /*{{watermark:ods_proj_budget_exec_dtl}}*/ TIMESTAMP '1900-01-01 00:00:00'
   GROUP BY proj_budget_cat_code
 ) s
 ON (t.cat_code = s.cat_code)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import datetime as dt
+import math
+import statistics
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Sequence
+
+from .state import read_json_state, update_json_state
+
+# `batch_size: auto`: executemany batch size tuned from measured insert throughput.
+#
+# The controller is AIMD-like: it doubles the batch while rows/s keeps up (slow start), then
+# grows it by a fixed step and halves it when throughput clearly drops. Samples are grouped in
+# quarter-octave size buckets and each bucket is scored by the median of its last few rates, so
+# one lucky batch (a cache hit, an idle server) can't win on its own; once some bucket has been
+# measured twice, single-sample buckets no longer compete. The best bucket is what a table
+# "settles" on; it is stored per table in a small JSON file so the next run starts there
+# instead of probing from the minimum again.
+
+AUTO = "auto"
+
+_BUCKETS_PER_OCTAVE = 4
+_BUCKET_SAMPLES = 5
+
+
+def _bucket(rows: int) -> int:
+    return round(math.log2(rows) * _BUCKETS_PER_OCTAVE)
+
+
+class AdaptiveBatchSize:
+    def __init__(
+        self,
+        min_size: int,
+        max_size: int,
+        start: int | None = None,
+        max_bytes: int | None = None,
+        tolerance: float = 0.1,
+    ) -> None:
+        if min_size < 1 or max_size < min_size:
+            raise ValueError("need 1 <= min_size <= max_size")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.tolerance = tolerance
+        # a remembered size is already near the optimum: probe additively from there
+        self._slow_start = start is None
+        self.step = max(1, min_size)
+        self.size = self._clamp(start if start is not None else min_size)
+        self.samples = 0
+        self.best_size = self.size
+        self.best_rate = 0.0
+        self._last_rate: float | None = None
+        # bucket -> last (rows, rows/s) samples
+        self._buckets: dict[int, deque[tuple[int, float]]] = {}
+        self._lock = threading.Lock()
+
+    def _clamp(self, n: int) -> int:
+        return max(self.min_size, min(self.max_size, int(n)))
+
+    def limit_memory(self, sample_rows: Sequence[tuple[Any, ...]], batches_in_flight: int = 1) -> None:
+        """Cap `max_size` so `batches_in_flight` batches of rows like `sample_rows` fit in `max_bytes`."""
+        if not self.max_bytes or not sample_rows:
+            return
+        row_bytes = sum(sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r) for r in sample_rows) / len(sample_rows)
+        cap = int(self.max_bytes // (row_bytes * max(1, batches_in_flight)))
+        with self._lock:
+            self.max_size = max(self.min_size, min(self.max_size, cap))
+            self.size = self._clamp(self.size)
+
+    def observe(self, rows: int, seconds: float) -> None:
+        """Feed one executemany call (`rows` sent in `seconds`) and pick the next size."""
+        if rows < self.min_size or seconds <= 0:
+            return  # tail batches say little about throughput
+        rate = rows / seconds
+        with self._lock:
+            self.samples += 1
+            self._buckets.setdefault(_bucket(rows), deque(maxlen=_BUCKET_SAMPLES)).append((rows, rate))
+            self._pick_best()
+            prev = self._last_rate
+            self._last_rate = rate
+            if prev is None or rate >= prev * (1 - self.tolerance):
+                nxt = rows * 2 if self._slow_start else rows + self.step
+            else:
+                self._slow_start = False
+                nxt = rows // 2
+            self.size = self._clamp(nxt)
+
+    def _pick_best(self) -> None:
+        need = 2 if any(len(b) >= 2 for b in self._buckets.values()) else 1
+        rates = {key: statistics.median(r for _, r in b) for key, b in self._buckets.items() if len(b) >= need}
+        key = max(rates, key=rates.__getitem__)
+        self.best_rate = rates[key]
+        self.best_size = statistics.median_low(n for n, _ in self._buckets[key])
+
+    @property
+    def settled(self) -> int:
+        return self._clamp(self.best_size)
+
+
+def load_batch_sizes(path: Path) -> dict[str, int]:
+    out: dict[str, int] = {}
+    for table, entry in read_json_state(path).items():
+        if isinstance(entry, dict) and isinstance(entry.get("batch_size"), int):
+            out[table] = entry["batch_size"]
+    return out
+
+
+def save_batch_size(path: Path, table: str, batch_size: int, rows_per_sec: float) -> None:
+    with update_json_state(path) as raw:
+        raw[table] = {
+            "batch_size": batch_size,
+            "rows_per_sec": round(rows_per_sec, 1),
+            "updated_at": dt.datetime.now().isoformat(timespec="seconds"),
+        }
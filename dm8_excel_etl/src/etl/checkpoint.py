@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .state import read_json_state, update_json_state
+
+# `commit_every`: a file is committed in chunks; after each commit the position is recorded
+# per (job, file SHA-256) in data/state/checkpoints.json (and etl_load_checkpoint), so
+# `load-ods --resume` can skip the rows already committed when the same file is loaded again.
+
+@dataclass(frozen=True)
+class Checkpoint:
+    sha256: str
+    source_file: str
+    batch_id: str
+    row_number: int  # last source row covered by the commit
+    total_rows: int
+    ok_rows: int
+    bad_rows: int
+
+
+def load_checkpoint(path: Path, job: str, sha256: str) -> Checkpoint | None:
+    entry = read_json_state(path).get(job, {}).get(sha256)
+    if not isinstance(entry, dict):
+        return None
+    try:
+        return Checkpoint(
+            sha256=sha256,
+            source_file=str(entry["source_file"]),
+            batch_id=str(entry["batch_id"]),
+            row_number=int(entry["row_number"]),
+            total_rows=int(entry["total_rows"]),
+            ok_rows=int(entry["ok_rows"]),
+            bad_rows=int(entry["bad_rows"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def save_checkpoint(path: Path, job: str, cp: Checkpoint) -> None:
+    entry = asdict(cp)
+    del entry["sha256"]
+    entry["updated_at"] = dt.datetime.now().isoformat(timespec="seconds")
+    with update_json_state(path) as raw:
+        jobs = raw.get(job)
+        raw[job] = {**(jobs if isinstance(jobs, dict) else {}), cp.sha256: entry}
+
+
+def clear_checkpoint(path: Path, job: str, sha256: str) -> None:
+    with update_json_state(path) as raw:
+        jobs = raw.get(job)
+        if isinstance(jobs, dict) and sha256 in jobs:
+            del jobs[sha256]
+            if not jobs:
+                del raw[job]
@@ -5,14 +5,32 @@ import datetime as dt
 import logging
 import sys
 import uuid
+from dataclasses import replace
 from pathlib import Path
 
 from . import __version__
-from .config import ConfigError, load_config
-from .db import DbError, connect
-from .loader import load_ods
-from .meta import try_insert_batch_log
-from .sql_runner import iter_sql_files, run_sql_file
+from .config import AppConfig, ConfigError, load_config, parse_sql_commit
+from .db import ConnectionPool, Db, DbError, connect
+from .loader import LoadError, load_ods
+from .meta import (
+    try_advance_watermarks,
+    try_batch_tables,
+    try_insert_batch_log,
+    try_latest_load_batch,
+    try_read_watermarks,
+    try_source_high_marks,
+)
+from .sql_runner import (
+    iter_sql_files,
+    plan_incremental,
+    read_sql_statements,
+    run_sql_file,
+    run_sql_parallel,
+    watermark_sources,
+)
+
+MDM_SQL = Path("sql/mdm/01_build_mdm.sql")
+ADS_SQL = Path("sql/ads/01_refresh_ads.sql")
 
 
 def _setup_logging(log_dir: Path, verbose: bool, batch_id: str) -> logging.Logger:
@@ -47,9 +65,13 @@ def _cmd_load_ods(args: argparse.Namespace) -> int:
     except ConfigError as e:
         print(f"Config error: {e}", file=sys.stderr)
         return 2
+    if args.force:
+        # load files again even if the manifest says their content was loaded
+        cfg = replace(cfg, manifest=replace(cfg.manifest, enabled=False))
 
     batch_id = args.batch_id or dt_batch_id()
     logger = _setup_logging(cfg.paths.logs, verbose=args.verbose, batch_id=batch_id)
+    failed = False
     try:
         results = load_ods(
             config=cfg,
@@ -58,7 +80,17 @@ def _cmd_load_ods(args: argparse.Namespace) -> int:
             dry_run=args.dry_run,
             batch_id=batch_id,
             logger=logger,
+            pipeline_depth=(args.pipeline_depth if args.pipeline_depth is not None else cfg.odbc.pipeline_depth),
+            workers=(args.jobs or cfg.odbc.pool_size),
+            parse_workers=args.parse_workers,
+            commit_every=(args.commit_every if args.commit_every is not None else cfg.odbc.commit_every),
+            resume=args.resume,
         )
+    except LoadError as e:
+        # parallel run: report what loaded, fail the command for the rest
+        results = e.results
+        failed = True
+        logger.error("load-ods failed jobs=%s", ",".join(e.failures))
     except Exception as e:
         logger.error("load-ods failed: %s", e)
         return 1
@@ -74,7 +106,16 @@ def _cmd_load_ods(args: argparse.Namespace) -> int:
             r.bad_rows,
             r.badrows_csv,
         )
-    return 0
+        if r.inserted_rows is not None:
+            logger.info(
+                "done table=%s inserted=%s updated=%s unchanged=%s deleted=%s",
+                r.table,
+                r.inserted_rows,
+                r.updated_rows,
+                r.unchanged_rows,
+                r.deleted_rows,
+            )
+    return 1 if failed else 0
 
 
 def _cmd_run_sql(args: argparse.Namespace) -> int:
@@ -106,12 +147,32 @@ def _cmd_run_sql(args: argparse.Namespace) -> int:
             logger.error("no sql files specified (use --path or --dir)")
             return 2
 
+        only = _incremental_statements(cfg, db, files, args, logger) if getattr(args, "incremental", False) else None
+
+        sql_commit = args.sql_commit or cfg.odbc.sql_commit
+        truncate_as_delete = getattr(args, "truncate_as_delete", False) or cfg.odbc.sql_truncate_as_delete
+        if (args.parallel or 1) > 1:
+            if sql_commit != "statement":
+                logger.warning("run-sql --parallel commits each statement on its own; sql_commit=%s ignored", sql_commit)
+            return _run_sql_parallel(cfg, db, files, args, batch_id, logger, only)
+
         for p in files:
             try:
                 started_at = dt.datetime.now()
-                r = run_sql_file(db, p)
+                stored, highs = _watermarks(db, p, logger)
+                r = run_sql_file(
+                    db,
+                    p,
+                    commit=sql_commit,
+                    only=None if only is None else only[p],
+                    watermarks=stored,
+                    truncate_as_delete=truncate_as_delete,
+                    logger=logger,
+                )
+                if highs and only is None:
+                    try_advance_watermarks(db, script_name=p.name, watermarks=highs, batch_id=batch_id, logger=logger)
                 finished_at = dt.datetime.now()
-                logger.info("run-sql ok file=%s statements=%s", r.path, r.statements)
+                logger.info("run-sql ok file=%s statements=%s commits=%s", r.path, r.statements, r.commits)
                 try_insert_batch_log(
                     db,
                     batch_id=batch_id,
@@ -152,10 +213,123 @@ def _cmd_run_sql(args: argparse.Namespace) -> int:
         db.close()
 
 
+def _run_sql_parallel(
+    cfg: AppConfig,
+    db: Db,
+    files: list[Path],
+    args: argparse.Namespace,
+    batch_id: str,
+    logger: logging.Logger,
+    only: dict[Path, set[int]] | None = None,
+) -> int:
+    # all files form one dependency graph; the batch log still gets one row per file
+    started_at = dt.datetime.now()
+    marks = {p: _watermarks(db, p, logger) for p in files}
+    statements = read_sql_statements(files, watermarks={p: stored for p, (stored, _) in marks.items()})
+    if only is not None:
+        statements = [s for s in statements if s.number in only[s.path]]
+    pool = ConnectionPool(cfg.odbc, size=args.parallel)
+    try:
+        results = run_sql_parallel(
+            pool,
+            statements,
+            workers=args.parallel,
+            logger=logger,
+            continue_on_error=args.continue_on_error,
+        )
+    finally:
+        pool.close()
+    finished_at = dt.datetime.now()
+
+    failed = False
+    for p in files:
+        mine = [r for r in results if r.statement.path == p]
+        ok = sum(1 for r in mine if r.status == "SUCCESS")
+        errors = [f"statement {r.statement.number}: {r.error}" for r in mine if r.status == "FAILED"]
+        skipped = sum(1 for r in mine if r.status == "SKIPPED")
+        if errors or skipped:
+            failed = True
+            logger.error("run-sql failed file=%s ok=%s failed=%s skipped=%s", p, ok, len(errors), skipped)
+        else:
+            logger.info("run-sql ok file=%s statements=%s", p, ok)
+            highs = marks[p][1]
+            if highs and only is None:
+                try_advance_watermarks(db, script_name=p.name, watermarks=highs, batch_id=batch_id, logger=logger)
+        try_insert_batch_log(
+            db,
+            batch_id=batch_id,
+            job_name=str(getattr(args, "cmd", "run-sql")),
+            table_name="(sql)",
+            source_file=p,
+            total_rows=len(mine),
+            ok_rows=ok,
+            bad_rows=len(mine) - ok,
+            started_at=started_at,
+            finished_at=finished_at,
+            status="FAILED" if errors or skipped else "SUCCESS",
+            message="; ".join(errors) or (f"{skipped} statement(s) skipped" if skipped else None),
+            logger=logger,
+        )
+    return 1 if failed else 0
+
+
+def _watermarks(db: Db, p: Path, logger: logging.Logger) -> tuple[dict[str, dt.datetime], dict[str, dt.datetime]]:
+    """({{watermark:...}} values to render, watermarks to store once the file committed)."""
+    sources = watermark_sources(p.read_text(encoding="utf-8")) if p.is_file() else []
+    if not sources:
+        return {}, {}
+    stored = try_read_watermarks(db, script_name=p.name, logger=logger)
+    # taken before the run: rows loaded meanwhile are read (again) by the next build
+    highs = try_source_high_marks(db, sources=sources, logger=logger)
+    for source in sources:
+        logger.info(
+            "watermark file=%s source=%s from=%s to=%s",
+            p.name,
+            source,
+            stored.get(source, "(all rows)"),
+            highs.get(source, "(unchanged)"),
+        )
+    return stored, {s: v for s, v in highs.items() if s not in stored or v > stored[s]}
+
+
+def _incremental_statements(
+    cfg: AppConfig,
+    db: Db,
+    files: list[Path],
+    args: argparse.Namespace,
+    logger: logging.Logger,
+) -> dict[Path, set[int]] | None:
+    """Numbers of the statements per file that refresh tables fed by the load batch; None = run all."""
+    cmd = str(getattr(args, "cmd", "run-sql"))
+    source_batch = args.batch_id or try_latest_load_batch(db, logger=logger)
+    changed = try_batch_tables(db, batch_id=source_batch, logger=logger) if source_batch else None
+    if changed is None:
+        logger.warning("%s --incremental: no load batch found in etl_batch_log, refreshing everything", cmd)
+        return None
+
+    # ADS reads MDM tables: carry ODS changes through the MDM build script
+    mdm = (cfg.paths.root / MDM_SQL).resolve()
+    upstream = read_sql_statements([mdm]) if mdm.is_file() and mdm not in files else []
+    run, skipped = plan_incremental(read_sql_statements(files), changed, upstream)
+    logger.info("%s incremental batch=%s changed=%s", cmd, source_batch, ",".join(sorted(changed)) or "-")
+    for table, sources in sorted(skipped.items()):
+        logger.info(
+            "%s skip table=%s: sources %s not loaded in batch %s",
+            cmd,
+            table,
+            ",".join(sorted(sources)) or "(none)",
+            source_batch,
+        )
+    only: dict[Path, set[int]] = {p: set() for p in files}
+    for s in run:
+        only[s.path].add(s.number)
+    return only
+
+
 def _cmd_build_mdm(args: argparse.Namespace) -> int:
     args = argparse.Namespace(**vars(args))
     if not args.sql:
-        args.path = [str(Path("sql/mdm/01_build_mdm.sql"))]
+        args.path = [str(MDM_SQL)]
     else:
         args.path = [args.sql]
     args.dir = None
@@ -166,7 +340,7 @@ def _cmd_build_mdm(args: argparse.Namespace) -> int:
 def _cmd_build_ads(args: argparse.Namespace) -> int:
     args = argparse.Namespace(**vars(args))
     if not args.sql:
-        args.path = [str(Path("sql/ads/01_refresh_ads.sql"))]
+        args.path = [str(ADS_SQL)]
     else:
         args.path = [args.sql]
     args.dir = None
@@ -174,6 +348,22 @@ def _cmd_build_ads(args: argparse.Namespace) -> int:
     return _cmd_run_sql(args)
 
 
+def _batch_size_arg(value: str) -> int | str:
+    if value.strip().lower() == "auto":
+        return "auto"
+    n = int(value)
+    if n <= 0:
+        raise argparse.ArgumentTypeError("batch size must be > 0 or `auto`")
+    return n
+
+
+def _sql_commit_arg(value: str) -> int | str:
+    mode = parse_sql_commit(value)
+    if mode is None:
+        raise argparse.ArgumentTypeError("must be statement, file, section, or a number > 0")
+    return mode
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="dm8-etl")
     p.add_argument("--version", action="version", version=__version__)
@@ -183,9 +373,44 @@ def build_parser() -> argparse.ArgumentParser:
     load_p = sub.add_parser("load-ods", help="Load Excel files into ODS tables")
     load_p.add_argument("--config", default="config/app.yaml", help="Path to app.yaml")
     load_p.add_argument("--job", default=None, help="Only run a single job by name")
-    load_p.add_argument("--batch-size", type=int, default=None, help="executemany batch size (default from config)")
+    load_p.add_argument(
+        "--batch-size",
+        type=_batch_size_arg,
+        default=None,
+        help="executemany batch size, or `auto` to tune it from measured throughput (default from config)",
+    )
+    load_p.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=None,
+        help="Insert on a writer thread with up to N batches queued while parsing continues (0 = off; default from config)",
+    )
+    load_p.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Run up to N jobs in parallel, one DB connection each (default from config db.pool_size)",
+    )
+    load_p.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Parse a job's files in N worker processes (default from config excel.parse_workers)",
+    )
+    load_p.add_argument(
+        "--commit-every",
+        type=int,
+        default=None,
+        help="append/truncate: commit and checkpoint every N batches (0 = once per file; default from config)",
+    )
+    load_p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip rows a failed earlier load of the same file already committed (needs --commit-every)",
+    )
     load_p.add_argument("--batch-id", default=None, help="Optional batch id; default auto-generated")
     load_p.add_argument("--dry-run", action="store_true", help="Validate and parse only; do not write to DB")
+    load_p.add_argument("--force", action="store_true", help="Ignore the manifest: load files already loaded before")
     load_p.add_argument("-v", "--verbose", action="store_true", help="Verbose logs")
     load_p.set_defaults(func=_cmd_load_ods)
 
@@ -196,6 +421,23 @@ def build_parser() -> argparse.ArgumentParser:
     run_p.add_argument("--pattern", default="*.sql", help="Glob pattern when using --dir")
     run_p.add_argument("--continue-on-error", action="store_true", help="Keep going when a file fails")
     run_p.add_argument("--batch-id", default=None, help="Optional batch id; default auto-generated")
+    run_p.add_argument(
+        "--sql-commit",
+        type=_sql_commit_arg,
+        default=None,
+        help="Commit per statement, file, section (`-- @commit` lines) or every N statements (default from config)",
+    )
+    run_p.add_argument(
+        "--truncate-as-delete",
+        action="store_true",
+        help="With --sql-commit other than statement: run TRUNCATE TABLE as DELETE FROM so it rolls back with its unit",
+    )
+    run_p.add_argument(
+        "--parallel",
+        type=int,
+        default=None,
+        help="Run independent statements on up to N connections, ordered by the tables they read/write",
+    )
     run_p.add_argument("-v", "--verbose", action="store_true", help="Verbose logs")
     run_p.set_defaults(func=_cmd_run_sql)
 
@@ -204,6 +446,23 @@ def build_parser() -> argparse.ArgumentParser:
     mdm_p.add_argument("--sql", default=None, help="Override SQL file path")
     mdm_p.add_argument("--continue-on-error", action="store_true", help="Ignored (single file)")
     mdm_p.add_argument("--batch-id", default=None, help="Optional batch id; default auto-generated")
+    mdm_p.add_argument(
+        "--sql-commit",
+        type=_sql_commit_arg,
+        default=None,
+        help="Commit per statement, file, section (`-- @commit` lines) or every N statements (default from config)",
+    )
+    mdm_p.add_argument(
+        "--truncate-as-delete",
+        action="store_true",
+        help="With --sql-commit other than statement: run TRUNCATE TABLE as DELETE FROM so it rolls back with its unit",
+    )
+    mdm_p.add_argument(
+        "--parallel",
+        type=int,
+        default=None,
+        help="Run independent statements on up to N connections, ordered by the tables they read/write",
+    )
     mdm_p.add_argument("-v", "--verbose", action="store_true", help="Verbose logs")
     mdm_p.set_defaults(func=_cmd_build_mdm)
 
@@ -212,6 +471,28 @@ def build_parser() -> argparse.ArgumentParser:
     ads_p.add_argument("--sql", default=None, help="Override SQL file path")
     ads_p.add_argument("--continue-on-error", action="store_true", help="Ignored (single file)")
     ads_p.add_argument("--batch-id", default=None, help="Optional batch id; default auto-generated")
+    ads_p.add_argument(
+        "--sql-commit",
+        type=_sql_commit_arg,
+        default=None,
+        help="Commit per statement, file, section (`-- @commit` lines) or every N statements (default from config)",
+    )
+    ads_p.add_argument(
+        "--truncate-as-delete",
+        action="store_true",
+        help="With --sql-commit other than statement: run TRUNCATE TABLE as DELETE FROM so it rolls back with its unit",
+    )
+    ads_p.add_argument(
+        "--parallel",
+        type=int,
+        default=None,
+        help="Run independent statements on up to N connections, ordered by the tables they read/write",
+    )
+    ads_p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only refresh ADS tables fed by tables loaded in the batch (--batch-id, default the latest load)",
+    )
     ads_p.add_argument("-v", "--verbose", action="store_true", help="Verbose logs")
     ads_p.set_defaults(func=_cmd_build_ads)
 
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, Union
 
 import os
 import re
@@ -13,9 +13,13 @@ class ConfigError(ValueError):
     pass
 
 
-Mode = Literal["append", "truncate"]
+Mode = Literal["append", "truncate", "swap", "upsert"]
 ColumnType = Literal["str", "int", "float", "decimal", "date", "datetime", "bool"]
 DbMode = Literal["odbc", "jdbc", "auto"]
+XlsxEngine = Literal["openpyxl", "native"]
+Duplicates = Literal["skip", "archive"]
+BatchErrorMode = Literal["fail", "bisect"]
+SqlCommitMode = Union[Literal["statement", "file", "section"], int]
 
 
 @dataclass(frozen=True)
@@ -25,7 +29,22 @@ class OdbcConfig:
     pwd: str | None
     mode: DbMode = "odbc"
     autocommit: bool = False
-    batch_size: int = 1000
+    batch_size: int | Literal["auto"] = 1000
+    batch_size_min: int = 100
+    batch_size_max: int = 20000
+    batch_memory_mb: int = 64
+    pipeline_depth: int = 0
+    pool_size: int = 1
+    # append/truncate: commit (and checkpoint) every N batches instead of once per file; 0 = off
+    commit_every: int = 0
+    # a failed executemany: `fail` the file, or `bisect` it down to the rejected rows (-> badrows)
+    on_batch_error: BatchErrorMode = "fail"
+    # > 1: rebuild indexes after truncate loads with `CREATE INDEX ... PARALLEL N`
+    index_parallel: int = 0
+    # run-sql: commit per `statement`, per `file`, per `section` (`-- @commit` lines) or every N statements
+    sql_commit: SqlCommitMode = "statement"
+    # sql_commit != statement: run TRUNCATE TABLE as DELETE FROM so it rolls back with its unit
+    sql_truncate_as_delete: bool = False
     connection_string: str | None = None
     jdbc_url: str | None = None
     jdbc_driver: str | None = None
@@ -39,6 +58,7 @@ class PathsConfig:
     archive: Path
     badrows: Path
     logs: Path
+    state: Path | None = None  # small JSON state files (e.g. tuned batch sizes); default data/state
 
 
 @dataclass(frozen=True)
@@ -50,6 +70,10 @@ class ExcelConfig:
     csv_encoding: str = "utf-8-sig"
     csv_delimiter: str = ","
     csv_quotechar: str = '"'
+    csv_workers: int = 1
+    engine: XlsxEngine = "openpyxl"
+    columnar: bool = False
+    parse_workers: int = 1
 
 
 @dataclass(frozen=True)
@@ -70,6 +94,28 @@ class JobConfig:
     mode: Mode
     excel: ExcelConfig
     columns: list[ColumnMapping]
+    # business key (columns[].db) for `mode: upsert`
+    keys: tuple[str, ...] = ()
+    # upsert only: skip rows unchanged since the last load (row-hash store under paths.state)
+    delta: bool = False
+    # with `delta`: keys missing from the file (a full snapshot) are deleted from the table
+    delta_deletes: bool = False
+    # keys that must be unique within a file (e.g. mirroring a UNIQUE index); duplicates -> badrows
+    unique: tuple[tuple[str, ...], ...] = ()
+    # > 0: check `unique` with a Bloom filter sized for this many rows instead of an exact hash set
+    unique_bloom: int = 0
+    # truncate: drop non-unique secondary indexes before inserting and rebuild them afterwards
+    rebuild_indexes: bool = False
+
+
+@dataclass(frozen=True)
+class ManifestConfig:
+    # content-addressed record of loaded inbox files (data/state/manifest.sqlite)
+    enabled: bool = False
+    # what to do with a file whose content the job already loaded: leave it or move it to archive
+    duplicates: Duplicates = "archive"
+    # also write each loaded file to the etl_file_manifest table
+    meta_table: bool = False
 
 
 @dataclass(frozen=True)
@@ -77,6 +123,7 @@ class AppConfig:
     odbc: OdbcConfig
     paths: PathsConfig
     jobs: list[JobConfig]
+    manifest: ManifestConfig = ManifestConfig()
 
 
 def _require(mapping: dict[str, Any], key: str, ctx: str) -> Any:
@@ -101,6 +148,20 @@ def _as_bool(value: Any, default: bool = False) -> bool:
     raise ConfigError(f"Invalid boolean value: {value!r}")
 
 
+def parse_sql_commit(value: Any) -> SqlCommitMode | None:
+    """`statement`/`file`/`section` or a positive statement count; None if invalid."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value > 0 else None
+    v = str(value).strip().lower()
+    if v in {"statement", "file", "section"}:
+        return v  # type: ignore[return-value]
+    if v.isdigit() and int(v) > 0:
+        return int(v)
+    return None
+
+
 _ENV_VAR_PATTERN = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
 
 
@@ -185,6 +246,7 @@ def load_config(path: str | Path) -> AppConfig:
                 archive=(root / "data/archive").resolve(),
                 badrows=(root / "data/badrows").resolve(),
                 logs=(root / "logs").resolve(),
+                state=(root / "data/state").resolve(),
             )
         if not isinstance(root_raw, dict):
             raise ConfigError("`paths` must be a mapping")
@@ -195,11 +257,26 @@ def load_config(path: str | Path) -> AppConfig:
             archive=(root / str(_require(root_raw, "archive", "paths"))).resolve(),
             badrows=(root / str(_require(root_raw, "badrows", "paths"))).resolve(),
             logs=(root / str(_require(root_raw, "logs", "paths"))).resolve(),
+            state=(root / str(root_raw.get("state") or "data/state")).resolve(),
         )
 
-    def _parse_csv(csv_raw: Any | None, ctx: str) -> tuple[str, str, str]:
+    def _parse_manifest(manifest_raw: Any | None) -> ManifestConfig:
+        if manifest_raw is None:
+            return ManifestConfig()
+        if not isinstance(manifest_raw, dict):
+            raise ConfigError("`manifest` must be a mapping")
+        duplicates = str(manifest_raw.get("duplicates") or "archive")
+        if duplicates not in {"skip", "archive"}:
+            raise ConfigError(f"Unsupported `manifest.duplicates`: {duplicates!r}")
+        return ManifestConfig(
+            enabled=_as_bool(manifest_raw.get("enabled"), default=True),
+            duplicates=duplicates,  # type: ignore[arg-type]
+            meta_table=_as_bool(manifest_raw.get("meta_table"), default=False),
+        )
+
+    def _parse_csv(csv_raw: Any | None, ctx: str) -> tuple[str, str, str, int]:
         if csv_raw is None:
-            return ("utf-8-sig", ",", '"')
+            return ("utf-8-sig", ",", '"', 1)
         if not isinstance(csv_raw, dict):
             raise ConfigError(f"`{ctx}` must be a mapping")
         encoding = str(csv_raw.get("encoding") or "utf-8-sig")
@@ -209,7 +286,22 @@ def load_config(path: str | Path) -> AppConfig:
             raise ConfigError(f"`{ctx}.delimiter` must be a single character")
         if len(quotechar) != 1:
             raise ConfigError(f"`{ctx}.quotechar` must be a single character")
-        return (encoding, delimiter, quotechar)
+        workers = int(csv_raw.get("workers") or 1)
+        if workers < 1:
+            raise ConfigError(f"`{ctx}.workers` must be >= 1")
+        return (encoding, delimiter, quotechar, workers)
+
+    def _parse_engine(engine_raw: Any, ctx: str, default: str = "openpyxl") -> str:
+        engine = str(engine_raw or default).lower()
+        if engine not in {"openpyxl", "native"}:
+            raise ConfigError(f"`{ctx}` must be one of: openpyxl, native")
+        return engine
+
+    def _parse_workers(raw_value: Any, ctx: str, default: int = 1) -> int:
+        workers = int(raw_value or default)
+        if workers < 1:
+            raise ConfigError(f"`{ctx}` must be >= 1")
+        return workers
 
     def _none_if_blank(v: Any) -> str | None:
         if v is None:
@@ -220,9 +312,39 @@ def load_config(path: str | Path) -> AppConfig:
     def _parse_odbc(odbc_raw: dict[str, Any], ctx: str, base_dir: Path) -> OdbcConfig:
         if not isinstance(odbc_raw, dict):
             raise ConfigError(f"`{ctx}` must be a mapping")
-        batch_size = int(odbc_raw.get("batch_size") or 1000)
-        if batch_size <= 0:
-            raise ConfigError(f"`{ctx}.batch_size` must be > 0")
+        batch_size_raw = odbc_raw.get("batch_size") or 1000
+        batch_size: int | str
+        if str(batch_size_raw).strip().lower() == "auto":
+            batch_size = "auto"
+        else:
+            batch_size = int(batch_size_raw)
+            if batch_size <= 0:
+                raise ConfigError(f"`{ctx}.batch_size` must be > 0 or `auto`")
+        batch_size_min = int(odbc_raw.get("batch_size_min") or 100)
+        batch_size_max = int(odbc_raw.get("batch_size_max") or 20000)
+        if batch_size_min <= 0 or batch_size_max < batch_size_min:
+            raise ConfigError(f"`{ctx}.batch_size_min/batch_size_max` must satisfy 0 < min <= max")
+        batch_memory_mb = int(odbc_raw.get("batch_memory_mb") or 64)
+        if batch_memory_mb <= 0:
+            raise ConfigError(f"`{ctx}.batch_memory_mb` must be > 0")
+        pipeline_depth = int(odbc_raw.get("pipeline_depth") or 0)
+        if pipeline_depth < 0:
+            raise ConfigError(f"`{ctx}.pipeline_depth` must be >= 0")
+        pool_size = int(odbc_raw.get("pool_size") or 1)
+        if pool_size < 1:
+            raise ConfigError(f"`{ctx}.pool_size` must be >= 1")
+        commit_every = int(odbc_raw.get("commit_every") or 0)
+        if commit_every < 0:
+            raise ConfigError(f"`{ctx}.commit_every` must be >= 0")
+        index_parallel = int(odbc_raw.get("index_parallel") or 0)
+        if index_parallel < 0:
+            raise ConfigError(f"`{ctx}.index_parallel` must be >= 0")
+        on_batch_error = str(odbc_raw.get("on_batch_error") or "fail").lower()
+        if on_batch_error not in {"fail", "bisect"}:
+            raise ConfigError(f"`{ctx}.on_batch_error` must be one of: fail, bisect")
+        sql_commit = parse_sql_commit(odbc_raw.get("sql_commit") or "statement")
+        if sql_commit is None:
+            raise ConfigError(f"`{ctx}.sql_commit` must be one of: statement, file, section, or a number > 0")
         mode = str(odbc_raw.get("mode") or "odbc").lower()
         if mode not in {"odbc", "jdbc", "auto"}:
             raise ConfigError(f"`{ctx}.mode` must be one of: odbc, jdbc, auto")
@@ -247,7 +369,17 @@ def load_config(path: str | Path) -> AppConfig:
             uid=uid,
             pwd=pwd,
             autocommit=_as_bool(odbc_raw.get("autocommit"), default=False),
-            batch_size=batch_size,
+            batch_size=batch_size,  # type: ignore[arg-type]
+            batch_size_min=batch_size_min,
+            batch_size_max=batch_size_max,
+            batch_memory_mb=batch_memory_mb,
+            pipeline_depth=pipeline_depth,
+            pool_size=pool_size,
+            commit_every=commit_every,
+            on_batch_error=on_batch_error,  # type: ignore[arg-type]
+            index_parallel=index_parallel,
+            sql_commit=sql_commit,
+            sql_truncate_as_delete=_as_bool(odbc_raw.get("sql_truncate_as_delete"), default=False),
             connection_string=_none_if_blank(odbc_raw.get("connection_string")),
             jdbc_url=_none_if_blank(odbc_raw.get("jdbc_url")),
             jdbc_driver=_none_if_blank(odbc_raw.get("jdbc_driver")),
@@ -279,6 +411,50 @@ def load_config(path: str | Path) -> AppConfig:
             )
         return columns
 
+    def _parse_keys(keys_raw: Any, ctx: str, columns: list[ColumnMapping], mode: str) -> tuple[str, ...]:
+        if keys_raw is None:
+            keys: tuple[str, ...] = ()
+        elif isinstance(keys_raw, str):
+            keys = tuple(k.strip() for k in keys_raw.split(",") if k.strip())
+        elif isinstance(keys_raw, list):
+            keys = tuple(str(k).strip() for k in keys_raw)
+        else:
+            raise ConfigError(f"`{ctx}` must be a list or a comma-separated string")
+        unknown = [k for k in keys if k not in {c.db for c in columns}]
+        if unknown:
+            raise ConfigError(f"`{ctx}` must name columns[].db, unknown: {unknown}")
+        if mode == "upsert" and not keys:
+            raise ConfigError(f"`{ctx}` is required for mode: upsert")
+        return keys
+
+    def _parse_unique(
+        raw_job: dict[str, Any], ctx: str, columns: list[ColumnMapping]
+    ) -> tuple[tuple[tuple[str, ...], ...], int]:
+        # `unique: proj_code` / `unique: [order_no, line_no]` is one key (like `keys`);
+        # a list of lists declares several keys.
+        unique_raw = raw_job.get("unique")
+        if unique_raw is None:
+            unique: tuple[tuple[str, ...], ...] = ()
+        elif isinstance(unique_raw, list) and unique_raw and all(isinstance(u, list) for u in unique_raw):
+            unique = tuple(_parse_keys(u, f"{ctx}.unique[{i}]", columns, "") for i, u in enumerate(unique_raw))
+        else:
+            unique = (_parse_keys(unique_raw, f"{ctx}.unique", columns, ""),)
+        if any(not key for key in unique):
+            raise ConfigError(f"`{ctx}.unique` must name at least one column per key")
+        bloom = int(raw_job.get("unique_bloom") or 0)
+        if bloom < 0:
+            raise ConfigError(f"`{ctx}.unique_bloom` must be >= 0")
+        return unique, bloom
+
+    def _parse_delta(raw_job: dict[str, Any], ctx: str, mode: str) -> tuple[bool, bool]:
+        delta = _as_bool(raw_job.get("delta"), default=False)
+        deletes = _as_bool(raw_job.get("delta_deletes"), default=False)
+        if delta and mode != "upsert":
+            raise ConfigError(f"`{ctx}.delta` requires mode: upsert")
+        if deletes and not delta:
+            raise ConfigError(f"`{ctx}.delta_deletes` requires delta: true")
+        return delta, deletes
+
     # ------------------------------------------------------------
     # Schema A (existing): odbc/paths/jobs
     # Schema B (new): db/excel/tables (closer to ERP export usage)
@@ -315,6 +491,10 @@ def load_config(path: str | Path) -> AppConfig:
                 csv_encoding=csv_cfg[0],
                 csv_delimiter=csv_cfg[1],
                 csv_quotechar=csv_cfg[2],
+                csv_workers=csv_cfg[3],
+                engine=_parse_engine(excel_raw.get("engine"), f"{ctx}.excel.engine"),  # type: ignore[arg-type]
+                columnar=_as_bool(excel_raw.get("columnar"), default=False),
+                parse_workers=_parse_workers(excel_raw.get("parse_workers"), f"{ctx}.excel.parse_workers"),
             )
             if excel.header_row < 1 or excel.start_row < 1:
                 raise ConfigError(f"`{ctx}.excel.header_row/start_row` must be >= 1")
@@ -324,8 +504,10 @@ def load_config(path: str | Path) -> AppConfig:
             columns = _parse_columns(_require(job_raw, "columns", ctx), f"{ctx}.columns")
 
             mode = str(job_raw.get("mode") or "append")
-            if mode not in {"append", "truncate"}:
+            if mode not in {"append", "truncate", "swap", "upsert"}:
                 raise ConfigError(f"Unsupported `{ctx}.mode`: {mode!r}")
+            delta, delta_deletes = _parse_delta(job_raw, ctx, mode)
+            unique, unique_bloom = _parse_unique(job_raw, ctx, columns)
 
             jobs.append(
                 JobConfig(
@@ -335,13 +517,19 @@ def load_config(path: str | Path) -> AppConfig:
                     mode=mode,  # type: ignore[assignment]
                     excel=excel,
                     columns=columns,
+                    keys=_parse_keys(job_raw.get("keys"), f"{ctx}.keys", columns, mode),
+                    delta=delta,
+                    delta_deletes=delta_deletes,
+                    unique=unique,
+                    unique_bloom=unique_bloom,
+                    rebuild_indexes=_as_bool(job_raw.get("rebuild_indexes"), default=False),
                 )
             )
 
         if not jobs:
             raise ConfigError("No jobs configured")
 
-        return AppConfig(odbc=odbc, paths=paths, jobs=jobs)
+        return AppConfig(odbc=odbc, paths=paths, jobs=jobs, manifest=_parse_manifest(raw.get("manifest")))
 
     if "tables" in raw or "db" in raw:
         db_raw = _require(raw, "db", "root")
@@ -355,6 +543,9 @@ def load_config(path: str | Path) -> AppConfig:
         header_row = int(excel_raw.get("header_row") or 1)
         if header_row < 1:
             raise ConfigError("`excel.header_row` must be >= 1")
+        engine = _parse_engine(excel_raw.get("engine"), "excel.engine")
+        columnar = _as_bool(excel_raw.get("columnar"), default=False)
+        parse_workers = _parse_workers(excel_raw.get("parse_workers"), "excel.parse_workers")
 
         tables_raw = _require(raw, "tables", "root")
         if not isinstance(tables_raw, dict) or not tables_raw:
@@ -368,8 +559,9 @@ def load_config(path: str | Path) -> AppConfig:
             file_pattern = str(_require(t_raw, "file", ctx))
             sheet = t_raw.get("sheet")
             mode = str(t_raw.get("mode") or "truncate")
-            if mode not in {"append", "truncate"}:
+            if mode not in {"append", "truncate", "swap", "upsert"}:
                 raise ConfigError(f"Unsupported `{ctx}.mode`: {mode!r}")
+            delta, delta_deletes = _parse_delta(t_raw, ctx, mode)
 
             # allow per-table override
             t_header_row = int(t_raw.get("header_row") or header_row)
@@ -389,8 +581,13 @@ def load_config(path: str | Path) -> AppConfig:
                 csv_encoding=csv_cfg[0],
                 csv_delimiter=csv_cfg[1],
                 csv_quotechar=csv_cfg[2],
+                csv_workers=csv_cfg[3],
+                engine=_parse_engine(t_raw.get("engine"), f"{ctx}.engine", default=engine),  # type: ignore[arg-type]
+                columnar=_as_bool(t_raw.get("columnar"), default=columnar),
+                parse_workers=_parse_workers(t_raw.get("parse_workers"), f"{ctx}.parse_workers", parse_workers),
             )
             columns = _parse_columns(_require(t_raw, "columns", ctx), f"{ctx}.columns")
+            unique, unique_bloom = _parse_unique(t_raw, ctx, columns)
 
             jobs.append(
                 JobConfig(
@@ -400,9 +597,15 @@ def load_config(path: str | Path) -> AppConfig:
                     mode=mode,  # type: ignore[assignment]
                     excel=excel,
                     columns=columns,
+                    keys=_parse_keys(t_raw.get("keys"), f"{ctx}.keys", columns, mode),
+                    delta=delta,
+                    delta_deletes=delta_deletes,
+                    unique=unique,
+                    unique_bloom=unique_bloom,
+                    rebuild_indexes=_as_bool(t_raw.get("rebuild_indexes"), default=False),
                 )
             )
 
-        return AppConfig(odbc=odbc, paths=paths, jobs=jobs)
+        return AppConfig(odbc=odbc, paths=paths, jobs=jobs, manifest=_parse_manifest(raw.get("manifest")))
 
     raise ConfigError("Unsupported config schema (expected `odbc/jobs` or `db/tables`)")
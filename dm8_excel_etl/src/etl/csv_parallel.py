@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import mmap
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Iterator
+
+from .config import ColumnMapping, ExcelConfig
+
+# Byte-range parallel CSV parsing (`csv.workers: N`).
+#
+# The data part of the file is cut into ranges at record boundaries: a `\n` is a boundary when
+# the number of quote chars before it (since the previous boundary) is even, which holds for
+# RFC 4180 quoting. Each worker mmaps the file, decodes and parses only its range with the
+# job's RowPlan and returns the converted tuples; the parent reassembles them in order with
+# absolute row numbers. Workers parse with `strict=True`, so a range that ends inside a quoted
+# field (a stray quote in an unquoted field fooled the parity count) is detected and the rest
+# of the file is parsed serially from the last good boundary.
+
+# Encodings in which `\n` and the ASCII quote/delimiter bytes below the given limit never occur
+# inside a multi-byte character, so byte offsets found by scanning are also character boundaries.
+# GBK trail bytes start at 0x40; GB18030's four-byte characters also use the digits 0x30-0x39
+# as their second and fourth bytes, so a digit delimiter or quote is not safe there.
+_ASCII_SAFE_CODECS = {
+    "ascii": 0x40,
+    "utf-8": 0x40,
+    "utf-8-sig": 0x40,
+    "gbk": 0x40,
+    "gb2312": 0x40,
+    "gb18030": 0x30,
+    "latin-1": 0x40,
+    "iso8859-1": 0x40,
+}
+
+MIN_RANGE_BYTES = 4 * 1024 * 1024
+
+
+class _RangeError(Exception):
+    pass
+
+
+def supports_parallel(cfg: ExcelConfig) -> bool:
+    try:
+        name = codecs.lookup(cfg.csv_encoding).name
+    except LookupError:
+        return False
+    limit = _ASCII_SAFE_CODECS.get(name)
+    if limit is None:
+        return False
+    return all(len(ch) == 1 and ord(ch) < limit and ch not in "\r\n" for ch in (cfg.csv_delimiter, cfg.csv_quotechar))
+
+
+def _next_record_end(mm: mmap.mmap, pos: int, quote: bytes, quotes: int = 0) -> int:
+    """Offset just past the first `\\n` at/after `pos` where `quotes` plus the quote chars in
+    `mm[pos:]` up to it is even (i.e. outside any quoted field); -1 at EOF."""
+    while True:
+        nl = mm.find(b"\n", pos)
+        if nl < 0:
+            return -1
+        quotes += mm[pos : nl + 1].count(quote)
+        pos = nl + 1
+        if quotes % 2 == 0:
+            return pos
+
+
+def split_ranges(mm: mmap.mmap, start: int, quote: bytes, range_bytes: int) -> list[tuple[int, int]]:
+    """Cut `mm[start:]` into `(begin, end)` byte ranges of roughly `range_bytes`, ending on records."""
+    size = len(mm)
+    ranges: list[tuple[int, int]] = []
+    begin = start
+    while begin < size:
+        target = begin + range_bytes
+        end = -1
+        if target < size:
+            end = _next_record_end(mm, target, quote, mm[begin:target].count(quote))
+        if end < 0:
+            ranges.append((begin, size))
+            break
+        ranges.append((begin, end))
+        begin = end
+    return ranges
+
+
+def _reader(text: str, cfg: ExcelConfig, strict: bool = False) -> Any:
+    return csv.reader(
+        io.StringIO(text, newline=""),
+        delimiter=cfg.csv_delimiter,
+        quotechar=cfg.csv_quotechar,
+        strict=strict,
+    )
+
+
+def _parse_range(
+    path: str,
+    begin: int,
+    end: int,
+    cfg: ExcelConfig,
+    columns: list[ColumnMapping],
+    header_index: dict[str, int],
+    decimal_as_str: bool,
+) -> tuple[list[tuple[Any, ...]], dict[int, list[str]]]:
+    # Runs in a worker process: only this range is decoded, the rest of the file stays mapped.
+    from .excel import compile_row_plan
+
+    convert = compile_row_plan(columns, header_index, decimal_as_str).convert
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[begin:end].decode(cfg.csv_encoding)
+    values: list[tuple[Any, ...]] = []
+    errors: dict[int, list[str]] = {}
+    try:
+        for i, row in enumerate(_reader(text, cfg, strict=True)):
+            r = convert(i, row)
+            values.append(r.values)
+            if r.errors:
+                errors[i] = list(r.errors)
+    except csv.Error as e:
+        raise _RangeError(str(e)) from e
+    return values, errors
+
+
+def open_parallel_csv(
+    path: str,
+    cfg: ExcelConfig,
+    columns: list[ColumnMapping],
+    workers: int,
+    decimal_as_str: bool = False,
+    range_bytes: int | None = None,
+) -> tuple[dict[str, int], Iterator[Any]] | None:
+    """Return `(header_index, parsed_rows)` for a parallel parse of `path`, or None when the
+    file is too small or its header region can't be located safely (use the serial reader)."""
+    from .excel import ExcelError, ParsedRow, _header_index, _missing_headers, compile_row_plan
+
+    quote = cfg.csv_quotechar.encode("ascii")
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+        with mm:
+            # Header region: the first start_row-1 records, cross-checked with the csv module.
+            data_start = 0
+            for _ in range(cfg.start_row - 1):
+                data_start = _next_record_end(mm, data_start, quote)
+                if data_start < 0:
+                    return None
+            try:
+                head = list(_reader(mm[:data_start].decode(cfg.csv_encoding), cfg, strict=True))
+            except (csv.Error, UnicodeDecodeError):
+                return None
+            if len(head) != cfg.start_row - 1 or len(head) < cfg.header_row:
+                return None
+            if range_bytes is None:
+                range_bytes = max(MIN_RANGE_BYTES, (len(mm) - data_start) // (workers * 4) + 1)
+            ranges = split_ranges(mm, data_start, quote, range_bytes)
+    if len(ranges) < 2:
+        return None
+
+    header_values = [str(v).strip() if v is not None else "" for v in head[cfg.header_row - 1]]
+    header_index = _header_index(header_values)
+    missing_headers = _missing_headers(columns, header_index)
+    if missing_headers:
+        raise ExcelError(f"Missing CSV headers: {missing_headers}")
+
+    def _serial_from(offset: int, row_number: int) -> Iterator[ParsedRow]:
+        convert = compile_row_plan(columns, header_index, decimal_as_str).convert
+        with open(path, "rb") as raw:
+            raw.seek(offset)
+            text = io.TextIOWrapper(raw, encoding=cfg.csv_encoding, newline="")
+            reader = csv.reader(text, delimiter=cfg.csv_delimiter, quotechar=cfg.csv_quotechar)
+            for i, row in enumerate(reader, start=row_number):
+                yield convert(i, row)
+
+    def _gen() -> Iterator[ParsedRow]:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            pending: deque[tuple[int, Future]] = deque()
+            todo = iter(ranges)
+
+            def _submit() -> None:
+                nxt = next(todo, None)
+                if nxt is not None:
+                    fut = executor.submit(_parse_range, path, nxt[0], nxt[1], cfg, columns, header_index, decimal_as_str)
+                    pending.append((nxt[0], fut))
+
+            for _ in range(workers * 2):
+                _submit()
+            row_number = cfg.start_row
+            while pending:
+                begin, fut = pending.popleft()
+                try:
+                    values, errors = fut.result()
+                except _RangeError:
+                    # boundary landed inside a quoted field: finish serially from `begin`
+                    for fut_left in pending:
+                        fut_left[1].cancel()
+                    pending.clear()
+                    yield from _serial_from(begin, row_number)
+                    return
+                _submit()
+                for i, v in enumerate(values):
+                    if i in errors:
+                        yield ParsedRow(row_number + i, v, errors[i])
+                    else:
+                        yield ParsedRow(row_number + i, v)
+                row_number += len(values)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return header_index, _gen()
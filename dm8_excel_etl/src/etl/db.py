@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import datetime as dt
+import queue
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
-from .config import OdbcConfig
+from .config import ColumnMapping, OdbcConfig
 
 
 class DbError(RuntimeError):
@@ -16,6 +22,8 @@ class Db:
     conn: Any
     mode: str
     autocommit: bool
+    _jdbc: JdbcAdapter | None = field(default=None, init=False, repr=False, compare=False)
+    _catalog: dict[str, dict[str, InputSize]] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     def cursor(self) -> Any:
         return self.conn.cursor()
@@ -31,50 +39,317 @@ class Db:
     def close(self) -> None:
         self.conn.close()
 
+    def jdbc_adapter(self) -> JdbcAdapter:
+        """The connection's JDBC parameter adapter, resolved once the JVM is running."""
+        adapter = self._jdbc
+        if adapter is None:
+            adapter = JdbcAdapter.for_running_jvm()
+            if adapter.jvm:
+                object.__setattr__(self, "_jdbc", adapter)
+        return adapter
 
-def _as_jdbc_param(value: Any) -> Any:
-    import datetime as dt
 
-    if isinstance(value, dt.datetime):
-        s = value.strftime("%Y-%m-%d %H:%M:%S")
-        if value.microsecond:
-            s = f"{s}.{value.microsecond:06d}"
-        try:
-            import jpype  # type: ignore[import-not-found]
+def _timestamp_str(value: Any) -> str:
+    # java.sql.Timestamp.valueOf format (isoformat pads years before 1000, strftime doesn't)
+    return value.replace(tzinfo=None).isoformat(sep=" ", timespec="microseconds" if value.microsecond else "seconds")
 
-            if not jpype.isJVMStarted():
-                return s
-            Timestamp = jpype.JClass("java.sql.Timestamp")
-            return Timestamp.valueOf(s)
-        except Exception:
-            return s
 
-    if isinstance(value, dt.date):
-        s = value.isoformat()
+RowAdapter = Callable[[tuple[Any, ...]], tuple[Any, ...]]
+
+
+class JdbcAdapter:
+    """Python -> Java parameter conversion for JDBC connections.
+
+    The Java classes are resolved once (`jclass` is `jpype.JClass`). Dates and datetimes go
+    through `Date.valueOf`/`Timestamp.valueOf` on their ISO text, so the wall-clock value is
+    kept whatever the Python process's timezone and for dates before the 1582 Gregorian
+    switch. Without a running JVM (`jclass=None`) they stay the strings `valueOf` would accept.
+    """
+
+    def __init__(self, jclass: Any = None) -> None:
+        self.jvm = jclass is not None
+        if jclass is not None:
+            self.Types = jclass("java.sql.Types")
+            self.BigDecimal = jclass("java.math.BigDecimal")
+            self.Date = jclass("java.sql.Date")
+            self.Timestamp = jclass("java.sql.Timestamp")
+            self._date_of = self.Date.valueOf
+            self._timestamp_of = self.Timestamp.valueOf
+
+    @classmethod
+    def for_running_jvm(cls) -> JdbcAdapter:
         try:
             import jpype  # type: ignore[import-not-found]
 
-            if not jpype.isJVMStarted():
-                return s
-            Date = jpype.JClass("java.sql.Date")
-            return Date.valueOf(s)
+            if jpype.isJVMStarted():
+                return cls(jpype.JClass)
         except Exception:
-            return s
-
-    return value
+            pass
+        return _NO_JVM
+
+    def date(self, value: dt.date) -> Any:
+        if not self.jvm:
+            return value.isoformat()
+        return self._date_of(value.isoformat())
+
+    def datetime(self, value: dt.datetime) -> Any:
+        if not self.jvm:
+            return _timestamp_str(value)
+        return self._timestamp_of(_timestamp_str(value))
+
+    def param(self, value: Any) -> Any:
+        """Convert one value of unknown column type."""
+        if isinstance(value, dt.datetime):
+            return self.datetime(value)
+        if isinstance(value, dt.date):
+            return self.date(value)
+        return value
+
+    def converter(self, typ: str) -> Callable[[Any], Any] | None:
+        """Converter for non-null values of a `ColumnMapping.type` column; None = pass through."""
+        if typ == "datetime":
+            to_java: Callable[[Any], Any] = self.datetime
+            expected: type = dt.datetime
+        elif typ == "date":
+            to_java, expected = self.date, dt.date
+        else:
+            return None
+        param = self.param
+
+        def convert(value: Any) -> Any:
+            # exact type check: anything else (e.g. a raw config default) takes the generic path
+            return to_java(value) if value.__class__ is expected else param(value)
+
+        return convert
+
+    def row_adapter(self, column_types: list[str]) -> RowAdapter | None:
+        """Single-pass row converter for the given column types; None when no column needs one."""
+        convs = [(i, conv) for i, conv in enumerate(map(self.converter, column_types)) if conv is not None]
+        if not convs:
+            return None
+
+        def adapt(row: tuple[Any, ...]) -> tuple[Any, ...]:
+            out = list(row)
+            for i, conv in convs:
+                v = out[i]
+                if v is not None:
+                    out[i] = conv(v)
+            return tuple(out)
+
+        return adapt
+
+
+_NO_JVM = JdbcAdapter()
 
 
 def adapt_params(db: Db, params: Iterable[Any]) -> list[Any]:
     values = list(params)
     if db.mode != "jdbc":
         return values
-    return [_as_jdbc_param(v) for v in values]
+    param = db.jdbc_adapter().param
+    return [param(v) for v in values]
 
 
-def adapt_param_rows(db: Db, rows: list[tuple[Any, ...]]) -> list[tuple[Any, ...]]:
+def adapt_param_rows(
+    db: Db,
+    rows: list[tuple[Any, ...]],
+    column_types: list[str] | None = None,
+) -> list[tuple[Any, ...]]:
+    """JDBC parameter rows for `rows`; with `column_types` only date/datetime columns are touched."""
     if db.mode != "jdbc":
         return rows
-    return [tuple(_as_jdbc_param(v) for v in row) for row in rows]
+    adapter = db.jdbc_adapter()
+    if column_types is None:
+        param = adapter.param
+        return [tuple([param(v) for v in row]) for row in rows]
+    adapt = adapter.row_adapter(column_types)
+    if adapt is None:
+        return rows
+    return [adapt(row) for row in rows]
+
+
+# ColumnMapping.type -> (PreparedStatement setter, java.sql.Types constant for setNull)
+_JDBC_SETTERS = {
+    "str": ("setString", "VARCHAR"),
+    "int": ("setLong", "BIGINT"),
+    "float": ("setDouble", "DOUBLE"),
+    "decimal": ("setBigDecimal", "DECIMAL"),
+    "date": ("setDate", "DATE"),
+    "datetime": ("setTimestamp", "TIMESTAMP"),
+    "bool": ("setBoolean", "BOOLEAN"),
+}
+
+
+class JdbcBatchInsert:
+    """Bulk INSERT on the `java.sql.Connection` behind a jaydebeapi connection (`conn.jconn`).
+
+    jaydebeapi's executemany converts and binds every parameter through its generic path; here
+    the statement is prepared once, each column gets a typed setter chosen from its
+    `ColumnMapping.type`, and rows are sent with addBatch/executeBatch. Values that don't fit
+    the column's setter (e.g. a raw config default) are bound with `setObject`.
+
+    Values still cross into Java one cell at a time: `PreparedStatement` has no call that
+    binds a whole column from a Java array, and DM8's JDBC driver adds none. Building a Java
+    array per column first would only add a copy. The saving is in skipping jaydebeapi's
+    per-value type dispatch and in one executeBatch round-trip per batch.
+    """
+
+    def __init__(self, db: Db, sql: str, column_types: list[str], adapter: JdbcAdapter | None = None) -> None:
+        adapter = adapter or db.jdbc_adapter()
+        if not adapter.jvm:
+            raise DbError("JDBC batch insert requires a running JVM")
+        self._ps = db.conn.jconn.prepareStatement(sql)
+        converters: dict[str, Callable[[Any], Any] | None] = {"decimal": adapter.BigDecimal}
+        self._binders = [
+            self._binder(i, typ, adapter.Types, converters.get(typ) or adapter.converter(typ))
+            for i, typ in enumerate(column_types, start=1)
+        ]
+
+    def _binder(self, index: int, typ: str, sql_types: Any, to_java: Callable[[Any], Any] | None) -> Any:
+        ps = self._ps
+        setter_name, null_type_name = _JDBC_SETTERS.get(typ, ("setObject", "VARCHAR"))
+        setter = getattr(ps, setter_name)
+        set_null = ps.setNull
+        set_object = ps.setObject
+        null_type = getattr(sql_types, null_type_name)
+
+        def bind(value: Any) -> None:
+            if value is None:
+                set_null(index, null_type)
+                return
+            try:
+                setter(index, to_java(value) if to_java is not None else value)
+            except Exception:
+                set_object(index, value)
+
+        return bind
+
+    def executemany(self, rows: list[tuple[Any, ...]]) -> None:
+        binders = self._binders
+        add_batch = self._ps.addBatch
+        for row in rows:
+            for bind, value in zip(binders, row):
+                bind(value)
+            add_batch()
+        try:
+            self._ps.executeBatch()
+        except Exception:
+            # don't resend these rows with the next batch (e.g. a bisecting retry)
+            self._ps.clearBatch()
+            raise
+
+    def close(self) -> None:
+        try:
+            self._ps.close()
+        except Exception:
+            pass
+
+
+# ODBC SQL type codes (sql.h / sqlext.h), so pyodbc isn't needed to build input sizes.
+SQL_CHAR, SQL_VARCHAR, SQL_WCHAR, SQL_WVARCHAR = 1, 12, -8, -9
+SQL_NUMERIC, SQL_DECIMAL = 2, 3
+SQL_SMALLINT, SQL_INTEGER, SQL_BIGINT, SQL_TINYINT = 5, 4, -5, -6
+SQL_REAL, SQL_FLOAT, SQL_DOUBLE = 7, 6, 8
+SQL_TYPE_DATE, SQL_TYPE_TIMESTAMP, SQL_DATE, SQL_TIMESTAMP = 91, 93, 9, 11
+SQL_BIT = -7
+
+_CHAR_TYPES = {SQL_CHAR, SQL_VARCHAR, SQL_WCHAR, SQL_WVARCHAR}
+NUMERIC_TYPES = {SQL_NUMERIC, SQL_DECIMAL}
+_FIXED_TYPES = {
+    SQL_SMALLINT, SQL_INTEGER, SQL_BIGINT, SQL_TINYINT, SQL_REAL, SQL_FLOAT, SQL_DOUBLE,
+    SQL_TYPE_DATE, SQL_TYPE_TIMESTAMP, SQL_DATE, SQL_TIMESTAMP, SQL_BIT,
+}
+# wider declared char columns (CLOB/TEXT report ~2^31) are left to pyodbc
+_MAX_BOUND_CHARS = 32767
+
+InputSize = tuple[int, int, int]  # (sql_type, column_size, decimal_digits) for setinputsizes
+
+_MAPPING_SIZES: dict[str, InputSize] = {
+    "int": (SQL_BIGINT, 0, 0),
+    "float": (SQL_DOUBLE, 0, 0),
+    "date": (SQL_TYPE_DATE, 0, 0),
+    "datetime": (SQL_TYPE_TIMESTAMP, 26, 6),
+    "bool": (SQL_BIT, 0, 0),
+}
+
+
+def _catalog_sizes(db: Db, table: str) -> dict[str, InputSize]:
+    """Column name (upper-cased) -> input size from the ODBC catalog (SQLColumns); {} if unavailable."""
+    schema, _, name = table.rpartition(".")
+    cur = db.cursor()
+    try:
+        for candidate in dict.fromkeys([name, name.upper()]):
+            rows = cur.columns(table=candidate, schema=schema or None).fetchall()
+            if rows:
+                break
+        else:
+            return {}
+        out: dict[str, InputSize] = {}
+        for r in rows:
+            typ, size, digits = int(r.data_type), int(r.column_size or 0), int(r.decimal_digits or 0)
+            if typ in _CHAR_TYPES and not 0 < size <= _MAX_BOUND_CHARS:
+                continue
+            if typ in _CHAR_TYPES:
+                # wide like the mapping fallback: non-ASCII text must not go through the codepage
+                out[str(r.column_name).upper()] = (SQL_WVARCHAR, size, 0)
+            elif typ in NUMERIC_TYPES or typ in _FIXED_TYPES:
+                out[str(r.column_name).upper()] = (typ, size, digits)
+        return out
+    except Exception:
+        return {}
+    finally:
+        cur.close()
+
+
+def odbc_input_sizes(db: Db, table: str, columns: list[ColumnMapping]) -> list[InputSize | None]:
+    """Typed `setinputsizes` entries for an INSERT of `columns` into `table`.
+
+    Declared types come from the DM8 catalog when it is readable (looked up once per table and
+    connection), otherwise from `ColumnMapping.type`/`max_length`. Entries stay None where
+    nothing reliable is known (e.g. `decimal` without the catalog's precision/scale), leaving
+    pyodbc to sniff that column.
+    """
+    catalog = db._catalog.get(table)
+    if catalog is None:
+        catalog = _catalog_sizes(db, table)
+        db._catalog[table] = catalog
+    sizes: list[InputSize | None] = []
+    for c in columns:
+        size = catalog.get(c.db.upper())
+        if size is None:
+            if c.type == "str":
+                size = (SQL_WVARCHAR, c.max_length, 0) if c.max_length else None
+            else:
+                size = _MAPPING_SIZES.get(c.type)
+        sizes.append(size)
+    return sizes
+
+
+def numeric_rounder(sizes: list[InputSize | None]) -> RowAdapter | None:
+    """Row adapter rounding Decimal values to the scale of their NUMERIC binding; None if none.
+
+    DM8 rounds a string cast to NUMBER(p,s) half-up; a Decimal with more digits than `s`
+    bound natively may be refused by the driver instead.
+    """
+    quanta = [
+        (i, -size[2], Decimal(1).scaleb(-size[2]))
+        for i, size in enumerate(sizes)
+        if size is not None and size[0] in NUMERIC_TYPES
+    ]
+    if not quanta:
+        return None
+
+    def adapt(row: tuple[Any, ...]) -> tuple[Any, ...]:
+        out: list[Any] | None = None
+        for i, exponent, quantum in quanta:
+            v = row[i]
+            if v.__class__ is Decimal and v.is_finite() and v.as_tuple().exponent < exponent:  # type: ignore[operator]
+                if out is None:
+                    out = list(row)
+                out[i] = v.quantize(quantum, ROUND_HALF_UP)
+        return row if out is None else tuple(out)
+
+    return adapt
 
 
 def connect(odbc: OdbcConfig) -> Db:
@@ -143,6 +418,120 @@ def connect(odbc: OdbcConfig) -> Db:
     return Db(conn=conn, mode="odbc", autocommit=bool(odbc.autocommit))
 
 
+class Savepoint:
+    """`SAVEPOINT name` / `ROLLBACK TO SAVEPOINT name` on its own cursor of `db`.
+
+    If the driver or database refuses the first SAVEPOINT, `supported` turns False and both
+    calls become no-ops: callers then rely on a failed statement undoing itself (statement-level
+    rollback, as DM8 does for a failed executemany).
+    """
+
+    def __init__(self, db: Db, name: str = "etl_batch") -> None:
+        self.db = db
+        self.name = name
+        self.supported = True
+        self._cur: Any | None = None
+
+    def set(self) -> None:
+        if not self.supported:
+            return
+        try:
+            if self._cur is None:
+                self._cur = self.db.cursor()
+            self._cur.execute(f"SAVEPOINT {self.name}")
+        except Exception:
+            self.supported = False
+
+    def rollback(self) -> None:
+        """Undo everything since `set()`; raises DbError if that fails (e.g. connection lost)."""
+        if not self.supported or self._cur is None:
+            return
+        try:
+            self._cur.execute(f"ROLLBACK TO SAVEPOINT {self.name}")
+        except Exception as e:
+            raise DbError(f"ROLLBACK TO SAVEPOINT failed: {e}") from e
+
+    def close(self) -> None:
+        if self._cur is not None:
+            try:
+                self._cur.close()
+            except Exception:
+                pass
+            self._cur = None
+
+
+# SQLSTATE classes where the connection or transaction, not a row, is the problem: connection
+# exception, invalid transaction state, transaction rollback, operator intervention, timeout
+_STATEMENT_STATE_RE = re.compile(r"^(?:08|25|40|57|58)[0-9A-Z]{3}$|^HYT0[01]$|^HY008$")
+_STATEMENT_EXCEPTIONS = (
+    "SQLRecoverableException",
+    "SQLTransientConnectionException",
+    "SQLNonTransientConnectionException",
+    "SQLTimeoutException",
+    "SQLTransactionRollbackException",
+)
+
+
+def is_row_error(e: BaseException) -> bool:
+    """Whether a failed INSERT batch may have been rejected for some of its rows (constraint,
+    value too large, conversion) rather than for the connection or transaction state, where
+    retrying smaller batches only repeats the failure."""
+    if isinstance(e, DbError):
+        return False
+    text = str(e)
+    if any(name in text or name == type(e).__name__ for name in _STATEMENT_EXCEPTIONS):
+        return False
+    # pyodbc: args = (sqlstate, message) and the message repeats it as `[08S01]`
+    states = [e.args[0]] if e.args and isinstance(e.args[0], str) else []
+    states += re.findall(r"\[([0-9A-Z]{5})\]", text)
+    return not any(_STATEMENT_STATE_RE.match(state) for state in states)
+
+
+class ConnectionPool:
+    """Up to `size` connections from `connect(odbc)`, opened lazily and reused across threads.
+
+    A connection whose user raised is closed instead of being returned, so a broken session
+    is never handed to the next worker.
+    """
+
+    def __init__(self, odbc: OdbcConfig, size: int) -> None:
+        if size < 1:
+            raise ValueError("pool size must be >= 1")
+        self.odbc = odbc
+        self.size = size
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: queue.LifoQueue[Db] = queue.LifoQueue()
+
+    @contextmanager
+    def connection(self) -> Iterator[Db]:
+        with self._slots:
+            try:
+                db = self._idle.get_nowait()
+            except queue.Empty:
+                db = connect(self.odbc)
+            try:
+                yield db
+            except BaseException:
+                _close_quietly(db)
+                raise
+            self._idle.put(db)
+
+    def close(self) -> None:
+        while True:
+            try:
+                db = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _close_quietly(db)
+
+
+def _close_quietly(db: Db) -> None:
+    try:
+        db.close()
+    except Exception:
+        pass
+
+
 def execute(db: Db, sql: str, params: Iterable[Any] | None = None) -> None:
     try:
         cur = db.cursor()
@@ -155,3 +544,15 @@ def execute(db: Db, sql: str, params: Iterable[Any] | None = None) -> None:
         except Exception:
             pass
         raise DbError(f"SQL execute failed: {e}; sql={sql!r}") from e
+
+
+def query(db: Db, sql: str, params: Iterable[Any] | None = None) -> list[tuple[Any, ...]]:
+    try:
+        cur = db.cursor()
+        try:
+            cur.execute(sql, adapt_params(db, params or []))
+            return [tuple(r) for r in cur.fetchall()]
+        finally:
+            cur.close()
+    except Exception as e:
+        raise DbError(f"SQL query failed: {e}; sql={sql!r}") from e
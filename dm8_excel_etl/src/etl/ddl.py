@@ -0,0 +1,467 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from .db import Db, DbError, execute, query
+
+# Table/index DDL helpers on top of the DM8 (Oracle-compatible) dictionary views.
+
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def safe_ident(name: str) -> str:
+    # DM8 (and most SQL dialects) fold unquoted identifiers; quoting makes them case-sensitive.
+    # Keep simple identifiers unquoted even if they are lowercase, so `ods_xxx` works.
+    if _IDENT_RE.match(name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def qualified(table: str) -> str:
+    schema, _, name = table.rpartition(".")
+    return f"{safe_ident(schema)}.{safe_ident(name)}" if schema else safe_ident(name)
+
+
+def _dict_name(name: str) -> str:
+    # how the dictionary stores an identifier written like `name` in DDL
+    return name.upper() if _IDENT_RE.match(name) else name
+
+
+@dataclass(frozen=True)
+class IndexDef:
+    """A primary key or secondary index as read from the dictionary (columns in key order)."""
+
+    name: str
+    columns: tuple[str, ...]
+    unique: bool = False
+    primary: bool = False
+    descending: tuple[bool, ...] = ()
+
+    def create_sql(self, table: str, name: str | None = None, parallel: int = 0) -> str:
+        name = name or self.name
+        cols = ", ".join(
+            safe_ident(c) + (" DESC" if i < len(self.descending) and self.descending[i] else "")
+            for i, c in enumerate(self.columns)
+        )
+        if self.primary:
+            return f"ALTER TABLE {qualified(table)} ADD CONSTRAINT {safe_ident(name)} PRIMARY KEY ({cols})"
+        unique = "UNIQUE " if self.unique else ""
+        sql = f"CREATE {unique}INDEX {safe_ident(name)} ON {qualified(table)}({cols})"
+        return f"{sql} PARALLEL {parallel}" if parallel > 1 else sql
+
+    def drop_sql(self, table: str) -> str:
+        schema = table.rpartition(".")[0]
+        if self.primary:
+            return f"ALTER TABLE {qualified(table)} DROP CONSTRAINT {safe_ident(self.name)}"
+        return f"DROP INDEX {safe_ident(schema) + '.' if schema else ''}{safe_ident(self.name)}"
+
+    def rename_sql(self, table: str, old: str) -> str:
+        if self.primary:
+            return f"ALTER TABLE {qualified(table)} RENAME CONSTRAINT {safe_ident(old)} TO {safe_ident(self.name)}"
+        return f"ALTER INDEX {safe_ident(old)} RENAME TO {safe_ident(self.name)}"
+
+
+def table_indexes(db: Db, table: str) -> list[IndexDef]:
+    """Primary key (first, if any) and secondary indexes of `table` from the DM8 dictionary."""
+    schema, _, name = table.rpartition(".")
+    if schema:
+        views, owner, owner_params = "ALL", " AND {a}.OWNER = ?", [_dict_name(schema)]
+    else:
+        views, owner, owner_params = "USER", "", []
+
+    def _own(alias: str) -> str:
+        return owner.format(a=alias)
+
+    sql = f"""
+SELECT 'P', c.CONSTRAINT_NAME, cc.COLUMN_NAME, cc.POSITION, 'ASC'
+FROM {views}_CONSTRAINTS c
+JOIN {views}_CONS_COLUMNS cc ON cc.CONSTRAINT_NAME = c.CONSTRAINT_NAME AND cc.TABLE_NAME = c.TABLE_NAME{_own("cc")}
+WHERE c.TABLE_NAME = ? AND c.CONSTRAINT_TYPE = 'P'{_own("c")}
+UNION ALL
+SELECT CASE WHEN i.UNIQUENESS = 'UNIQUE' THEN 'U' ELSE 'N' END, i.INDEX_NAME, ic.COLUMN_NAME, ic.COLUMN_POSITION, ic.DESCEND
+FROM {views}_INDEXES i
+JOIN {views}_IND_COLUMNS ic ON ic.INDEX_NAME = i.INDEX_NAME AND ic.TABLE_NAME = i.TABLE_NAME{_own("ic")}
+WHERE i.TABLE_NAME = ?{_own("i")}
+  AND i.INDEX_NAME NOT IN (
+    SELECT k.INDEX_NAME FROM {views}_CONSTRAINTS k
+    WHERE k.TABLE_NAME = ? AND k.CONSTRAINT_TYPE = 'P' AND k.INDEX_NAME IS NOT NULL{_own("k")}
+  )
+ORDER BY 1, 2, 4
+""".strip()
+    t = _dict_name(name)
+    params = [*owner_params, t, *owner_params, *owner_params, t, *owner_params, t, *owner_params]
+    rows = query(db, sql, params)
+
+    found: dict[str, tuple[str, list[str], list[bool]]] = {}
+    for kind, index_name, column, _position, descend in rows:
+        entry = found.setdefault(str(index_name), (str(kind), [], []))
+        entry[1].append(str(column))
+        entry[2].append(str(descend or "").upper() == "DESC")
+    out = [
+        IndexDef(
+            name=index_name,
+            columns=tuple(cols),
+            unique=kind in {"P", "U"},
+            primary=kind == "P",
+            descending=tuple(desc) if any(desc) else (),
+        )
+        for index_name, (kind, cols, desc) in found.items()
+    ]
+    out.sort(key=lambda ix: not ix.primary)
+    return out
+
+
+def drop_table_quietly(db: Db, table: str) -> None:
+    try:
+        execute(db, f"DROP TABLE {qualified(table)}")
+    except DbError:
+        pass
+
+
+# `mode: swap`: load into a shadow copy of the table, index it, then rename it into place.
+
+STAGE_SUFFIX = "__stg"
+OLD_SUFFIX = "__old"
+
+
+def _suffixed(table: str, suffix: str) -> str:
+    return table + suffix
+
+
+def create_stage(db: Db, table: str) -> str:
+    """(Re)create `<table>__stg` with the table's columns (incl. identity/defaults) but no
+    constraints or indexes, and return its name."""
+    stage = _suffixed(table, STAGE_SUFFIX)
+    drop_table_quietly(db, stage)  # leftover of an interrupted run
+    execute(db, f"CREATE TABLE {qualified(stage)} LIKE {qualified(table)}")
+    return stage
+
+
+def _owner(table: str) -> tuple[str, str, list[str]]:
+    # (table name as stored, owner SQL expression, its params) for the ALL_* dictionary views
+    schema, _, name = table.rpartition(".")
+    return _dict_name(name), ("?" if schema else "USER"), ([_dict_name(schema)] if schema else [])
+
+
+def _dict_ident(name: str) -> str:
+    # a dictionary name back to DDL: upper-case simple names stay unquoted
+    return name if _IDENT_RE.match(name) and name == name.upper() else '"' + name.replace('"', '""') + '"'
+
+
+def _sql_str(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+def check_swappable(db: Db, table: str, logger: logging.Logger | logging.LoggerAdapter) -> None:
+    """Refuse a swap that would silently lose `table`'s triggers or foreign keys.
+
+    Both are dropped with the old table and not rebuilt on the stage, so raise DbError before
+    anything is loaded. Views and procedures that depend on the table only get a warning: the
+    server recompiles them against the swapped-in table on next use.
+    """
+    name, owner, owner_params = _owner(table)
+    sql = f"""
+SELECT 'TRIGGER', TRIGGER_NAME FROM ALL_TRIGGERS WHERE TABLE_OWNER = {owner} AND TABLE_NAME = ?
+UNION ALL
+SELECT 'FOREIGN KEY', r.CONSTRAINT_NAME FROM ALL_CONSTRAINTS r
+WHERE r.CONSTRAINT_TYPE = 'R' AND (
+  (r.OWNER = {owner} AND r.TABLE_NAME = ?)
+  OR (r.R_OWNER = {owner} AND r.R_CONSTRAINT_NAME IN (
+    SELECT k.CONSTRAINT_NAME FROM ALL_CONSTRAINTS k
+    WHERE k.OWNER = {owner} AND k.TABLE_NAME = ? AND k.CONSTRAINT_TYPE IN ('P', 'U')
+  ))
+)
+UNION ALL
+SELECT d.TYPE, d.OWNER || '.' || d.NAME FROM ALL_DEPENDENCIES d
+WHERE d.REFERENCED_OWNER = {owner} AND d.REFERENCED_NAME = ? AND d.REFERENCED_TYPE = 'TABLE'
+""".strip()
+    params = [*owner_params, name] * 2 + [*owner_params, *owner_params, name, *owner_params, name]
+    blockers, dependents = [], []
+    for kind, obj in query(db, sql, params):
+        kind = str(kind)
+        (blockers if kind in {"TRIGGER", "FOREIGN KEY"} else dependents).append(f"{kind.lower()} {obj}")
+    if blockers:
+        raise DbError(f"mode swap would drop {', '.join(blockers)} of {table}; use mode truncate for this table")
+    if dependents:
+        logger.warning("swap table=%s dependents recompiled after the swap: %s", table, ", ".join(dependents))
+
+
+def _grant_and_comment_sql(db: Db, table: str, target: str) -> list[str]:
+    # GRANT/COMMENT statements that give `target` the privileges and comments of `table`
+    name, owner, owner_params = _owner(table)
+    grants = query(
+        db,
+        f"SELECT DISTINCT GRANTEE, PRIVILEGE, GRANTABLE FROM ALL_TAB_PRIVS "
+        f"WHERE TABLE_SCHEMA = {owner} AND TABLE_NAME = ? AND GRANTEE <> {owner} ORDER BY 1, 2",
+        [*owner_params, name, *owner_params],
+    )
+    out = [
+        f"GRANT {privilege} ON {qualified(target)} TO {_dict_ident(str(grantee))}"
+        + (" WITH GRANT OPTION" if str(grantable).upper() in {"YES", "Y"} else "")
+        for grantee, privilege, grantable in grants
+    ]
+    comments = query(
+        db,
+        f"SELECT NULL, COMMENTS FROM ALL_TAB_COMMENTS WHERE OWNER = {owner} AND TABLE_NAME = ? AND COMMENTS IS NOT NULL "
+        f"UNION ALL SELECT COLUMN_NAME, COMMENTS FROM ALL_COL_COMMENTS "
+        f"WHERE OWNER = {owner} AND TABLE_NAME = ? AND COMMENTS IS NOT NULL",
+        [*owner_params, name] * 2,
+    )
+    for column, text in comments:
+        on = f"COLUMN {qualified(target)}.{_dict_ident(str(column))}" if column else f"TABLE {qualified(target)}"
+        out.append(f"COMMENT ON {on} IS {_sql_str(str(text))}")
+    return out
+
+
+def _create_index(db: Db, ix: IndexDef, table: str, parallel: int = 0, name: str | None = None) -> str:
+    # CREATE the index, without the PARALLEL clause if the server refuses it; returns the SQL run
+    sql = ix.create_sql(table, name, parallel=parallel)
+    try:
+        execute(db, sql)
+    except DbError:
+        if not parallel or ix.primary:
+            raise
+        sql = ix.create_sql(table, name)
+        execute(db, sql)
+    return sql
+
+
+def swap_in(
+    db: Db,
+    table: str,
+    stage: str,
+    indexes: list[IndexDef],
+    logger: logging.Logger | logging.LoggerAdapter,
+    parallel: int = 0,
+) -> None:
+    """Build `indexes` on the loaded `stage`, rename it to `table` and drop the old table.
+
+    DM8 auto-commits DDL, so `stage` must already be committed. Index names are unique per
+    schema, so stage indexes are built under `<name>__stg` and renamed after the old table
+    (which owns the original names) is dropped. The table's grants and comments are copied to
+    the stage first (they move with it on rename); a grant that can't be copied aborts the swap
+    with the live table untouched. The swap is not atomic: the two renames are separate
+    auto-committed DDL statements and a query that lands between them finds no table (the
+    README documents this for `mode: swap`).
+    """
+    for ix in indexes:
+        logger.info("swap table=%s build %s", table, ix.create_sql(table, parallel=parallel))
+        _create_index(db, ix, stage, parallel, _suffixed(ix.name, STAGE_SUFFIX))
+    for sql in _grant_and_comment_sql(db, table, stage):
+        logger.info("swap table=%s copy %s", table, sql)
+        execute(db, sql)
+
+    old = _suffixed(table, OLD_SUFFIX)
+    drop_table_quietly(db, old)
+    execute(db, f"ALTER TABLE {qualified(table)} RENAME TO {safe_ident(old.rpartition('.')[2])}")
+    try:
+        execute(db, f"ALTER TABLE {qualified(stage)} RENAME TO {safe_ident(table.rpartition('.')[2])}")
+    except DbError:
+        execute(db, f"ALTER TABLE {qualified(old)} RENAME TO {safe_ident(table.rpartition('.')[2])}")
+        raise
+    drop_table_quietly(db, old)
+    for ix in indexes:
+        try:
+            execute(db, ix.rename_sql(table, _suffixed(ix.name, STAGE_SUFFIX)))
+        except DbError as e:
+            logger.warning("swap table=%s keep index name %s%s: %s", table, ix.name, STAGE_SUFFIX, e)
+
+
+# `mode: upsert`: load into a column-only stage, then one set-based MERGE into the table.
+
+
+@dataclass(frozen=True)
+class MergeCounts:
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+def table_columns(db: Db, table: str) -> set[str]:
+    """Column names of `table` as stored in the dictionary (upper-cased for unquoted DDL)."""
+    schema, _, name = table.rpartition(".")
+    if schema:
+        sql = "SELECT COLUMN_NAME FROM ALL_TAB_COLUMNS WHERE OWNER = ? AND TABLE_NAME = ?"
+        params = [_dict_name(schema), _dict_name(name)]
+    else:
+        sql = "SELECT COLUMN_NAME FROM USER_TAB_COLUMNS WHERE TABLE_NAME = ?"
+        params = [_dict_name(name)]
+    return {str(r[0]) for r in query(db, sql, params)}
+
+
+def create_merge_stage(db: Db, table: str, columns: list[str]) -> str:
+    """(Re)create `<table>__stg` holding only the loaded `columns` (no identity, defaults or
+    indexes) and return its name.
+
+    The stage is a global temporary table (ON COMMIT PRESERVE ROWS, so it survives the commit
+    before the MERGE): its rows are private to this session and go away with it, so a killed
+    run leaves no data behind. A server that refuses it gets a regular table instead.
+    """
+    stage = _suffixed(table, STAGE_SUFFIX)
+    drop_stage(db, stage)  # leftover of an interrupted run
+    cols = ", ".join(safe_ident(c) for c in columns)
+    select = f"SELECT {cols} FROM {qualified(table)} WHERE 1 = 0"
+    try:
+        execute(db, f"CREATE GLOBAL TEMPORARY TABLE {qualified(stage)} ON COMMIT PRESERVE ROWS AS {select}")
+    except DbError:
+        execute(db, f"CREATE TABLE {qualified(stage)} AS {select}")
+    return stage
+
+
+def drop_stage(db: Db, stage: str) -> None:
+    """Empty and drop a stage table, ignoring errors (a temporary table can't be dropped while
+    this session still holds rows in it)."""
+    try:
+        execute(db, f"TRUNCATE TABLE {qualified(stage)}")
+    except DbError:
+        pass
+    drop_table_quietly(db, stage)
+
+
+def merge_stage(
+    db: Db,
+    table: str,
+    stage: str,
+    columns: list[str],
+    keys: tuple[str, ...],
+    touch: str | None = None,
+) -> MergeCounts:
+    """MERGE the committed `stage` into `table` on `keys` and return what it did.
+
+    Matched rows are only updated when a non-key column differs (NULL-safe via DECODE), so
+    unchanged rows cost no index maintenance or redo. `touch` names a column (e.g. `etl_time`)
+    set to CURRENT_TIMESTAMP on updated rows.
+    """
+    on = " AND ".join(f"T.{safe_ident(k)} = S.{safe_ident(k)}" for k in keys)
+    others = [c for c in columns if c not in keys]
+    changed = " OR ".join(f"DECODE(T.{safe_ident(c)}, S.{safe_ident(c)}, 0, 1) = 1" for c in others)
+    first_key = safe_ident(keys[0])
+
+    count_sql = (
+        f"SELECT COUNT(*), "
+        f"SUM(CASE WHEN T.{first_key} IS NULL THEN 1 ELSE 0 END), "
+        f"SUM(CASE WHEN T.{first_key} IS NOT NULL AND ({changed or '1 = 0'}) THEN 1 ELSE 0 END) "
+        f"FROM {qualified(stage)} S LEFT JOIN {qualified(table)} T ON {on}"
+    )
+    total, inserted, updated = (int(v or 0) for v in query(db, count_sql)[0])
+
+    cols = ", ".join(safe_ident(c) for c in columns)
+    values = ", ".join(f"S.{safe_ident(c)}" for c in columns)
+    sql = f"MERGE INTO {qualified(table)} T USING {qualified(stage)} S ON ({on})"
+    if others:
+        sets = [f"T.{safe_ident(c)} = S.{safe_ident(c)}" for c in others]
+        if touch:
+            sets.append(f"T.{safe_ident(touch)} = CURRENT_TIMESTAMP")
+        sql += f" WHEN MATCHED THEN UPDATE SET {', '.join(sets)} WHERE {changed}"
+    sql += f" WHEN NOT MATCHED THEN INSERT ({cols}) VALUES ({values})"
+    execute(db, sql)
+    return MergeCounts(inserted=inserted, updated=updated, unchanged=total - inserted - updated)
+
+
+# truncate loads: drop the secondary indexes, bulk insert, then rebuild each index in one pass.
+
+
+_CREATE_INDEX_RE = re.compile(r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+("(?:[^"]|"")+"|\S+)\s+ON\b', re.IGNORECASE)
+
+
+def _created_index(sql: str) -> str | None:
+    # dictionary name of the index a CREATE INDEX statement creates
+    m = _CREATE_INDEX_RE.match(sql)
+    if not m:
+        return None
+    name = m.group(1)
+    return name[1:-1].replace('""', '"') if name.startswith('"') else _dict_name(name)
+
+
+def restore_pending_indexes(
+    db: Db, table: str, pending: Path, logger: logging.Logger | logging.LoggerAdapter
+) -> None:
+    """Re-run the CREATE INDEX statements a previous, interrupted load left in `pending`.
+
+    Indexes that already exist again are skipped. If any statement still fails, `pending` is
+    rewritten with just those statements and DbError is raised: loading on would drop the
+    remaining indexes and lose the only record of the missing ones.
+    """
+    if not pending.exists():
+        return
+    lines = pending.read_text(encoding="utf-8").splitlines()
+    statements = [line.strip().rstrip(";") for line in lines]
+    statements = [sql for sql in statements if sql and not sql.startswith("--")]
+    logger.warning("restore indexes left dropped by an interrupted load: %s", pending)
+    existing = {ix.name for ix in table_indexes(db, table)}
+    failed = []
+    for sql in statements:
+        if _created_index(sql) in existing:
+            logger.info("restore not needed, index exists: %s", sql)
+            continue
+        try:
+            execute(db, sql)
+            logger.info("restored: %s", sql)
+        except DbError as e:
+            logger.error("restore failed (%s): %s", e, sql)
+            failed.append(sql)
+    if failed:
+        header = "".join(f"{line}\n" for line in lines if line.startswith("--"))
+        pending.write_text(header + "".join(f"{sql};\n" for sql in failed), encoding="utf-8")
+        raise DbError(f"{len(failed)} index(es) of {table} could not be restored; fix and run {pending}, then reload")
+    pending.unlink()
+
+
+def drop_secondary_indexes(
+    db: Db,
+    table: str,
+    pending: Path,
+    dropped: list[IndexDef],
+    logger: logging.Logger | logging.LoggerAdapter,
+) -> None:
+    """Drop `table`'s non-unique secondary indexes, appending each one to `dropped`.
+
+    PK and UNIQUE indexes stay: they guard the data and a failed rebuild would lose them.
+    The CREATE statements are logged and written to `pending` before anything is dropped so
+    an interrupted run can be repaired (the next load replays the file). An index that can't
+    be dropped is kept and maintained by the insert as before. A leftover `pending` file must
+    already have been replayed with restore_pending_indexes(): it is overwritten here.
+    """
+    columns = table_columns(db, table)
+    # expression indexes list hidden columns: leave those alone
+    indexes = [ix for ix in table_indexes(db, table) if not ix.unique and set(ix.columns) <= columns]
+    if not indexes:
+        return
+    pending.parent.mkdir(parents=True, exist_ok=True)
+    pending.write_text(
+        f"-- secondary indexes of {table} dropped for a bulk load; run these if the load was interrupted\n"
+        + "".join(f"{ix.create_sql(table)};\n" for ix in indexes),
+        encoding="utf-8",
+    )
+    for ix in indexes:
+        logger.info("index table=%s drop %s (restore: %s)", table, ix.name, ix.create_sql(table))
+        try:
+            execute(db, ix.drop_sql(table))
+        except DbError as e:
+            logger.warning("index table=%s keep %s: %s", table, ix.name, e)
+            continue
+        dropped.append(ix)
+
+
+def rebuild_indexes(
+    db: Db,
+    table: str,
+    indexes: list[IndexDef],
+    pending: Path,
+    logger: logging.Logger | logging.LoggerAdapter,
+    parallel: int = 0,
+) -> None:
+    """Recreate `indexes` (never raises); `pending` is removed once all of them exist again."""
+    failed = []
+    for ix in indexes:
+        try:
+            sql = _create_index(db, ix, table, parallel)
+            logger.info("index table=%s rebuilt: %s", table, sql)
+        except DbError as e:
+            logger.error("index table=%s rebuild failed, run by hand: %s; error: %s", table, ix.create_sql(table), e)
+            failed.append(ix)
+    if not failed:
+        pending.unlink(missing_ok=True)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Sequence
+
+# `delta: true` (upsert jobs): skip rows whose content didn't change since the last load.
+#
+# Per table, a small SQLite file maps each business key (JSON text of the key values) to a
+# 16-byte BLAKE2b hash of the row's mapped values. A parsed row is only sent to DM8 when its
+# key is new or its hash differs. Updates to the store stay in an open SQLite transaction that
+# is committed only after the DB commit, so a failed load never marks rows as loaded.
+
+
+def row_hash(values: Sequence[Any]) -> bytes:
+    # str() of parsed values is stable across runs (Decimal/str decimals hash alike);
+    # NUL marks None so it differs from an empty string.
+    text = "\x1f".join("\x00" if v is None else str(v) for v in values)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def key_text(values: Sequence[Any], key_idx: Sequence[int]) -> str:
+    return json.dumps([None if values[i] is None else str(values[i]) for i in key_idx], ensure_ascii=False)
+
+
+class RowHashStore:
+    def __init__(self, path: Path, key_idx: Sequence[int], track_seen: bool = False) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.key_idx = list(key_idx)
+        self.track_seen = track_seen
+        self.skipped = 0
+        self._con = sqlite3.connect(str(path), isolation_level="DEFERRED")
+        self._con.execute("CREATE TABLE IF NOT EXISTS row_hash (key TEXT PRIMARY KEY, hash BLOB NOT NULL)")
+        if track_seen:
+            self._con.execute("CREATE TEMP TABLE seen (key TEXT PRIMARY KEY)")
+        self._con.commit()
+        self._lookup = self._con.cursor()
+
+    def changed(self, values: Sequence[Any]) -> bool:
+        """True when `values` must be loaded (new key or new content); records it as pending."""
+        key = key_text(values, self.key_idx)
+        digest = row_hash(values)
+        con = self._con
+        if self.track_seen:
+            con.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,))
+        found = self._lookup.execute("SELECT hash FROM row_hash WHERE key = ?", (key,)).fetchone()
+        if found is not None and found[0] == digest:
+            self.skipped += 1
+            return False
+        con.execute("INSERT OR REPLACE INTO row_hash (key, hash) VALUES (?, ?)", (key, digest))
+        return True
+
+    def see(self, values: Sequence[Any]) -> bool:
+        """Mark the key of a row that isn't loaded (a bad row) as present in the snapshot.
+
+        False when a key value is missing (e.g. the cell failed to parse): the key can't be
+        told, so `missing_keys()` may name a row that is still in the file.
+        """
+        if any(values[i] is None for i in self.key_idx):
+            return False
+        if self.track_seen:
+            self._con.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key_text(values, self.key_idx),))
+        return True
+
+    def missing_keys(self) -> list[list[str | None]]:
+        """Stored keys not seen in this run (the file is a full snapshot: they were deleted)."""
+        if not self.track_seen:
+            raise RuntimeError("missing_keys() needs track_seen=True")
+        rows = self._con.execute("SELECT key FROM row_hash WHERE key NOT IN (SELECT key FROM seen)").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def forget(self, keys: list[list[str | None]]) -> None:
+        self._con.executemany(
+            "DELETE FROM row_hash WHERE key = ?",
+            [(json.dumps(k, ensure_ascii=False),) for k in keys],
+        )
+
+    def discard(self, rows: list[Sequence[Any]]) -> None:
+        """Drop the pending hashes of `rows` (e.g. rejected by the DB) so they are sent again next time."""
+        self._con.executemany("DELETE FROM row_hash WHERE key = ?", [(key_text(v, self.key_idx),) for v in rows])
+
+    def commit(self) -> None:
+        self._con.commit()
+
+    def rollback(self) -> None:
+        self._con.rollback()
+
+    def close(self) -> None:
+        self._con.close()
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import csv
 import datetime as dt
+import functools
+import itertools
 from decimal import Decimal, InvalidOperation
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator, Sequence
 from pathlib import Path
 
 from .config import ColumnMapping, ColumnType, ExcelConfig
@@ -14,16 +16,47 @@ class ExcelError(RuntimeError):
     pass
 
 
-@dataclass(frozen=True)
+_NO_ERRORS: tuple[str, ...] = ()
+
+
 class ParsedRow:
-    row_number: int
-    values: dict[str, Any]  # db_column -> value
-    errors: list[str]
+    """One converted source row.
+
+    `values` is a tuple in column-mapping order (the executemany parameter row as-is);
+    `errors` stays the shared empty tuple unless the row failed.
+    """
+
+    __slots__ = ("row_number", "values", "errors")
+
+    def __init__(
+        self,
+        row_number: int,
+        values: tuple[Any, ...],
+        errors: Sequence[str] = _NO_ERRORS,
+    ) -> None:
+        self.row_number = row_number
+        self.values = values
+        self.errors = errors
 
     @property
     def ok(self) -> bool:
         return not self.errors
 
+    def as_dict(self, column_order: Sequence[str]) -> dict[str, Any]:
+        return dict(zip(column_order, self.values))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ParsedRow):
+            return NotImplemented
+        return (
+            self.row_number == other.row_number
+            and self.values == other.values
+            and list(self.errors) == list(other.errors)
+        )
+
+    def __repr__(self) -> str:
+        return f"ParsedRow(row_number={self.row_number!r}, values={self.values!r}, errors={self.errors!r})"
+
 
 def _is_empty(value: Any) -> bool:
     return value is None or (isinstance(value, str) and value.strip() == "")
@@ -45,99 +78,492 @@ def _to_bool(value: Any) -> bool | None:
     raise ValueError(f"Invalid bool: {value!r}")
 
 
-def convert_value(value: Any, typ: ColumnType) -> Any:
-    if _is_empty(value):
+def _conv_str(value: Any) -> str | None:
+    if value is None:
         return None
+    if isinstance(value, str):
+        s = value.strip()
+        return s if s else None
+    return str(value).strip()
 
-    if typ == "str":
-        return str(value).strip()
-
-    if typ == "int":
-        if isinstance(value, bool):
-            return int(value)
-        if isinstance(value, int):
-            return value
-        if isinstance(value, float):
-            if not value.is_integer():
-                raise ValueError(f"Expected int, got float={value}")
-            return int(value)
-        return int(str(value).strip())
-
-    if typ == "float":
-        if isinstance(value, bool):
-            return float(int(value))
-        if isinstance(value, (int, float)):
-            return float(value)
-        return float(str(value).strip())
 
-    if typ == "decimal":
-        if isinstance(value, bool):
-            return Decimal(int(value))
-        if isinstance(value, int):
-            return Decimal(value)
-        if isinstance(value, float):
-            return Decimal(str(value))
-        if isinstance(value, Decimal):
-            return value
+def _conv_int(value: Any) -> int | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        s = value.strip()
+        return int(s) if s else None
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"Expected int, got float={value}")
+        return int(value)
+    return int(str(value).strip())
+
+
+def _conv_float(value: Any) -> float | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        s = value.strip()
+        return float(s) if s else None
+    if isinstance(value, bool):
+        return float(int(value))
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(str(value).strip())
+
+
+def _conv_decimal(value: Any) -> Decimal | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        s = value.strip()
+        if not s:
+            return None
         try:
-            s = str(value).strip()
-            s = s.replace(",", "")
-            s = s.replace("￥", "").replace("¥", "")
             return Decimal(s)
+        except InvalidOperation:
+            pass
+        try:
+            return Decimal(s.replace(",", "").replace("￥", "").replace("¥", ""))
         except (InvalidOperation, ValueError) as e:
             raise ValueError(f"Invalid decimal: {value!r}") from e
-
-    if typ in {"date", "datetime"}:
+    if isinstance(value, bool):
+        return Decimal(int(value))
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, Decimal):
+        return value
+    return _conv_decimal(str(value))
+
+
+_DATE_FALLBACK_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%Y.%m.%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y.%m.%d %H:%M:%S",
+)
+
+# Formats a column may be "learned" as; all of them parse to the same value dateutil would.
+_ISO = "iso"
+_SNIFF_FORMATS = (
+    _ISO,
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y.%m.%d",
+    "%Y.%m.%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d %H:%M",
+    "%Y%m%d",
+)
+
+DATE_CACHE_SIZE = 4096
+_DATE_TYPES = frozenset({"date", "datetime"})
+
+
+def _parse_iso(s: str) -> dt.datetime:
+    # `YYYY-MM-DD` / `YYYY-MM-DD HH:MM:SS` (or `T`); shape-checked so fromisoformat's
+    # extended forms (3.11+) never change what a column parses to.
+    n = len(s)
+    if n == 10 and s[4] == "-" and s[7] == "-":
+        return dt.datetime.fromisoformat(s)
+    if n == 19 and s[4] == "-" and s[7] == "-" and s[10] in " T" and s[13] == ":" and s[16] == ":":
+        return dt.datetime.fromisoformat(s)
+    raise ValueError(f"not ISO: {s!r}")
+
+
+def _parse_with(fmt: str, s: str) -> dt.datetime:
+    if fmt == _ISO:
+        return _parse_iso(s)
+    if fmt == "%Y%m%d" and (len(s) != 8 or not s.isdigit()):
+        raise ValueError(f"not YYYYMMDD: {s!r}")
+    return dt.datetime.strptime(s, fmt)
+
+
+def _parse_datetime_str(s: str, typ: ColumnType, value: Any) -> dt.datetime:
+    try:
+        from dateutil import parser as dt_parser  # type: ignore[import-not-found]
+
+        return dt_parser.parse(s)
+    except Exception:
+        # Fallback for offline/minimal env: try common formats
+        for fmt in _DATE_FALLBACK_FORMATS:
+            try:
+                return dt.datetime.strptime(s, fmt)
+            except Exception:
+                pass
+        raise ValueError(f"Invalid {typ}: {value!r}")
+
+
+class DateParser:
+    """Per-column date/datetime converter.
+
+    The first string that matches one of `_SNIFF_FORMATS` fixes the column's format; later values
+    take that fast path first. Results are memoized in a bounded LRU (ERP exports repeat a few
+    thousand distinct dates), and dateutil is only consulted when the fast path misses.
+    """
+
+    def __init__(self, typ: ColumnType, cache_size: int = DATE_CACHE_SIZE) -> None:
+        if typ not in _DATE_TYPES:
+            raise ValueError(f"Unsupported date type: {typ}")
+        self.typ = typ
+        self.fmt: str | None = None
+        self._as_date = typ == "date"
+        self._parse_cached = functools.lru_cache(maxsize=cache_size)(self._parse_str)
+
+    def _parse_str(self, s: str) -> dt.date | dt.datetime:
+        parsed: dt.datetime | None = None
+        fmt = self.fmt
+        if fmt is not None:
+            try:
+                parsed = _parse_with(fmt, s)
+            except ValueError:
+                pass
+        if parsed is None:
+            for candidate in _SNIFF_FORMATS:
+                if candidate == fmt:
+                    continue
+                try:
+                    parsed = _parse_with(candidate, s)
+                except ValueError:
+                    continue
+                if fmt is None:
+                    self.fmt = candidate
+                break
+        if parsed is None:
+            parsed = _parse_datetime_str(s, self.typ, s)
+        return parsed.date() if self._as_date else parsed
+
+    def __call__(self, value: Any) -> dt.date | dt.datetime | None:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            s = value.strip()
+            return self._parse_cached(s) if s else None
         if isinstance(value, dt.datetime):
-            return value.date() if typ == "date" else value
+            return value.date() if self._as_date else value
         if isinstance(value, dt.date):
-            return value if typ == "date" else dt.datetime.combine(value, dt.time.min)
+            return value if self._as_date else dt.datetime.combine(value, dt.time.min)
         s = str(value).strip()
-        try:
-            from dateutil import parser as dt_parser  # type: ignore[import-not-found]
-
-            parsed = dt_parser.parse(s)
-            return parsed.date() if typ == "date" else parsed
-        except Exception:
-            # Fallback for offline/minimal env: try common formats
-            fmts = (
-                "%Y-%m-%d",
-                "%Y/%m/%d",
-                "%Y.%m.%d",
-                "%Y-%m-%d %H:%M:%S",
-                "%Y/%m/%d %H:%M:%S",
-                "%Y.%m.%d %H:%M:%S",
-            )
-            for fmt in fmts:
-                try:
-                    parsed = dt.datetime.strptime(s, fmt)
-                    return parsed.date() if typ == "date" else parsed
-                except Exception:
-                    pass
-            raise ValueError(f"Invalid {typ}: {value!r}")
+        return self._parse_cached(s) if s else None
 
-    if typ == "bool":
-        return _to_bool(value)
+    def cache_info(self) -> Any:
+        return self._parse_cached.cache_info()
 
-    raise ValueError(f"Unsupported type: {typ}")
+
+# stateless converters; date columns each get their own DateParser (sniffed format + cache)
+_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "str": _conv_str,
+    "int": _conv_int,
+    "float": _conv_float,
+    "decimal": _conv_decimal,
+    "bool": _to_bool,
+}
+
+
+def convert_value(value: Any, typ: ColumnType) -> Any:
+    if typ in _DATE_TYPES:
+        return DateParser(typ)(value)
+    conv = _CONVERTERS.get(typ)
+    if conv is None:
+        raise ValueError(f"Unsupported type: {typ}")
+    return conv(value)
+
+
+def _conv_decimal_str(value: Any) -> str | None:
+    d = _conv_decimal(value)
+    return str(d) if d is not None else None
+
+
+def _column_converter(c: ColumnMapping, decimal_as_str: bool = False) -> Callable[[Any], Any]:
+    if c.type in _DATE_TYPES:
+        return DateParser(c.type)
+    conv = _CONVERTERS.get(c.type)
+    if conv is None:
+        raise ValueError(f"Unsupported type: {c.type}")
+    if c.type == "decimal" and decimal_as_str:
+        return _conv_decimal_str
+    if c.type == "str" and c.max_length:
+        max_length = c.max_length
+
+        def _conv_str_truncated(value: Any) -> str | None:
+            s = _conv_str(value)
+            return s[:max_length] if s is not None else None
+
+        return _conv_str_truncated
+    return conv
+
+
+@dataclass(frozen=True)
+class RowPlan:
+    """Per-job converter plan, compiled once from the column mapping and the resolved header.
+
+    Each step is a flat tuple `(source_index, db_column, converter, default, required, excel_name)`;
+    `max_length` is folded into the `str` converter and into the (pre-truncated) default.
+    """
+
+    steps: tuple[tuple[int, str, Callable[[Any], Any], Any, bool, str], ...]
+
+    def convert(self, row_number: int, row: Sequence[Any]) -> ParsedRow:
+        n = len(row)
+        values: list[Any] = []
+        append = values.append
+        errors: list[str] | None = None
+        for idx, _db_col, conv, default, required, name in self.steps:
+            try:
+                converted = conv(row[idx] if idx < n else None)
+            except Exception as e:
+                if errors is None:
+                    errors = []
+                errors.append(f"{name} invalid: {e}")
+                append(None)
+                continue
+            if converted is None:
+                if default is not None:
+                    converted = default
+                elif required:
+                    if errors is None:
+                        errors = []
+                    errors.append(f"{name} required")
+            append(converted)
+        return ParsedRow(row_number, tuple(values), errors or _NO_ERRORS)
+
+
+def compile_row_plan(
+    columns: list[ColumnMapping],
+    header_index: dict[str, int],
+    decimal_as_str: bool = False,
+) -> RowPlan:
+    """`decimal_as_str=True` makes `decimal` columns yield `str` (the DB parameter form)."""
+    steps: list[tuple[int, str, Callable[[Any], Any], Any, bool, str]] = []
+    for c in columns:
+        default = c.default
+        if isinstance(default, str) and c.max_length and len(default) > c.max_length:
+            default = default[: c.max_length]
+        conv = _column_converter(c, decimal_as_str)
+        steps.append((header_index[c.excel], c.db, conv, default, c.required, c.excel))
+    return RowPlan(steps=tuple(steps))
+
+
+RawRows = Iterator[tuple[int, Sequence[Any]]]
 
 
 def iter_rows(
     excel_path: str,
     excel_cfg: ExcelConfig,
     columns: list[ColumnMapping],
+    decimal_as_str: bool = False,
 ) -> tuple[list[str], Iterable[ParsedRow]]:
+    if excel_cfg.csv_workers > 1 and Path(excel_path).suffix.lower() == ".csv":
+        from .csv_parallel import open_parallel_csv, supports_parallel
+
+        if supports_parallel(excel_cfg):
+            opened = open_parallel_csv(excel_path, excel_cfg, columns, excel_cfg.csv_workers, decimal_as_str)
+            if opened is not None:
+                return [], opened[1]
+
+    header_index, raw_rows = _open_source(excel_path, excel_cfg, columns)
+    convert = compile_row_plan(columns, header_index, decimal_as_str).convert
+
+    def _gen():
+        try:
+            for row_number, row_values in raw_rows:
+                yield convert(row_number, row_values)
+        finally:
+            raw_rows.close()  # type: ignore[attr-defined]
+
+    return [], _gen()
+
+
+@dataclass(frozen=True)
+class ColumnBatch:
+    """Column-oriented chunk from `iter_column_batches`.
+
+    `columns[db_column][i]` is the converted value of the i-th row in the chunk;
+    `error_mask[i]` marks rows with errors, whose messages are in `errors[i]`.
+    """
+
+    row_numbers: list[int]
+    columns: dict[str, list[Any]]
+    error_mask: list[bool]
+    errors: dict[int, list[str]]
+
+    def __len__(self) -> int:
+        return len(self.row_numbers)
+
+
+def _numpy() -> Any | None:
+    try:
+        import numpy  # type: ignore[import-not-found]
+    except Exception:
+        return None
+    return numpy
+
+
+def _vectorized_numeric(stripped: list[str], typ: ColumnType, np: Any) -> list[Any]:
+    arr = np.asarray(stripped)
+    empty = arr == ""
+    has_empty = bool(empty.any())
+    if has_empty:
+        arr = np.where(empty, "0", arr)
+    out = arr.astype(np.int64 if typ == "int" else np.float64).tolist()
+    if has_empty:
+        for i in np.flatnonzero(empty).tolist():
+            out[i] = None
+    return out
+
+
+def _bulk_strings(raw: list[Any], c: ColumnMapping, np: Any | None) -> list[Any]:
+    # All-string columns (CSV, text cells) are converted with C-level constructors; raises on
+    # the first value that needs the per-value converter (non-str cell, "1,000", bad value...).
+    stripped = list(map(str.strip, raw))
+    typ = c.type
+    if typ == "str":
+        if c.max_length:
+            n = c.max_length
+            return [s[:n] if s else None for s in stripped]
+        return [s if s else None for s in stripped]
+    if typ == "decimal":
+        return [Decimal(s) if s else None for s in stripped]
+    if typ in {"int", "float"}:
+        if np is not None:
+            return _vectorized_numeric(stripped, typ, np)
+        f = int if typ == "int" else float
+        return [f(s) if s else None for s in stripped]
+    raise TypeError(f"no bulk path for {typ}")
+
+
+def _convert_column(
+    raw: list[Any],
+    c: ColumnMapping,
+    conv: Callable[[Any], Any],
+    np: Any | None,
+) -> tuple[list[Any], dict[int, str]]:
+    if c.type in {"str", "decimal", "int", "float"}:
+        try:
+            return _bulk_strings(raw, c, np), {}
+        except (AttributeError, TypeError, ValueError, ArithmeticError):
+            pass
+    try:
+        return [conv(v) for v in raw], {}
+    except Exception:
+        pass
+    values: list[Any] = []
+    failed: dict[int, str] = {}
+    for i, v in enumerate(raw):
+        try:
+            values.append(conv(v))
+        except Exception as e:
+            values.append(None)
+            failed[i] = str(e)
+    return values, failed
+
+
+def iter_column_batches(
+    excel_path: str,
+    excel_cfg: ExcelConfig,
+    columns: list[ColumnMapping],
+    batch_rows: int = 10000,
+    decimal_as_str: bool = False,
+) -> Iterator[ColumnBatch]:
+    """Columnar counterpart of `iter_rows`: same values/errors, converted a column at a time.
+
+    All-string `int`/`float` columns are parsed with NumPy when it is installed (pure-Python
+    otherwise); `decimal` always uses `Decimal` so no precision is lost.
+    """
+    if batch_rows <= 0:
+        raise ValueError("batch_rows must be > 0")
+    header_index, raw_rows = _open_source(excel_path, excel_cfg, columns)
+    plan = compile_row_plan(columns, header_index, decimal_as_str)
+    np = _numpy()
+
+    def _chunk(rows: list[tuple[int, Sequence[Any]]]) -> ColumnBatch:
+        row_numbers = [n for n, _ in rows]
+        # transpose once; short rows are padded with None like `RowPlan.convert`
+        raw_columns = list(itertools.zip_longest(*[r for _, r in rows]))
+        width = len(raw_columns)
+        out: dict[str, list[Any]] = {}
+        errors: dict[int, list[str]] = {}
+        for c, (idx, db_col, conv, default, required, name) in zip(columns, plan.steps):
+            raw = list(raw_columns[idx]) if idx < width else [None] * len(rows)
+            values, failed = _convert_column(raw, c, conv, np)
+            if decimal_as_str and c.type == "decimal":
+                values = [str(v) if v is not None else None for v in values]
+            for i, msg in failed.items():
+                errors.setdefault(i, []).append(f"{name} invalid: {msg}")
+            if default is not None or required:
+                for i, v in enumerate(values):
+                    if v is None and i not in failed:
+                        if default is not None:
+                            values[i] = default
+                        else:
+                            errors.setdefault(i, []).append(f"{name} required")
+            out[db_col] = values
+        if errors:
+            errors = {i: errors[i] for i in sorted(errors)}
+        return ColumnBatch(
+            row_numbers=row_numbers,
+            columns=out,
+            error_mask=[i in errors for i in range(len(row_numbers))],
+            errors=errors,
+        )
+
+    def _gen():
+        try:
+            buf: list[tuple[int, Sequence[Any]]] = []
+            for item in raw_rows:
+                buf.append(item)
+                if len(buf) >= batch_rows:
+                    yield _chunk(buf)
+                    buf = []
+            if buf:
+                yield _chunk(buf)
+        finally:
+            raw_rows.close()  # type: ignore[attr-defined]
+
+    return _gen()
+
+
+def _open_source(
+    excel_path: str,
+    excel_cfg: ExcelConfig,
+    columns: list[ColumnMapping],
+) -> tuple[dict[str, int], RawRows]:
+    """Resolve the header and return `(header_index, raw_rows)`; raw_rows yields
+    `(row_number, row_values)` from `start_row` on and closes the file when exhausted/closed."""
     suffix = Path(excel_path).suffix.lower()
     if suffix == ".csv":
-        return _iter_csv_rows(excel_path, excel_cfg, columns)
-    return _iter_xlsx_rows(excel_path, excel_cfg, columns)
+        return _csv_source(excel_path, excel_cfg, columns)
+    if excel_cfg.engine == "native":
+        return _xlsx_native_source(excel_path, excel_cfg, columns)
+    return _xlsx_source(excel_path, excel_cfg, columns)
+
+
+def _header_index(header_values: list[str]) -> dict[str, int]:
+    header_index: dict[str, int] = {}
+    for idx, name in enumerate(header_values):
+        if name and name not in header_index:
+            header_index[name] = idx
+    return header_index
+
 
+def _missing_headers(columns: list[ColumnMapping], header_index: dict[str, int]) -> list[str]:
+    return [c.excel for c in columns if c.excel not in header_index]
 
-def _iter_csv_rows(
+
+def _csv_source(
     file_path: str,
     cfg: ExcelConfig,
     columns: list[ColumnMapping],
-) -> tuple[list[str], Iterable[ParsedRow]]:
+) -> tuple[dict[str, int], RawRows]:
     header_row = cfg.header_row
     if header_row < 1 or cfg.start_row < 1:
         raise ExcelError("csv header_row/start_row must be >= 1")
@@ -159,15 +585,8 @@ def _iter_csv_rows(
         f.close()
         raise ExcelError(f"CSV header_row={header_row} out of range: {file_path}")
 
-    header_index: dict[str, int] = {}
-    for idx, name in enumerate(header_values):
-        if name and name not in header_index:
-            header_index[name] = idx
-
-    missing_headers: list[str] = []
-    for c in columns:
-        if c.excel not in header_index:
-            missing_headers.append(c.excel)
+    header_index = _header_index(header_values)
+    missing_headers = _missing_headers(columns, header_index)
     if missing_headers:
         f.close()
         raise ExcelError(f"Missing CSV headers: {missing_headers}")
@@ -177,35 +596,18 @@ def _iter_csv_rows(
             for row_no, row in rows:
                 if row_no < cfg.start_row:
                     continue
-                values: dict[str, Any] = {}
-                errors: list[str] = []
-                for c in columns:
-                    idx = header_index[c.excel]
-                    raw = row[idx] if idx < len(row) else None
-                    try:
-                        converted = convert_value(raw, c.type)
-                        if converted is None and c.default is not None:
-                            converted = c.default
-                        if converted is None and c.required:
-                            errors.append(f"{c.excel} required")
-                        if isinstance(converted, str) and c.max_length and len(converted) > c.max_length:
-                            converted = converted[: c.max_length]
-                        values[c.db] = converted
-                    except Exception as e:
-                        errors.append(f"{c.excel} invalid: {e}")
-                        values[c.db] = None
-                yield ParsedRow(row_number=row_no, values=values, errors=errors)
+                yield row_no, row
         finally:
             f.close()
 
-    return [], _gen()
+    return header_index, _gen()
 
 
-def _iter_xlsx_rows(
+def _xlsx_source(
     excel_path: str,
     excel_cfg: ExcelConfig,
     columns: list[ColumnMapping],
-) -> tuple[list[str], Iterable[ParsedRow]]:
+) -> tuple[dict[str, int], RawRows]:
     try:
         from openpyxl import load_workbook  # type: ignore[import-not-found]
     except Exception as e:
@@ -220,52 +622,73 @@ def _iter_xlsx_rows(
         ws = wb[excel_cfg.sheet] if excel_cfg.sheet else wb.active
     except KeyError as e:
         available = ", ".join(wb.sheetnames)
+        wb.close()
         raise ExcelError(
             f"Sheet not found: {excel_cfg.sheet!r}; available: {available}"
         ) from e
 
     header_row = excel_cfg.header_row
     header_cells = ws[header_row]
-    header_values = [str(c.value).strip() if c.value is not None else "" for c in header_cells]
-    header_index: dict[str, int] = {}
-    for idx, name in enumerate(header_values):
-        if name and name not in header_index:
-            header_index[name] = idx
-
-    missing_headers: list[str] = []
-    for c in columns:
-        if c.excel not in header_index:
-            missing_headers.append(c.excel)
+    header_index = _header_index([str(c.value).strip() if c.value is not None else "" for c in header_cells])
+    missing_headers = _missing_headers(columns, header_index)
     if missing_headers:
         wb.close()
         raise ExcelError(f"Missing Excel headers: {missing_headers}")
 
     def _gen():
         try:
-            for row_number, row_values in enumerate(
+            yield from enumerate(
                 ws.iter_rows(min_row=excel_cfg.start_row, values_only=True),
                 start=excel_cfg.start_row,
-            ):
-                values: dict[str, Any] = {}
-                errors: list[str] = []
-                for c in columns:
-                    idx = header_index[c.excel]
-                    raw = row_values[idx] if idx < len(row_values) else None
-                    try:
-                        converted = convert_value(raw, c.type)
-                        if converted is None and c.default is not None:
-                            converted = c.default
-                        if converted is None and c.required:
-                            errors.append(f"{c.excel} required")
-                        if isinstance(converted, str) and c.max_length and len(converted) > c.max_length:
-                            converted = converted[: c.max_length]
-                        values[c.db] = converted
-                    except Exception as e:
-                        errors.append(f"{c.excel} invalid: {e}")
-                        values[c.db] = None
-
-                yield ParsedRow(row_number=row_number, values=values, errors=errors)
+            )
+        finally:
+            wb.close()
+
+    return header_index, _gen()
+
+
+def _xlsx_native_source(
+    excel_path: str,
+    excel_cfg: ExcelConfig,
+    columns: list[ColumnMapping],
+) -> tuple[dict[str, int], RawRows]:
+    from .xlsx_native import NativeWorkbook
+
+    try:
+        wb = NativeWorkbook(excel_path)
+    except Exception as e:
+        raise ExcelError(f"Failed to read Excel file: {excel_path}: {e}") from e
+
+    try:
+        part = wb.sheet_part(excel_cfg.sheet)
+    except KeyError as e:
+        available = ", ".join(wb.sheetnames)
+        wb.close()
+        raise ExcelError(
+            f"Sheet not found: {excel_cfg.sheet!r}; available: {available}"
+        ) from e
+
+    header_values: list[str] = []
+    try:
+        for _, row_values in wb.iter_rows(part, min_row=excel_cfg.header_row):
+            header_values = [str(v).strip() if v is not None else "" for v in row_values]
+            break
+    except Exception as e:
+        wb.close()
+        raise ExcelError(f"Failed to read Excel file: {excel_path}: {e}") from e
+
+    header_index = _header_index(header_values)
+    missing_headers = _missing_headers(columns, header_index)
+    if missing_headers:
+        wb.close()
+        raise ExcelError(f"Missing Excel headers: {missing_headers}")
+
+    wanted = {header_index[c.excel] for c in columns}
+
+    def _gen():
+        try:
+            yield from wb.iter_rows(part, min_row=excel_cfg.start_row, columns=wanted)
         finally:
             wb.close()
 
-    return missing_headers, _gen()
+    return header_index, _gen()
@@ -3,28 +3,75 @@ from __future__ import annotations
 import csv
 import datetime as dt
 import logging
-import re
+import multiprocessing
+import queue
 import shutil
-from dataclasses import dataclass
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, TextIO
+from typing import Any, Callable, Iterable, Iterator, TextIO
 
-from .config import AppConfig, JobConfig
-from .db import Db, DbError, adapt_param_rows, connect, execute
-from .excel import ExcelError, ParsedRow, iter_rows
-from .meta import try_insert_batch_log
+from .batching import AUTO, AdaptiveBatchSize, load_batch_sizes, save_batch_size
+from .checkpoint import Checkpoint, clear_checkpoint, load_checkpoint, save_checkpoint
+from .config import AppConfig, ColumnMapping, ExcelConfig, JobConfig
+from .db import (
+    NUMERIC_TYPES,
+    SQL_VARCHAR,
+    ConnectionPool,
+    Db,
+    DbError,
+    JdbcBatchInsert,
+    Savepoint,
+    adapt_param_rows,
+    connect,
+    execute,
+    is_row_error,
+    numeric_rounder,
+    odbc_input_sizes,
+)
+from .ddl import (
+    IndexDef,
+    MergeCounts,
+    check_swappable,
+    create_merge_stage,
+    create_stage,
+    drop_secondary_indexes,
+    drop_stage,
+    merge_stage,
+    qualified,
+    rebuild_indexes,
+    restore_pending_indexes,
+    safe_ident,
+    swap_in,
+    table_columns,
+    table_indexes,
+)
+from .delta import RowHashStore
+from .excel import ExcelError, ParsedRow, iter_column_batches, iter_rows
+from .manifest import FileManifest, file_sha256
+from .meta import (
+    try_delete_load_checkpoint,
+    try_insert_batch_log,
+    try_insert_file_manifest,
+    try_write_load_checkpoint,
+)
+from .uniq import UniqueCheck
 
 
-_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+def _state_dir(config: AppConfig) -> Path:
+    return config.paths.state or (config.paths.root / "data/state")
 
 
-def _safe_ident(name: str) -> str:
-    # DM8 (and most SQL dialects) fold unquoted identifiers; quoting makes them case-sensitive.
-    # Keep simple identifiers unquoted even if they are lowercase, so `ods_xxx` works.
-    if _IDENT_RE.match(name):
-        return name
-    return '"' + name.replace('"', '""') + '"'
+def _archive_file(config: AppConfig, f: Path, tag: str) -> Path:
+    ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    archived = config.paths.archive / f"{f.stem}.{tag}.{ts}{f.suffix}"
+    shutil.move(str(f), str(archived))
+    return archived
 
 
 def _ensure_dirs(*paths: Path) -> None:
@@ -43,6 +90,12 @@ class LoadResult:
     bad_rows: int
     badrows_csv: Path | None
     archived_file: Path | None
+    # `mode: upsert` only: what the MERGE did with the ok rows
+    inserted_rows: int | None = None
+    updated_rows: int | None = None
+    unchanged_rows: int | None = None
+    # `delta_deletes` only: keys missing from the snapshot, deleted from the table
+    deleted_rows: int | None = None
 
 
 def _badrows_writer(
@@ -60,11 +113,584 @@ def _badrows_writer(
     return out, f, writer
 
 
+_STOP = object()
+
+
+class _PipelinedWriter:
+    """Runs `write(batch)` on a background thread fed through a bounded queue.
+
+    The calling thread keeps parsing while the previous batches are inserted; `put` blocks
+    once `depth` batches are waiting (backpressure). The first write error is re-raised on
+    the calling thread by the next `put`/`close`; batches queued after it are dropped.
+    """
+
+    def __init__(self, write: Callable[[Any], None], depth: int) -> None:
+        self._write = write
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=depth)
+        self._error: BaseException | None = None
+        self._abort = False
+        self.busy_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name="dm8-etl-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is _STOP:
+                return
+            # keep draining after a failure so a blocked `put` can't deadlock
+            if self._error is not None or self._abort:
+                continue
+            started = time.perf_counter()
+            try:
+                self._write(batch)
+            except BaseException as e:
+                self._error = e
+            self.busy_seconds += time.perf_counter() - started
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def put(self, batch: Any) -> None:
+        self._raise_if_failed()
+        self._queue.put(batch)
+
+    def close(self, abort: bool = False) -> None:
+        """Wait for queued batches (or drop them with `abort=True`) and stop the thread."""
+        if abort:
+            self._abort = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        if not abort:
+            self._raise_if_failed()
+
+
+# Parse workers send a file's rows in `_ParsedChunk`s of _PARSE_CHUNK_ROWS rows through a queue
+# holding at most _PARSE_QUEUE_CHUNKS of them, so a prefetched file costs a few chunks of memory
+# in the loader, not the whole file.
+_PARSE_CHUNK_ROWS = 5000
+_PARSE_QUEUE_CHUNKS = 2
+
+
+@dataclass(frozen=True)
+class _ParsedChunk:
+    """Consecutive rows of a file parsed in a worker process, in a compact picklable form.
+
+    `values[i]` is the parameter tuple of source row `row_numbers[i]`; `errors` only has
+    entries for failed rows. Fully empty mapped rows are already dropped.
+    """
+
+    row_numbers: list[int]
+    values: list[tuple[Any, ...]]
+    errors: dict[int, list[str]]
+
+    def rows(self) -> Iterator[ParsedRow]:
+        errors = self.errors
+        for i, (row_number, values) in enumerate(zip(self.row_numbers, self.values)):
+            if i in errors:
+                yield ParsedRow(row_number, values, errors[i])
+            else:
+                yield ParsedRow(row_number, values)
+
+
+def _send_chunk(out: Any, stop: Any, chunk: _ParsedChunk | None) -> bool:
+    # blocks while the queue is full; False once the loader gave up on the job (`stop` set)
+    while True:
+        try:
+            out.put(chunk, timeout=0.2)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
+
+
+def _parse_file(
+    path: str,
+    excel_cfg: ExcelConfig,
+    columns: list[ColumnMapping],
+    out: Any,
+    stop: Any,
+    chunk_rows: int = _PARSE_CHUNK_ROWS,
+) -> None:
+    # Runs in a parse worker process (must stay a picklable top-level function). Sends the
+    # rows to `out` chunk by chunk, then None (also after an error, which the future raises).
+    ncols = len(columns)
+    row_numbers: list[int] = []
+    values: list[tuple[Any, ...]] = []
+    errors: dict[int, list[str]] = {}
+    try:
+        # already inside a worker process: no nested CSV range pool
+        _, rows = iter_rows(path, replace(excel_cfg, csv_workers=1), columns, decimal_as_str=True)
+        for r in rows:
+            if r.values.count(None) == ncols:
+                continue
+            if r.errors:
+                errors[len(values)] = list(r.errors)
+            row_numbers.append(r.row_number)
+            values.append(r.values)
+            if len(values) >= chunk_rows:
+                if not _send_chunk(out, stop, _ParsedChunk(row_numbers, values, errors)):
+                    return
+                row_numbers, values, errors = [], [], {}
+        if values and not _send_chunk(out, stop, _ParsedChunk(row_numbers, values, errors)):
+            return
+    finally:
+        _send_chunk(out, stop, None)
+
+
+class _ParseJob:
+    # A file handed to a parse worker: its future and the queue its chunks arrive on.
+
+    def __init__(self, future: Future, chunks: Any) -> None:
+        self.future = future
+        self.chunks = chunks
+
+    def _result(self) -> None:
+        try:
+            self.future.result()
+        except ExcelError:
+            raise
+        except Exception as e:
+            # e.g. BrokenProcessPool: report it like any other unreadable file
+            raise ExcelError(f"Parse worker failed: {e}") from e
+
+    def next_chunk(self) -> _ParsedChunk | None:
+        """The next chunk, or None after the last; raises the worker's error as ExcelError."""
+        while True:
+            try:
+                chunk = self.chunks.get(timeout=0.2)
+            except queue.Empty:
+                if self.future.done():
+                    # a worker that died never sends its final None
+                    self._result()
+                    raise ExcelError("Parse worker stopped before the end of the file")
+                continue
+            if chunk is None:
+                self._result()
+            return chunk
+
+
+def _decimals_from_str(rows: Iterable[ParsedRow], columns: list[ColumnMapping]) -> Iterator[ParsedRow]:
+    idx = [i for i, c in enumerate(columns) if c.type == "decimal"]
+    for r in rows:
+        values = list(r.values)
+        for i in idx:
+            if isinstance(values[i], str):
+                values[i] = Decimal(values[i])
+        yield ParsedRow(r.row_number, tuple(values), r.errors)
+
+
+def _prefetch_files(
+    executor: ProcessPoolExecutor,
+    manager: Any,
+    stop: Any,
+    files: list[Path],
+    job: JobConfig,
+    ahead: int,
+) -> Iterator[_ParseJob]:
+    # Yields one parse job per file, in file order, keeping at most `ahead` further files queued;
+    # each worker blocks once its file's chunk queue is full.
+    def _submit(f: Path) -> _ParseJob:
+        chunks = manager.Queue(maxsize=_PARSE_QUEUE_CHUNKS)
+        return _ParseJob(executor.submit(_parse_file, str(f), job.excel, job.columns, chunks, stop), chunks)
+
+    pending: deque[_ParseJob] = deque()
+    remaining = iter(files)
+    for f in remaining:
+        pending.append(_submit(f))
+        if len(pending) > ahead:
+            break
+    while pending:
+        parsed = pending.popleft()
+        nxt = next(remaining, None)
+        if nxt is not None:
+            pending.append(_submit(nxt))
+        yield parsed
+
+
+def _parsed_rows(parsed: _ParseJob) -> Iterator[ParsedRow]:
+    # the first chunk is awaited here, so a file that can't be read at all fails up front
+    first = parsed.next_chunk()
+
+    def _rows() -> Iterator[ParsedRow]:
+        chunk = first
+        while chunk is not None:
+            yield from chunk.rows()
+            chunk = parsed.next_chunk()
+
+    return _rows()
+
+
+def _db_message(e: BaseException) -> str:
+    # first line of a driver error, as written to badrows
+    return str(e).strip().splitlines()[0][:500] if str(e).strip() else type(e).__name__
+
+
 def _truncate_table(db: Db, table: str) -> None:
     try:
-        execute(db, f"TRUNCATE TABLE {_safe_ident(table)}")
+        execute(db, f"TRUNCATE TABLE {qualified(table)}")
     except DbError:
-        execute(db, f"DELETE FROM {_safe_ident(table)}")
+        execute(db, f"DELETE FROM {qualified(table)}")
+
+
+def _delete_keys(db: Db, table: str, keys: tuple[str, ...], values: list[list[Any]]) -> None:
+    where = " AND ".join(f"{safe_ident(k)} = ?" for k in keys)
+    cur = db.cursor()
+    try:
+        cur.executemany(f"DELETE FROM {qualified(table)} WHERE {where}", [tuple(v) for v in values])
+    finally:
+        cur.close()
+    db.commit()
+
+
+class _BadRows:
+    # badrows CSV of one file, created on the first bad row; rows rejected by the DB are
+    # written from the writer thread, hence the lock
+    def __init__(self, config: AppConfig, excel_file: Path, job: JobConfig, batch_id: str, column_order: list[str]) -> None:
+        self.csv: Path | None = None
+        self._args = (config.paths.badrows, excel_file, job, batch_id, column_order)
+        self._column_order = column_order
+        self._file: TextIO | None = None
+        self._writer: csv.DictWriter | None = None
+        self._lock = threading.Lock()
+
+    def write(self, row_number: int, errors: list[str], values: Any) -> None:
+        with self._lock:
+            if self._writer is None:
+                self.csv, self._file, self._writer = _badrows_writer(*self._args)
+            record: dict[str, Any] = {
+                "__row__": row_number,
+                "__error__": "; ".join(errors),
+            }
+            for col, v in zip(self._column_order, values):
+                record[col] = v
+            self._writer.writerow(record)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class _Inserter:
+    # the executemany side of one load: a typed JDBC batch or an ODBC cursor on `insert_sql`,
+    # bisecting rejected batches behind a SAVEPOINT (on_batch_error=bisect) and committing
+    # `commit_every` checkpoints; runs on the pipeline's writer thread when there is one
+    def __init__(
+        self,
+        db: Db,
+        job: JobConfig,
+        insert_sql: str,
+        input_sizes: list[Any] | None,
+        bisect: bool,
+        sizer: AdaptiveBatchSize | None,
+        pipeline_depth: int,
+        bad_rows: _BadRows,
+        keep_rejected: bool,
+        checkpoints_file: Path,
+        logger: logging.Logger | logging.LoggerAdapter,
+    ) -> None:
+        self._db = db
+        self._job = job
+        self._sizer = sizer
+        self._pipeline_depth = pipeline_depth
+        self._bad_rows = bad_rows
+        self._keep_rejected = keep_rejected
+        self._checkpoints_file = checkpoints_file
+        self._logger = logger
+        self.rejected = 0
+        # rows the DB rejected, kept for `delta` to forget their hashes
+        self.rejected_rows: list[tuple[Any, ...]] = []
+        # cleared once etl_load_checkpoint can't be written (no meta tables)
+        self.meta_checkpoint = True
+        self._cur: Any | None = None
+        self._jdbc_insert: JdbcBatchInsert | None = None
+        self._savepoint: Savepoint | None = None
+        self._send: Callable[[list[tuple[Any, ...]]], None]
+        column_types = [c.type for c in job.columns]
+        if db.mode == "jdbc" and hasattr(db.conn, "jconn") and db.jdbc_adapter().jvm:
+            # typed addBatch/executeBatch on the java connection instead of jaydebeapi's executemany
+            self._jdbc_insert = JdbcBatchInsert(db, insert_sql, column_types)
+            self._send = self._jdbc_insert.executemany
+        else:
+            cur = db.cursor()
+            self._cur = cur
+            try:
+                cur.fast_executemany = True
+            except Exception:
+                pass
+            if input_sizes is not None:
+                try:
+                    cur.setinputsizes(input_sizes)
+                except Exception:
+                    pass
+
+            rounder = numeric_rounder(input_sizes) if input_sizes is not None else None
+
+            def _cursor_executemany(rows: list[tuple[Any, ...]]) -> None:
+                if rounder is not None:
+                    rows = [rounder(row) for row in rows]
+                cur.executemany(insert_sql, adapt_param_rows(db, rows, column_types))
+
+            self._send = _cursor_executemany
+        if bisect:
+            self._savepoint = Savepoint(db)
+
+    def _try_send(self, rows: list[tuple[Any, ...]]) -> Exception | None:
+        # the row-level error that rejected `rows` (undone to the savepoint), or None
+        self._savepoint.set()  # type: ignore[union-attr]
+        try:
+            self._send(rows)
+            return None
+        except Exception as e:
+            self._savepoint.rollback()  # type: ignore[union-attr]
+            if not is_row_error(e):
+                raise
+            return e
+
+    def _bisect(self, rows: list[tuple[Any, ...]], row_numbers: list[int], error: Exception) -> None:
+        # `rows` failed with `error`; one bad row costs ~2*log2(len(rows)) extra round-trips
+        if len(rows) == 1:
+            message = _db_message(error)
+            self._logger.warning("table=%s row=%s rejected by DB: %s", self._job.table, row_numbers[0], message)
+            self._bad_rows.write(row_numbers[0], [f"DB: {message}"], rows[0])
+            self.rejected += 1
+            if self._keep_rejected:
+                self.rejected_rows.append(rows[0])
+            return
+        mid = len(rows) // 2
+        for part, part_numbers in ((rows[:mid], row_numbers[:mid]), (rows[mid:], row_numbers[mid:])):
+            part_error = self._try_send(part)
+            if part_error is not None:
+                self._bisect(part, part_numbers, part_error)
+
+    def _send_or_bisect(self, rows: list[tuple[Any, ...]], row_numbers: list[int]) -> None:
+        error = self._try_send(rows)
+        if error is None:
+            return
+        if len(rows) == 1:
+            self._bisect(rows, row_numbers, error)
+            return
+        mid = len(rows) // 2
+        halves = ((rows[:mid], row_numbers[:mid]), (rows[mid:], row_numbers[mid:]))
+        errors = [self._try_send(part) for part, _ in halves]
+        if errors[0] is not None and errors[1] is not None and _db_message(errors[0]) == _db_message(errors[1]):
+            # the whole batch is refused (missing column, privilege, every row bad): not a few rows
+            raise DbError(
+                f"table={self._job.table}: both halves of a {len(rows)}-row batch fail with the same error, "
+                f"not isolating rows: {_db_message(errors[1])}"
+            ) from errors[1]
+        for (part, part_numbers), part_error in zip(halves, errors):
+            if part_error is not None:
+                self._bisect(part, part_numbers, part_error)
+
+    def _send_batch(self, rows: list[tuple[Any, ...]], row_numbers: list[int] | None) -> None:
+        if row_numbers is None:
+            self._send(rows)
+        else:
+            self._send_or_bisect(rows, row_numbers)
+
+    def executemany(self, rows: list[tuple[Any, ...]], row_numbers: list[int] | None = None) -> None:
+        sizer = self._sizer
+        if sizer is None:
+            self._send_batch(rows, row_numbers)
+            return
+        if sizer.samples == 0:
+            sizer.limit_memory(rows[:100], batches_in_flight=self._pipeline_depth + 1)
+        started = time.perf_counter()
+        self._send_batch(rows, row_numbers)
+        sizer.observe(len(rows), time.perf_counter() - started)
+
+    def commit_chunk(self, cp: Checkpoint) -> None:
+        # the checkpoint row commits atomically with the rows it covers
+        job = self._job
+        cp = replace(cp, ok_rows=cp.ok_rows - self.rejected, bad_rows=cp.bad_rows + self.rejected)
+        if self.meta_checkpoint:
+            self.meta_checkpoint = try_write_load_checkpoint(
+                self._db, job_name=job.name, table_name=job.table, checkpoint=cp, logger=self._logger
+            )
+        self._db.commit()
+        save_checkpoint(self._checkpoints_file, job.name, cp)
+        self._logger.debug("checkpoint table=%s row=%s ok=%s", job.table, cp.row_number, cp.ok_rows)
+
+    def write(self, item: tuple[list[tuple[Any, ...]], list[int] | None] | Checkpoint) -> None:
+        if isinstance(item, Checkpoint):
+            self.commit_chunk(item)
+        else:
+            self.executemany(*item)
+
+    def close(self) -> None:
+        if self._cur is not None:
+            self._cur.close()
+        if self._jdbc_insert is not None:
+            self._jdbc_insert.close()
+        if self._savepoint is not None:
+            self._savepoint.close()
+
+
+def _input_sizes(db: Db, job: JobConfig, logger: logging.Logger | logging.LoggerAdapter) -> tuple[list[Any] | None, bool]:
+    # ODBC: typed setinputsizes so fast_executemany doesn't sniff types per batch. Decimal
+    # columns are bound as NUMBER(p,s) when the catalog gives precision/scale; otherwise
+    # Decimal -> str at conversion time (keeps precision; DM will cast to NUMBER). Either way
+    # parsed value tuples are already executemany parameter rows. Returns the sizes and
+    # whether decimals are parsed as str.
+    if db.mode != "odbc":
+        return None, True
+    input_sizes = odbc_input_sizes(db, job.table, job.columns)
+    decimal_as_str = True
+    decimal_sizes = [size for size, c in zip(input_sizes, job.columns) if c.type == "decimal"]
+    if decimal_sizes and all(size is not None and size[0] in NUMERIC_TYPES for size in decimal_sizes):
+        decimal_as_str = False
+    else:
+        # str values under a NUMERIC binding make the driver convert them per value: bind
+        # those columns as VARCHAR wide enough for precision digits, sign and point
+        input_sizes = [
+            (SQL_VARCHAR, size[1] + 2, 0) if c.type == "decimal" and size is not None and size[0] in NUMERIC_TYPES else size
+            for size, c in zip(input_sizes, job.columns)
+        ]
+    logger.debug("input sizes table=%s %s", job.table, input_sizes)
+    return input_sizes, decimal_as_str
+
+
+def _resume_point(
+    checkpoints_file: Path,
+    job: JobConfig,
+    excel_file: Path,
+    file_digest: str,
+    resume: bool,
+    logger: logging.Logger | logging.LoggerAdapter,
+) -> Checkpoint | None:
+    # the checkpoint a failed load of this file content left, if `resume` may use it
+    previous = load_checkpoint(checkpoints_file, job.name, file_digest)
+    if previous is not None and resume:
+        logger.info(
+            "resume table=%s file=%s after row=%s (committed by batch=%s)",
+            job.table,
+            excel_file,
+            previous.row_number,
+            previous.batch_id,
+        )
+        return previous
+    if previous is not None:
+        logger.warning(
+            "table=%s file=%s was committed up to row=%s by batch=%s; loading from row 1 (use --resume to skip them)",
+            job.table,
+            excel_file,
+            previous.row_number,
+            previous.batch_id,
+        )
+    return None
+
+
+@dataclass
+class _Target:
+    # where one load inserts, per `job.mode`: the table itself or a `__stg` stage
+    table: str
+    stage: str | None = None
+    # swap: the live table's indexes, built on the stage before the rename
+    stage_indexes: list[IndexDef] = field(default_factory=list)
+    # truncate + rebuild_indexes: indexes dropped for the load, rebuilt in `finally`
+    indexes_file: Path | None = None
+    dropped_indexes: list[IndexDef] = field(default_factory=list)
+
+
+def _prepare_target(
+    db: Db,
+    config: AppConfig,
+    job: JobConfig,
+    column_order: list[str],
+    resumed: Checkpoint | None,
+    logger: logging.Logger | logging.LoggerAdapter,
+) -> _Target:
+    target = _Target(table=job.table)
+    if job.mode == "truncate":
+        if job.rebuild_indexes:
+            target.indexes_file = _state_dir(config) / "indexes" / f"{job.table}.sql"
+            # indexes a killed run left dropped; raises (before truncating) if they can't be rebuilt
+            restore_pending_indexes(db, job.table, target.indexes_file, logger)
+        if resumed is None:
+            logger.info("truncate table=%s", job.table)
+            _truncate_table(db, job.table)
+    elif job.mode == "swap":
+        # load into an unindexed shadow table; the live table stays readable until the swap
+        check_swappable(db, job.table, logger)
+        target.stage_indexes = table_indexes(db, job.table)
+        target.stage = create_stage(db, job.table)
+        logger.info("swap table=%s stage=%s indexes=%s", job.table, target.stage, len(target.stage_indexes))
+    elif job.mode == "upsert":
+        # bulk-load a column-only stage, then one MERGE on job.keys
+        target.stage = create_merge_stage(db, job.table, column_order)
+        logger.info("upsert table=%s stage=%s keys=%s", job.table, target.stage, ",".join(job.keys))
+    if target.stage is not None:
+        target.table = target.stage
+    return target
+
+
+def _finish_target(
+    db: Db,
+    config: AppConfig,
+    job: JobConfig,
+    target: _Target,
+    column_order: list[str],
+    ok: int,
+    delta: RowHashStore | None,
+    logger: logging.Logger | logging.LoggerAdapter,
+) -> MergeCounts | None:
+    # after the commit: swap the stage in or MERGE it into the table (upsert counts)
+    stage = target.stage
+    if stage is None:
+        return None
+    if job.mode == "swap":
+        swap_in(db, job.table, stage, target.stage_indexes, logger, parallel=config.odbc.index_parallel)
+        target.stage = None
+        return None
+    if delta is not None and delta.skipped == ok:
+        merged = MergeCounts(inserted=0, updated=0, unchanged=0)  # nothing changed: no MERGE
+    else:
+        # rows merged into the table get a fresh etl_time (change tracking for MDM/ADS)
+        touch = None
+        if "etl_time" not in column_order and "ETL_TIME" in table_columns(db, job.table):
+            touch = "etl_time"
+        merged = merge_stage(db, job.table, stage, column_order, job.keys, touch=touch)
+    if delta is not None:
+        merged = replace(merged, unchanged=merged.unchanged + delta.skipped)
+    logger.info(
+        "upsert table=%s inserted=%s updated=%s unchanged=%s",
+        job.table,
+        merged.inserted,
+        merged.updated,
+        merged.unchanged,
+    )
+    drop_stage(db, stage)
+    target.stage = None
+    return merged
+
+
+def _finish_delta(
+    db: Db,
+    job: JobConfig,
+    delta: RowHashStore,
+    unkeyed_bad: int,
+    logger: logging.Logger | logging.LoggerAdapter,
+) -> int | None:
+    # `delta_deletes`: delete keys missing from the snapshot; then keep the new hashes
+    deleted: int | None = None
+    if job.delta_deletes and unkeyed_bad:
+        logger.warning(
+            "delta table=%s: key of %s bad row(s) unreadable; no deletes this run",
+            job.table,
+            unkeyed_bad,
+        )
+    elif job.delta_deletes:
+        gone = delta.missing_keys()
+        if gone:
+            _delete_keys(db, job.table, job.keys, gone)
+            delta.forget(gone)
+        deleted = len(gone)
+        logger.info("delta table=%s deleted=%s", job.table, deleted)
+    # only now (table committed) are the new hashes true
+    delta.commit()
+    return deleted
 
 
 def load_job_file(
@@ -73,10 +699,34 @@ def load_job_file(
     job: JobConfig,
     excel_file: Path,
     batch_id: str,
-    batch_size: int = 1000,
+    batch_size: int | str = 1000,
     dry_run: bool = False,
-    logger: logging.Logger | None = None,
+    logger: logging.Logger | logging.LoggerAdapter | None = None,
+    pipeline_depth: int = 0,
+    rows: Iterable[ParsedRow] | None = None,
+    commit_every: int = 0,
+    resume: bool = False,
+    sha256: str | None = None,
 ) -> LoadResult:
+    """Load one file into `job.table` in a single transaction.
+
+    With `pipeline_depth > 0` the executemany calls run on a writer thread while this thread
+    keeps parsing, with at most `pipeline_depth` batches queued in between. `rows` supplies
+    already parsed rows of `excel_file` (from a parse worker) instead of reading it here.
+    `batch_size="auto"` tunes the batch from measured rows/s within the `db.batch_size_min`,
+    `db.batch_size_max` and `db.batch_memory_mb` bounds, starting from the size the table
+    settled on last time. `swap` and `upsert` jobs load into `<table>__stg` and then rename it
+    into place or MERGE it on `job.keys` (see `etl.ddl`).
+
+    With `db.on_batch_error: bisect` a batch the DB rejects is split in halves (each retried
+    behind a SAVEPOINT) until the offending rows are isolated; those go to badrows with the DB
+    message and the rest is inserted.
+
+    `commit_every > 0` (append/truncate) commits after every N batches instead and records a
+    checkpoint of the last committed source row; with `resume=True` a checkpoint left by a
+    failed load of the same file content skips the rows it covers (see `etl.checkpoint`).
+    `sha256` is the file's digest if the caller already computed it (the manifest does).
+    """
     logger = logger or logging.getLogger(__name__)
     _ensure_dirs(config.paths.badrows, config.paths.archive, config.paths.logs)
 
@@ -86,89 +736,299 @@ def load_job_file(
         assert db is not None
 
     column_order = [c.db for c in job.columns]
-    _, rows_iter = iter_rows(str(excel_file), job.excel, job.columns)
-    badrows_csv: Path | None = None
-    badrows_file = None
-    badrows_dict_writer: csv.DictWriter | None = None
+    ncols = len(column_order)
+    sizer: AdaptiveBatchSize | None = None
+    sizes_file = _state_dir(config) / "batch_size.json"
+    if batch_size == AUTO:
+        sizer = AdaptiveBatchSize(
+            min_size=config.odbc.batch_size_min,
+            max_size=config.odbc.batch_size_max,
+            start=load_batch_sizes(sizes_file).get(job.table),
+            max_bytes=config.odbc.batch_memory_mb * 1024 * 1024,
+        )
+        batch_size = sizer.size
+        logger.info("batch-size auto table=%s start=%s", job.table, batch_size)
+    if not isinstance(batch_size, int) or batch_size <= 0:
+        raise ValueError(f"batch_size must be a positive int or {AUTO!r}, got {batch_size!r}")
+    input_sizes, decimal_as_str = (None, True) if dry_run else _input_sizes(db, job, logger)  # type: ignore[arg-type]
+    checkpoints_file = _state_dir(config) / "checkpoints.json"
+    chunked = commit_every > 0 and not dry_run and job.mode in {"append", "truncate"}
+    if commit_every > 0 and not dry_run and not chunked:
+        logger.info("commit_every ignored for table=%s mode=%s", job.table, job.mode)
+    file_digest = ""
+    resumed: Checkpoint | None = None
+    if chunked:
+        file_digest = sha256 or file_sha256(excel_file)
+        resumed = _resume_point(checkpoints_file, job, excel_file, file_digest, resume, logger)
+    resume_after = resumed.row_number if resumed is not None else 0
+    rows_iter: Iterable[ParsedRow] | None
+    if rows is not None:
+        # parse workers always yield decimals as str
+        rows_iter = rows if decimal_as_str else _decimals_from_str(rows, job.columns)
+    elif job.excel.columnar:
+        rows_iter = None
+        batches_iter = iter_column_batches(
+            str(excel_file), job.excel, job.columns, batch_rows=batch_size, decimal_as_str=decimal_as_str
+        )
+    else:
+        _, rows_iter = iter_rows(str(excel_file), job.excel, job.columns, decimal_as_str=decimal_as_str)
+    bad_rows = _BadRows(config, excel_file, job, batch_id, column_order)
 
-    if job.mode == "truncate" and not dry_run:
-        logger.info("truncate table=%s", job.table)
-        _truncate_table(db, job.table)
+    target = _Target(table=job.table) if dry_run else _prepare_target(db, config, job, column_order, resumed, logger)  # type: ignore[arg-type]
+    merged: MergeCounts | None = None
+    delta: RowHashStore | None = None
+    deleted: int | None = None
+    if job.delta and not dry_run:
+        delta = RowHashStore(
+            _state_dir(config) / "rowhash" / f"{job.table}.sqlite",
+            [column_order.index(k) for k in job.keys],
+            track_seen=job.delta_deletes,
+        )
 
-    cols_sql = ", ".join(_safe_ident(c) for c in column_order)
+    cols_sql = ", ".join(safe_ident(c) for c in column_order)
     placeholders = ", ".join(["?"] * len(column_order))
-    insert_sql = f"INSERT INTO {_safe_ident(job.table)} ({cols_sql}) VALUES ({placeholders})"
+    insert_sql = f"INSERT INTO {qualified(target.table)} ({cols_sql}) VALUES ({placeholders})"
 
-    total = 0
-    ok = 0
-    bad = 0
+    total = resumed.total_rows if resumed is not None else 0
+    ok = resumed.ok_rows if resumed is not None else 0
+    bad = resumed.bad_rows if resumed is not None else 0
     batch: list[tuple[Any, ...]] = []
+    sent = 0  # batches since the last commit (commit_every)
+    # on_batch_error=bisect: source row numbers parallel to `batch`, rows the DB rejected
+    numbers: list[int] | None = [] if config.odbc.on_batch_error == "bisect" and not dry_run else None
+    # `unique:` keys: duplicates within the file go to badrows before any insert
+    unique_keys = job.unique
+    if job.mode == "upsert" and job.keys not in unique_keys:
+        # MERGE fails when a target row matches two stage rows: keep the first, badrow the rest
+        unique_keys = (*unique_keys, job.keys)
+    # a Bloom false positive on the upsert key would silently drop a good row: always exact
+    exact_keys = (job.keys,) if job.mode == "upsert" else ()
+    unique = UniqueCheck(unique_keys, column_order, job.unique_bloom, exact_keys) if unique_keys else None
 
-    cur: Any | None = None
+    inserter: _Inserter | None = None
+    writer: _PipelinedWriter | None = None
+    flush: Callable[[list[tuple[Any, ...]], list[int] | None], None] | None = None
     if not dry_run:
-        cur = db.cursor()  # type: ignore[union-attr]
-        try:
-            cur.fast_executemany = True
-        except Exception:
-            pass
+        inserter = _Inserter(
+            db,  # type: ignore[arg-type]
+            job,
+            insert_sql,
+            input_sizes,
+            bisect=numbers is not None,
+            sizer=sizer,
+            pipeline_depth=pipeline_depth,
+            bad_rows=bad_rows,
+            keep_rejected=delta is not None,
+            checkpoints_file=checkpoints_file,
+            logger=logger,
+        )
+        flush = inserter.executemany
+        if pipeline_depth > 0:
+            pipelined = _PipelinedWriter(inserter.write, depth=pipeline_depth)
+            writer = pipelined
+            flush = lambda rows, row_numbers: pipelined.put((rows, row_numbers))  # noqa: E731
+
+    def _checkpoint(row_number: int) -> None:
+        # queued behind the batches it covers when pipelined
+        cp = Checkpoint(
+            sha256=file_digest,
+            source_file=excel_file.name,
+            batch_id=batch_id,
+            row_number=row_number,
+            total_rows=total,
+            ok_rows=ok,
+            bad_rows=bad,
+        )
+        if writer is not None:
+            writer.put(cp)
+        else:
+            inserter.commit_chunk(cp)  # type: ignore[union-attr]
+
+    unkeyed_bad = 0  # delta_deletes: bad rows whose key cell failed to parse
+    key_invalid = tuple(f"{c.excel} invalid" for c in job.columns if c.db in job.keys)
+
+    def _see_bad_row(values: Any, errors: Iterable[str]) -> None:
+        # a bad row is still part of the snapshot: its key must not count as deleted
+        nonlocal unkeyed_bad
+        if delta is None or not job.delta_deletes or delta.see(values):
+            return
+        # a blank key matches no table row; an unparseable one might be any of them
+        if any(e.startswith(key_invalid) for e in errors):
+            unkeyed_bad += 1
 
     try:
-        for r in rows_iter:
-            # skip fully empty mapped rows
-            if all(v is None for v in r.values.values()):
-                continue
+        if target.indexes_file is not None:
+            # insert without index maintenance; rebuilt in one pass below (also on failure)
+            drop_secondary_indexes(db, job.table, target.indexes_file, target.dropped_indexes, logger)  # type: ignore[arg-type]
+        if rows_iter is None:
+            for cb in batches_iter:
+                # resume: skip rows covered by the checkpoint
+                first = bisect_right(cb.row_numbers, resume_after) if resume_after else 0
+                if first >= len(cb.row_numbers) and unique is None:
+                    continue
+                # executemany params straight from the column chunk
+                rows = list(zip(*[cb.columns[c] for c in column_order]))
+                empty = [i for i, row in enumerate(rows) if row.count(None) == ncols]
+                # delta only exists for upsert, which always has a unique check
+                if not empty and not cb.errors and not first and unique is None and delta is None:
+                    total += len(rows)
+                    ok += len(rows)
+                    if not dry_run:
+                        batch.extend(rows)
+                        if numbers is not None:
+                            numbers.extend(cb.row_numbers)
+                else:
+                    skip = set(empty)
+                    for i, row in enumerate(rows):
+                        # skip fully empty mapped rows
+                        if i in skip:
+                            continue
+                        if i < first:
+                            # committed before the resume: its key is still taken
+                            if unique is not None and not cb.error_mask[i]:
+                                unique.check(row)
+                            continue
+                        total += 1
+                        dup = unique.check(row) if unique is not None and not cb.error_mask[i] else None
+                        if cb.error_mask[i] or dup:
+                            bad += 1
+                            _see_bad_row(row, [dup] if dup else cb.errors[i])
+                            bad_rows.write(
+                                cb.row_numbers[i],
+                                [dup] if dup else cb.errors[i],
+                                [cb.columns[c][i] for c in column_order],
+                            )
+                        else:
+                            ok += 1
+                            if not dry_run and (delta is None or delta.changed(row)):
+                                batch.append(row)
+                                if numbers is not None:
+                                    numbers.append(cb.row_numbers[i])
+                while flush is not None and len(batch) >= batch_size:
+                    flush(batch[:batch_size], numbers[:batch_size] if numbers is not None else None)
+                    del batch[:batch_size]
+                    if numbers is not None:
+                        del numbers[:batch_size]
+                    sent += 1
+                    if sizer is not None:
+                        batch_size = sizer.size
+                if chunked and sent >= commit_every:
+                    # checkpoints fall on chunk boundaries: send the partial batch too
+                    if batch:
+                        flush(batch, numbers)  # type: ignore[misc]
+                        batch = []
+                        numbers = [] if numbers is not None else None
+                    _checkpoint(cb.row_numbers[-1])
+                    sent = 0
+        else:
+            for r in rows_iter:
+                if r.row_number <= resume_after:
+                    # committed before the resume: its key is still taken
+                    if unique is not None and not r.errors and r.values.count(None) != ncols:
+                        unique.check(r.values)
+                    continue
+                values = r.values
+                # skip fully empty mapped rows
+                if values.count(None) == ncols:
+                    continue
 
-            total += 1
-            if r.ok:
-                ok += 1
-                if not dry_run:
-                    vals: list[Any] = []
-                    for c in column_order:
-                        v = r.values[c]
-                        if isinstance(v, Decimal):
-                            v = str(v)  # keeps precision; DM will cast to NUMBER
-                        vals.append(v)
-                    batch.append(tuple(vals))
-                    if len(batch) >= batch_size:
-                        cur.executemany(insert_sql, adapt_param_rows(db, batch))
-                        batch.clear()
-            else:
-                bad += 1
-                if badrows_dict_writer is None:
-                    badrows_csv, badrows_file, badrows_dict_writer = _badrows_writer(
-                        config.paths.badrows, excel_file, job, batch_id, column_order
-                    )
-                record: dict[str, Any] = {
-                    "__row__": r.row_number,
-                    "__error__": "; ".join(r.errors),
-                }
-                for col in column_order:
-                    record[col] = r.values.get(col)
-                badrows_dict_writer.writerow(record)
-
-        if not dry_run and batch:
-            cur.executemany(insert_sql, adapt_param_rows(db, batch))
-            batch.clear()
+                total += 1
+                errors = r.errors
+                if not errors and unique is not None:
+                    dup = unique.check(values)
+                    if dup:
+                        errors = [dup]
+                if not errors:
+                    ok += 1
+                    if flush is not None and (delta is None or delta.changed(values)):
+                        batch.append(values)
+                        if numbers is not None:
+                            numbers.append(r.row_number)
+                        if len(batch) >= batch_size:
+                            flush(batch, numbers)
+                            batch = []
+                            numbers = [] if numbers is not None else None
+                            if sizer is not None:
+                                batch_size = sizer.size
+                            sent += 1
+                            if chunked and sent >= commit_every:
+                                _checkpoint(r.row_number)
+                                sent = 0
+                else:
+                    bad += 1
+                    _see_bad_row(values, errors)
+                    bad_rows.write(r.row_number, errors, values)
+
+        if flush is not None and batch:
+            flush(batch, numbers)
+            batch = []
+        if writer is not None:
+            pending, writer = writer, None
+            pending.close()
+            logger.debug("pipeline table=%s writer_busy=%.3fs", job.table, pending.busy_seconds)
+        rejected = inserter.rejected if inserter is not None else 0
+        if rejected:
+            ok -= rejected
+            bad += rejected
+            logger.warning("table=%s rows rejected by DB=%s (see badrows)", job.table, rejected)
+            if delta is not None:
+                delta.discard(inserter.rejected_rows)  # type: ignore[union-attr]
         if not dry_run:
             db.commit()
+        if chunked:
+            # the file is complete: nothing left to resume
+            clear_checkpoint(checkpoints_file, job.name, file_digest)
+            if inserter.meta_checkpoint:  # type: ignore[union-attr]
+                try_delete_load_checkpoint(db, job_name=job.name, sha256=file_digest, logger=logger)  # type: ignore[arg-type]
+        if not dry_run:
+            merged = _finish_target(db, config, job, target, column_order, ok, delta, logger)  # type: ignore[arg-type]
+        if delta is not None:
+            deleted = _finish_delta(db, job, delta, unkeyed_bad, logger)  # type: ignore[arg-type]
+        if sizer is not None and sizer.samples:
+            logger.info(
+                "batch-size settled table=%s size=%s rows_per_sec=%.0f samples=%s",
+                job.table,
+                sizer.settled,
+                sizer.best_rate,
+                sizer.samples,
+            )
+            save_batch_size(sizes_file, job.table, sizer.settled, sizer.best_rate)
     except Exception as e:
+        if writer is not None:
+            # stop the writer before rolling back on this thread
+            writer.close(abort=True)
+            writer = None
         if not dry_run:
             try:
                 db.rollback()
             except Exception:
                 pass
+        if target.stage is not None:
+            drop_stage(db, target.stage)  # type: ignore[arg-type]
+        if delta is not None:
+            delta.rollback()
         raise DbError(f"Insert failed: {e}") from e
     finally:
-        if cur is not None:
-            cur.close()
-        if badrows_file is not None:
-            badrows_file.close()
+        if writer is not None:
+            writer.close(abort=True)
+        if inserter is not None:
+            inserter.close()
+        if target.dropped_indexes:
+            rebuild_indexes(
+                db,  # type: ignore[arg-type]
+                job.table,
+                target.dropped_indexes,
+                target.indexes_file,  # type: ignore[arg-type]
+                logger,
+                parallel=config.odbc.index_parallel,
+            )
+        if delta is not None:
+            delta.close()
+        bad_rows.close()
 
     archived: Path | None = None
     if not dry_run:
-        ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-        archived = config.paths.archive / f"{excel_file.stem}.{batch_id}.{ts}{excel_file.suffix}"
-        shutil.move(str(excel_file), str(archived))
+        archived = _archive_file(config, excel_file, batch_id)
         logger.info("archived %s -> %s", excel_file, archived)
 
     return LoadResult(
@@ -179,19 +1039,266 @@ def load_job_file(
         total_rows=total,
         ok_rows=ok,
         bad_rows=bad,
-        badrows_csv=badrows_csv,
+        badrows_csv=bad_rows.csv,
         archived_file=archived,
+        inserted_rows=merged.inserted if merged is not None else None,
+        updated_rows=merged.updated if merged is not None else None,
+        unchanged_rows=merged.unchanged if merged is not None else None,
+        deleted_rows=deleted,
     )
 
 
+class LoadError(RuntimeError):
+    """Raised by a parallel `load_ods` after all jobs ran and at least one failed.
+
+    `results` holds the files that did load; `failures` maps job name -> error.
+    """
+
+    def __init__(self, results: list[LoadResult], failures: dict[str, Exception]) -> None:
+        super().__init__("; ".join(f"{name}: {e}" for name, e in failures.items()))
+        self.results = results
+        self.failures = failures
+
+
+class _JobLogger(logging.LoggerAdapter):
+    # Prefixes each line with the job name so interleaved worker logs stay readable.
+    def process(self, msg: Any, kwargs: Any) -> tuple[Any, Any]:
+        return f"[{self.extra['job']}] {msg}", kwargs
+
+
+def _load_job(
+    db: Db | None,
+    config: AppConfig,
+    job: JobConfig,
+    batch_size: int | str,
+    dry_run: bool,
+    batch_id: str,
+    logger: logging.Logger | logging.LoggerAdapter,
+    pipeline_depth: int,
+    commit_every: int = 0,
+    resume: bool = False,
+) -> list[LoadResult]:
+    results: list[LoadResult] = []
+    files = sorted(Path(config.paths.inbox).glob(job.excel.pattern))
+    if not files:
+        logger.warning("no files matched inbox=%s pattern=%s", config.paths.inbox, job.excel.pattern)
+        return results
+    manifest: FileManifest | None = None
+    digests: dict[Path, tuple[str, int]] = {}
+    if config.manifest.enabled:
+        manifest = FileManifest(_state_dir(config) / "manifest.sqlite")
+        try:
+            digests = _new_files(manifest, config, job, files, batch_id, dry_run, logger)
+        except Exception:
+            manifest.close()
+            raise
+        files = list(digests)
+        if not files:
+            manifest.close()
+            return results
+    if job.delta_deletes and len(files) > 1:
+        # each file would be taken as the full snapshot and delete the other files' keys
+        if manifest is not None:
+            manifest.close()
+        raise ValueError(
+            f"job {job.name}: delta_deletes needs exactly one file per run, matched {len(files)}: "
+            + ", ".join(f.name for f in files)
+        )
+
+    # Multiple files: parse them in worker processes ahead of the (in-order) inserts here.
+    executor: ProcessPoolExecutor | None = None
+    manager: Any | None = None
+    stop: Any | None = None
+    parsed: Iterable[_ParseJob | None] = [None] * len(files)
+    parse_workers = min(job.excel.parse_workers, len(files))
+    if parse_workers > 1:
+        logger.info("parse job=%s files=%s parse_workers=%s", job.name, len(files), parse_workers)
+        # spawn: never fork a process that may be running writer/job threads
+        context = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(max_workers=parse_workers, mp_context=context)
+        # chunk queues and the stop flag live in a manager process: plain mp queues can't be
+        # passed to pool tasks
+        manager = context.Manager()
+        stop = manager.Event()
+        parsed = _prefetch_files(executor, manager, stop, files, job, ahead=parse_workers)
+    try:
+        for f, parsed_file in zip(files, parsed):
+            results.append(
+                _load_file(
+                    db,
+                    config,
+                    job,
+                    f,
+                    parsed_file,
+                    batch_size,
+                    dry_run,
+                    batch_id,
+                    logger,
+                    pipeline_depth,
+                    commit_every,
+                    resume,
+                    sha256=digests[f][0] if f in digests else None,
+                )
+            )
+            if manifest is not None and not dry_run:
+                digest, size = digests[f]
+                manifest.record(job.name, digest, batch_id, f, size)
+                if config.manifest.meta_table and db is not None:
+                    try_insert_file_manifest(
+                        db,
+                        job_name=job.name,
+                        sha256=digest,
+                        batch_id=batch_id,
+                        source_file=f,
+                        file_size=size,
+                        loaded_at=dt.datetime.now(),
+                        logger=logger,
+                    )
+    finally:
+        if stop is not None:
+            # workers still blocked on a full queue give up instead of waiting for a reader
+            stop.set()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
+        if manifest is not None:
+            manifest.close()
+    return results
+
+
+def _new_files(
+    manifest: FileManifest,
+    config: AppConfig,
+    job: JobConfig,
+    files: list[Path],
+    batch_id: str,
+    dry_run: bool,
+    logger: logging.Logger | logging.LoggerAdapter,
+) -> dict[Path, tuple[str, int]]:
+    """The files whose content `job` hasn't loaded yet, in order, with their (sha256, size).
+
+    Already loaded files are left in the inbox or archived (`manifest.duplicates`); a second
+    copy of a file in the same inbox is left for the next run.
+    """
+    out: dict[Path, tuple[str, int]] = {}
+    pending: set[str] = set()
+    for f in files:
+        digest, size = manifest.digest(f)
+        loaded = manifest.loaded(job.name, digest)
+        if loaded is None and digest not in pending:
+            pending.add(digest)
+            out[f] = (digest, size)
+            continue
+        if loaded is None:
+            logger.info("skip file=%s: same content as another file in this run", f)
+        elif config.manifest.duplicates == "archive" and not dry_run:
+            archived = _archive_file(config, f, f"{batch_id}.dup")
+            logger.info(
+                "skip file=%s: loaded in batch=%s as %s; archived -> %s", f, loaded.batch_id, loaded.source_file, archived
+            )
+        else:
+            logger.info("skip file=%s: loaded in batch=%s as %s", f, loaded.batch_id, loaded.source_file)
+    return out
+
+
+def _load_file(
+    db: Db | None,
+    config: AppConfig,
+    job: JobConfig,
+    f: Path,
+    parsed: _ParseJob | None,
+    batch_size: int | str,
+    dry_run: bool,
+    batch_id: str,
+    logger: logging.Logger | logging.LoggerAdapter,
+    pipeline_depth: int,
+    commit_every: int = 0,
+    resume: bool = False,
+    sha256: str | None = None,
+) -> LoadResult:
+    logger.info("load job=%s file=%s table=%s dry_run=%s", job.name, f, job.table, dry_run)
+    try:
+        started_at = dt.datetime.now()
+        result = load_job_file(
+            db=db,
+            config=config,
+            job=job,
+            excel_file=f,
+            batch_id=batch_id,
+            batch_size=batch_size,
+            dry_run=dry_run,
+            logger=logger,
+            pipeline_depth=pipeline_depth,
+            rows=(_parsed_rows(parsed) if parsed is not None else None),
+            commit_every=commit_every,
+            resume=resume,
+            sha256=sha256,
+        )
+        finished_at = dt.datetime.now()
+        if not dry_run and db is not None:
+            try_insert_batch_log(
+                db=db,
+                batch_id=batch_id,
+                job_name=job.name,
+                table_name=job.table,
+                source_file=f,
+                total_rows=result.total_rows,
+                ok_rows=result.ok_rows,
+                bad_rows=result.bad_rows,
+                inserted_rows=result.inserted_rows,
+                updated_rows=result.updated_rows,
+                unchanged_rows=result.unchanged_rows,
+                started_at=started_at,
+                finished_at=finished_at,
+                status="SUCCESS",
+                message=None,
+                logger=logger,
+            )
+    except (ExcelError, DbError) as e:
+        logger.exception("failed job=%s file=%s: %s", job.name, f, e)
+        finished_at = dt.datetime.now()
+        if not dry_run and db is not None:
+            try_insert_batch_log(
+                db=db,
+                batch_id=batch_id,
+                job_name=job.name,
+                table_name=job.table,
+                source_file=f,
+                total_rows=None,
+                ok_rows=None,
+                bad_rows=None,
+                started_at=started_at,
+                finished_at=finished_at,
+                status="FAILED",
+                message=str(e),
+                logger=logger,
+            )
+        raise
+    return result
+
+
 def load_ods(
     config: AppConfig,
     job_name: str | None = None,
-    batch_size: int = 1000,
+    batch_size: int | str = 1000,
     dry_run: bool = False,
     batch_id: str = "batch",
     logger: logging.Logger | None = None,
+    pipeline_depth: int = 0,
+    workers: int = 1,
+    parse_workers: int | None = None,
+    commit_every: int = 0,
+    resume: bool = False,
 ) -> list[LoadResult]:
+    """Load every enabled job (or just `job_name`) from the inbox.
+
+    With `workers > 1` independent jobs run concurrently, each on its own connection from a
+    `ConnectionPool`; a failing job doesn't stop the others and the failures are raised
+    together as `LoadError` at the end. Files within a job always load in order; with
+    `parse_workers > 1` (default: each job's `excel.parse_workers`) they are parsed ahead
+    in worker processes. `commit_every`/`resume` are passed to `load_job_file`.
+    """
     logger = logger or logging.getLogger(__name__)
     _ensure_dirs(config.paths.inbox, config.paths.badrows, config.paths.archive, config.paths.logs)
 
@@ -200,6 +1307,14 @@ def load_ods(
         jobs = [j for j in jobs if j.name == job_name]
     if not jobs:
         raise ValueError("No enabled jobs matched")
+    if parse_workers is not None:
+        jobs = [replace(j, excel=replace(j.excel, parse_workers=max(1, parse_workers))) for j in jobs]
+
+    workers = max(1, min(workers, len(jobs)))
+    if workers > 1:
+        return _load_ods_parallel(
+            config, jobs, batch_size, dry_run, batch_id, logger, pipeline_depth, workers, commit_every, resume
+        )
 
     db: Db | None = None
     if not dry_run:
@@ -208,65 +1323,54 @@ def load_ods(
     try:
         results: list[LoadResult] = []
         for job in jobs:
-            files = sorted(Path(config.paths.inbox).glob(job.excel.pattern))
-            if not files:
-                logger.warning("no files matched inbox=%s pattern=%s", config.paths.inbox, job.excel.pattern)
-                continue
-            for f in files:
-                logger.info("load job=%s file=%s table=%s dry_run=%s", job.name, f, job.table, dry_run)
-                try:
-                    started_at = dt.datetime.now()
-                    results.append(
-                        load_job_file(
-                            db=db,
-                            config=config,
-                            job=job,
-                            excel_file=f,
-                            batch_id=batch_id,
-                            batch_size=batch_size,
-                            dry_run=dry_run,
-                            logger=logger,
-                        )
-                    )
-                    finished_at = dt.datetime.now()
-                    if not dry_run and db is not None:
-                        r = results[-1]
-                        try_insert_batch_log(
-                            db=db,
-                            batch_id=batch_id,
-                            job_name=job.name,
-                            table_name=job.table,
-                            source_file=f,
-                            total_rows=r.total_rows,
-                            ok_rows=r.ok_rows,
-                            bad_rows=r.bad_rows,
-                            started_at=started_at,
-                            finished_at=finished_at,
-                            status="SUCCESS",
-                            message=None,
-                            logger=logger,
-                        )
-                except (ExcelError, DbError) as e:
-                    logger.exception("failed job=%s file=%s: %s", job.name, f, e)
-                    finished_at = dt.datetime.now()
-                    if not dry_run and db is not None:
-                        try_insert_batch_log(
-                            db=db,
-                            batch_id=batch_id,
-                            job_name=job.name,
-                            table_name=job.table,
-                            source_file=f,
-                            total_rows=None,
-                            ok_rows=None,
-                            bad_rows=None,
-                            started_at=started_at,
-                            finished_at=finished_at,
-                            status="FAILED",
-                            message=str(e),
-                            logger=logger,
-                        )
-                    raise
+            results.extend(
+                _load_job(db, config, job, batch_size, dry_run, batch_id, logger, pipeline_depth, commit_every, resume)
+            )
         return results
     finally:
         if db is not None:
             db.close()
+
+
+def _load_ods_parallel(
+    config: AppConfig,
+    jobs: list[JobConfig],
+    batch_size: int | str,
+    dry_run: bool,
+    batch_id: str,
+    logger: logging.Logger,
+    pipeline_depth: int,
+    workers: int,
+    commit_every: int = 0,
+    resume: bool = False,
+) -> list[LoadResult]:
+    pool = None if dry_run else ConnectionPool(config.odbc, size=workers)
+
+    def _run(job: JobConfig) -> list[LoadResult]:
+        job_logger = _JobLogger(logger, {"job": job.name})
+        if pool is None:
+            return _load_job(None, config, job, batch_size, dry_run, batch_id, job_logger, pipeline_depth)
+        with pool.connection() as db:
+            return _load_job(
+                db, config, job, batch_size, dry_run, batch_id, job_logger, pipeline_depth, commit_every, resume
+            )
+
+    logger.info("load-ods workers=%s jobs=%s", workers, len(jobs))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dm8-etl-job") as executor:
+            futures = [(job, executor.submit(_run, job)) for job in jobs]
+            results: list[LoadResult] = []
+            failures: dict[str, Exception] = {}
+            # collect in job order so the result list matches the serial run
+            for job, fut in futures:
+                try:
+                    results.extend(fut.result())
+                except Exception as e:
+                    logger.error("job failed job=%s: %s", job.name, e)
+                    failures[job.name] = e
+    finally:
+        if pool is not None:
+            pool.close()
+    if failures:
+        raise LoadError(results, failures)
+    return results
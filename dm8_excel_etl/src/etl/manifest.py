@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+
+# `manifest.enabled`: remember which inbox files were already loaded, by content.
+#
+# A small SQLite file (data/state/manifest.sqlite) keeps
+#   - file_stat:   path -> (size, mtime_ns, sha256), so an unchanged file costs one stat call;
+#   - loaded_file: (job, sha256) -> batch that loaded it.
+# A file whose content a job already loaded successfully (re-dropped export, file restored from
+# archive) is skipped or archived before it is parsed.
+
+_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class LoadedFile:
+    job: str
+    sha256: str
+    batch_id: str
+    source_file: str
+    loaded_at: str
+
+
+class FileManifest:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        # parallel jobs open their own manifest; writes are tiny, so just wait for the lock
+        self._con = sqlite3.connect(str(path), timeout=30)
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS file_stat "
+            "(path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL)"
+        )
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS loaded_file ("
+            "job TEXT NOT NULL, sha256 TEXT NOT NULL, batch_id TEXT NOT NULL, source_file TEXT NOT NULL, "
+            "size INTEGER NOT NULL, loaded_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+            "PRIMARY KEY (job, sha256))"
+        )
+        self._con.commit()
+
+    def digest(self, f: Path) -> tuple[str, int]:
+        """(SHA-256, size) of `f`; only re-read when its size or mtime changed since it was last hashed."""
+        st = f.stat()
+        key = str(f.resolve())
+        found = self._con.execute(
+            "SELECT sha256 FROM file_stat WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (key, st.st_size, st.st_mtime_ns),
+        ).fetchone()
+        if found is not None:
+            return str(found[0]), st.st_size
+        digest = file_sha256(f)
+        self._con.execute(
+            "INSERT OR REPLACE INTO file_stat (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+            (key, st.st_size, st.st_mtime_ns, digest),
+        )
+        self._con.commit()
+        return digest, st.st_size
+
+    def loaded(self, job: str, digest: str) -> LoadedFile | None:
+        row = self._con.execute(
+            "SELECT job, sha256, batch_id, source_file, loaded_at FROM loaded_file WHERE job = ? AND sha256 = ?",
+            (job, digest),
+        ).fetchone()
+        return LoadedFile(*(str(v) for v in row)) if row is not None else None
+
+    def record(self, job: str, digest: str, batch_id: str, f: Path, size: int) -> None:
+        """Mark `digest` as loaded by `job` (call after the DB commit)."""
+        self._con.execute(
+            "INSERT OR REPLACE INTO loaded_file (job, sha256, batch_id, source_file, size) VALUES (?, ?, ?, ?, ?)",
+            (job, digest, batch_id, f.name, size),
+        )
+        # the file is archived (moved) after loading; its stat entry would never match again
+        self._con.execute("DELETE FROM file_stat WHERE path = ?", (str(f.resolve()),))
+        self._con.commit()
+
+    def close(self) -> None:
+        self._con.close()
@@ -4,7 +4,9 @@ import datetime as dt
 import logging
 from pathlib import Path
 
-from .db import Db, execute
+from .checkpoint import Checkpoint
+from .db import Db, adapt_params, execute, query
+from .ddl import qualified
 
 
 def try_insert_batch_log(
@@ -22,7 +24,45 @@ def try_insert_batch_log(
     status: str,
     message: str | None,
     logger: logging.Logger,
+    inserted_rows: int | None = None,
+    updated_rows: int | None = None,
+    unchanged_rows: int | None = None,
 ) -> None:
+    if inserted_rows is not None:
+        # upsert counts: columns added to etl_batch_log later; older tables get them in `message`
+        counts = f"inserted={inserted_rows} updated={updated_rows} unchanged={unchanged_rows}"
+        sql = """
+INSERT INTO etl_batch_log (
+  batch_id, job_name, table_name, source_file,
+  total_rows, ok_rows, bad_rows,
+  inserted_rows, updated_rows, unchanged_rows,
+  started_at, finished_at,
+  status, message
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+""".strip()
+        params = [
+            batch_id,
+            job_name,
+            table_name,
+            str(source_file),
+            total_rows,
+            ok_rows,
+            bad_rows,
+            inserted_rows,
+            updated_rows,
+            unchanged_rows,
+            started_at,
+            finished_at,
+            status,
+            (message or "")[:2000],
+        ]
+        try:
+            execute(db, sql, params)
+            return
+        except Exception as e:
+            logger.debug("etl_batch_log without upsert columns: %s", e)
+        message = f"{counts}; {message}" if message else counts
+
     sql = """
 INSERT INTO etl_batch_log (
   batch_id, job_name, table_name, source_file,
@@ -49,3 +89,171 @@ INSERT INTO etl_batch_log (
     except Exception as e:
         logger.warning("skip etl_batch_log insert: %s", e)
 
+
+
+def try_insert_file_manifest(
+    db: Db,
+    *,
+    job_name: str,
+    sha256: str,
+    batch_id: str,
+    source_file: str | Path,
+    file_size: int,
+    loaded_at: dt.datetime,
+    logger: logging.Logger,
+) -> None:
+    # mirror of the local manifest (manifest.meta_table); the local SQLite file stays authoritative
+    sql = """
+INSERT INTO etl_file_manifest (
+  job_name, sha256, batch_id, source_file, file_size, loaded_at
+) VALUES (?, ?, ?, ?, ?, ?)
+""".strip()
+    params = [job_name, sha256, batch_id, Path(source_file).name, file_size, loaded_at]
+    try:
+        execute(db, sql, params)
+    except Exception as e:
+        logger.warning("skip etl_file_manifest insert: %s", e)
+
+
+def try_write_load_checkpoint(
+    db: Db,
+    *,
+    job_name: str,
+    table_name: str,
+    checkpoint: Checkpoint,
+    logger: logging.Logger | logging.LoggerAdapter,
+) -> bool:
+    """Stage the checkpoint row in the load's open transaction (no commit, no rollback).
+
+    Returns False when etl_load_checkpoint can't be written, so the caller stops trying.
+    """
+    sql = """
+MERGE INTO etl_load_checkpoint T
+USING (SELECT ? job_name, ? sha256 FROM DUAL) S
+ON (T.job_name = S.job_name AND T.sha256 = S.sha256)
+WHEN MATCHED THEN UPDATE SET
+  T.table_name = ?, T.source_file = ?, T.batch_id = ?, T.last_row = ?,
+  T.total_rows = ?, T.ok_rows = ?, T.bad_rows = ?, T.updated_at = ?
+WHEN NOT MATCHED THEN INSERT (
+  job_name, sha256, table_name, source_file, batch_id, last_row,
+  total_rows, ok_rows, bad_rows, updated_at
+) VALUES (S.job_name, S.sha256, ?, ?, ?, ?, ?, ?, ?, ?)
+""".strip()
+    cp = checkpoint
+    fields = [table_name, cp.source_file, cp.batch_id, cp.row_number, cp.total_rows, cp.ok_rows, cp.bad_rows, dt.datetime.now()]
+    try:
+        cur = db.cursor()
+        try:
+            cur.execute(sql, adapt_params(db, [job_name, cp.sha256, *fields, *fields]))
+        finally:
+            cur.close()
+        return True
+    except Exception as e:
+        logger.warning("skip etl_load_checkpoint: %s", e)
+        return False
+
+
+def try_delete_load_checkpoint(
+    db: Db,
+    *,
+    job_name: str,
+    sha256: str,
+    logger: logging.Logger | logging.LoggerAdapter,
+) -> None:
+    try:
+        execute(db, "DELETE FROM etl_load_checkpoint WHERE job_name = ? AND sha256 = ?", [job_name, sha256])
+    except Exception as e:
+        logger.debug("skip etl_load_checkpoint delete: %s", e)
+
+
+def try_latest_load_batch(db: Db, *, logger: logging.Logger) -> str | None:
+    """batch_id of the most recent load-ods run in etl_batch_log (run-sql rows are `(sql)`)."""
+    sql = """
+SELECT batch_id FROM etl_batch_log
+WHERE table_name <> '(sql)'
+  AND finished_at = (SELECT MAX(finished_at) FROM etl_batch_log WHERE table_name <> '(sql)')
+""".strip()
+    try:
+        rows = query(db, sql)
+    except Exception as e:
+        logger.warning("cannot read etl_batch_log: %s", e)
+        return None
+    return str(rows[0][0]) if rows else None
+
+
+def try_batch_tables(db: Db, *, batch_id: str, logger: logging.Logger) -> set[str] | None:
+    """Tables a load batch wrote to, whatever the outcome (a failed chunked load may have committed rows)."""
+    sql = "SELECT DISTINCT table_name FROM etl_batch_log WHERE batch_id = ? AND table_name <> '(sql)'"
+    try:
+        rows = query(db, sql, [batch_id])
+    except Exception as e:
+        logger.warning("cannot read etl_batch_log: %s", e)
+        return None
+    return {str(r[0]) for r in rows}
+
+
+def try_read_watermarks(db: Db, *, script_name: str, logger: logging.Logger) -> dict[str, dt.datetime]:
+    """{source table: watermark} stored for a SQL script; empty (= full build) if unreadable."""
+    sql = "SELECT source_table, watermark FROM etl_mdm_watermark WHERE script_name = ?"
+    try:
+        rows = query(db, sql, [script_name])
+    except Exception as e:
+        logger.warning("cannot read etl_mdm_watermark, building from all rows: %s", e)
+        return {}
+    return {str(r[0]).lower(): r[1] for r in rows if r[1] is not None}
+
+
+def try_source_high_marks(db: Db, *, sources: list[str], logger: logging.Logger) -> dict[str, dt.datetime]:
+    """MAX(etl_time) per source table; a table without rows (or without etl_time) is left out.
+
+    Read before the build starts and stored as the next watermark once it committed, so rows a
+    concurrent load-ods commits later with an older etl_time (inserted before that MAX, in a
+    transaction still open at the time) are never read. Run build-mdm after load-ods, not
+    alongside it.
+    """
+    marks: dict[str, dt.datetime] = {}
+    for source in sources:
+        try:
+            rows = query(db, f"SELECT MAX(etl_time) FROM {qualified(source)}")
+        except Exception as e:
+            logger.warning("cannot read MAX(etl_time) of %s, its watermark stays: %s", source, e)
+            continue
+        if rows and rows[0][0] is not None:
+            marks[source] = rows[0][0]
+    return marks
+
+
+def try_advance_watermarks(
+    db: Db,
+    *,
+    script_name: str,
+    watermarks: dict[str, dt.datetime],
+    batch_id: str,
+    logger: logging.Logger,
+) -> None:
+    # one transaction: either every source advances or none (the next build then redoes the
+    # same rows, which the MERGEs absorb)
+    sql = """
+MERGE INTO etl_mdm_watermark T
+USING (SELECT ? script_name, ? source_table FROM DUAL) S
+ON (T.script_name = S.script_name AND T.source_table = S.source_table)
+WHEN MATCHED THEN UPDATE SET T.watermark = ?, T.batch_id = ?, T.updated_at = ?
+WHEN NOT MATCHED THEN INSERT (script_name, source_table, watermark, batch_id, updated_at)
+  VALUES (S.script_name, S.source_table, ?, ?, ?)
+""".strip()
+    now = dt.datetime.now()
+    try:
+        cur = db.cursor()
+        try:
+            for source, mark in watermarks.items():
+                fields = [mark, batch_id, now]
+                cur.execute(sql, adapt_params(db, [script_name, source, *fields, *fields]))
+        finally:
+            cur.close()
+        db.commit()
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        logger.warning("skip etl_mdm_watermark update: %s", e)
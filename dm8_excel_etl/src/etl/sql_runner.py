@@ -1,20 +1,82 @@
 from __future__ import annotations
 
+import datetime as dt
+import heapq
+import logging
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Collection, Iterable, Mapping, Sequence
 
-from .db import Db, DbError, execute
+from .config import SqlCommitMode
+from .db import ConnectionPool, Db, DbError, execute
+
+
+# `db.sql_commit` / `run-sql --sql-commit`: when run_sql_text commits.
+#   statement  every statement through execute() (default, as before)
+#   file       one transaction per file
+#   section    one transaction per part of the file between `-- @commit` lines
+#   N          every N statements
+# Except in statement mode, one cursor runs the whole file, a failing statement rolls back
+# everything since the last commit and an explicit COMMIT in the script ends the current unit.
+# DM8 commits DDL implicitly: a TRUNCATE/CREATE/ALTER/... after other statements of a unit ends
+# the unit early, which is logged as a warning. `truncate_as_delete` (`db.sql_truncate_as_delete`)
+# runs TRUNCATE TABLE as DELETE FROM instead: rolled back with the unit, but fully logged.
+
+_COMMIT_MARK_RE = re.compile(r"--[ \t]*@commit\b", re.IGNORECASE)
+_TRUNCATE_RE = re.compile(r"^truncate\s+table\s+(\S+)$", re.IGNORECASE)
+_DDL_RE = re.compile(r"^(create|alter|drop|truncate|rename|grant|revoke|comment)\b", re.IGNORECASE)
+
+
+# `{{watermark:<table>}}` in a SQL file (sql/mdm/01_build_mdm.sql): replaced by a TIMESTAMP
+# literal, the <table>.etl_time up to which the script already consumed that table, so
+# `WHERE etl_time > {{watermark:ods_po_exec}}` only reads rows loaded since the last build.
+# Without a stored watermark the whole table is read. The CLI stores new watermarks in
+# etl_mdm_watermark once the file ran and committed. Written as
+# `/*{{watermark:ods_po_exec}}*/ TIMESTAMP '1900-01-01 00:00:00'` the file stays valid SQL when
+# run by hand (a full build); the comment and the default literal are replaced together.
+_WATERMARK_NAME = r"\{\{\s*watermark\s*:\s*([A-Za-z_][\w$#]*(?:\.[A-Za-z_][\w$#]*)?)\s*\}\}"
+_WATERMARK_RE = re.compile(rf"/\*\s*{_WATERMARK_NAME}\s*\*/\s*TIMESTAMP\s*'[^']*'|{_WATERMARK_NAME}", re.IGNORECASE)
+WATERMARK_EPOCH = dt.datetime(1900, 1, 1)
+
+
+def _watermark_table(m: re.Match) -> str:
+    return (m.group(1) or m.group(2)).lower()
+
+
+def watermark_sources(sql_text: str) -> list[str]:
+    """Tables referenced by `{{watermark:...}}`, in order of appearance."""
+    return list(dict.fromkeys(_watermark_table(m) for m in _WATERMARK_RE.finditer(sql_text)))
+
+
+def render_watermarks(sql_text: str, watermarks: Mapping[str, dt.datetime]) -> str:
+    def _literal(m: re.Match) -> str:
+        v = watermarks.get(_watermark_table(m), WATERMARK_EPOCH)
+        return f"TIMESTAMP '{v:%Y-%m-%d %H:%M:%S.%f}'"
+
+    return _WATERMARK_RE.sub(_literal, sql_text)
 
 
 @dataclass(frozen=True)
 class SqlRunResult:
     path: Path
     statements: int
+    commits: int = 0
 
 
 def _split_sql(text: str) -> list[str]:
+    return _split_sql_marked(text)[0]
+
+
+def _split_sql_marked(text: str) -> tuple[list[str], set[int]]:
+    """Statements of `text` and the (0-based) indexes of those preceded by a `-- @commit` line.
+
+    Raises DbError for a marker inside a statement, where it can't end a section.
+    """
     stmts: list[str] = []
+    marks: set[int] = set()
     buf: list[str] = []
 
     in_sq = False  # '
@@ -44,6 +106,11 @@ def _split_sql(text: str) -> list[str]:
 
         if not in_sq and not in_dq:
             if ch == "-" and nxt == "-":
+                if _COMMIT_MARK_RE.match(text, i):
+                    if "".join(buf).strip():
+                        line = text.count("\n", 0, i) + 1
+                        raise DbError(f"`-- @commit` on line {line} is inside a statement (missing `;` before it?)")
+                    marks.add(len(stmts))
                 in_line_comment = True
                 i += 2
                 continue
@@ -83,24 +150,125 @@ def _split_sql(text: str) -> list[str]:
     tail = "".join(buf).strip()
     if tail:
         stmts.append(tail)
-    return stmts
+    return stmts, marks
 
 
-def run_sql_text(db: Db, sql_text: str) -> int:
-    count = 0
-    for stmt in _split_sql(sql_text):
-        execute(db, stmt)
-        count += 1
-    return count
+def run_sql_text(
+    db: Db,
+    sql_text: str,
+    commit: SqlCommitMode = "statement",
+    only: Collection[int] | None = None,
+    truncate_as_delete: bool = False,
+    logger: logging.Logger | logging.LoggerAdapter | None = None,
+) -> int:
+    """Run the statements of `sql_text` (only those numbered in `only`, 1-based, if given)."""
+    return _run_sql(db, sql_text, commit, only, truncate_as_delete, logger)[0]
 
 
-def run_sql_file(db: Db, path: str | Path) -> SqlRunResult:
+def run_sql_file(
+    db: Db,
+    path: str | Path,
+    commit: SqlCommitMode = "statement",
+    only: Collection[int] | None = None,
+    watermarks: Mapping[str, dt.datetime] | None = None,
+    truncate_as_delete: bool = False,
+    logger: logging.Logger | logging.LoggerAdapter | None = None,
+) -> SqlRunResult:
     p = Path(path)
     if not p.exists() or not p.is_file():
         raise DbError(f"SQL file not found: {p}")
-    text = p.read_text(encoding="utf-8")
-    statements = run_sql_text(db, text)
-    return SqlRunResult(path=p, statements=statements)
+    text = render_watermarks(p.read_text(encoding="utf-8"), watermarks or {})
+    statements, commits = _run_sql(db, text, commit, only, truncate_as_delete, logger)
+    return SqlRunResult(path=p, statements=statements, commits=commits)
+
+
+def _run_sql(
+    db: Db,
+    sql_text: str,
+    commit: SqlCommitMode,
+    only: Collection[int] | None,
+    truncate_as_delete: bool = False,
+    logger: logging.Logger | logging.LoggerAdapter | None = None,
+) -> tuple[int, int]:
+    """(statements run, commits), implicit commits of DDL included."""
+    if commit == "statement":
+        count = 0
+        for number, stmt in enumerate(_split_sql(sql_text), start=1):
+            if only is not None and number not in only:
+                continue
+            execute(db, stmt)
+            count += 1
+        return count, count
+    if db.autocommit:
+        raise DbError(f"sql_commit={commit} needs a connection with autocommit off")
+    logger = logger or logging.getLogger(__name__)
+
+    # same numbering as read_sql_statements: markers only decide where sections end
+    stmts, marks = _split_sql_marked(sql_text)
+    if commit != "section":
+        marks = set()
+    every = commit if isinstance(commit, int) else 0
+    number = count = commits = pending = 0
+    stmt = ""
+    cur = db.cursor()
+    try:
+        for number, stmt in enumerate(stmts, start=1):
+            if pending and number - 1 in marks:
+                db.commit()
+                commits += 1
+                pending = 0
+            if only is not None and number not in only:
+                continue
+            count += 1
+            if _is_commit(stmt):
+                if pending:
+                    db.commit()
+                    commits += 1
+                    pending = 0
+                continue
+            m = _TRUNCATE_RE.match(stmt) if truncate_as_delete else None
+            if m is None and _DDL_RE.match(stmt):
+                if pending:
+                    logger.warning(
+                        "sql_commit=%s: statement %s is DDL and commits the %s statement(s) before it implicitly: %s",
+                        commit,
+                        number,
+                        pending,
+                        " ".join(stmt.split()[:3]),
+                    )
+                cur.execute(stmt)
+                # DM8 committed it and everything before it: nothing left to roll back
+                commits += 1
+                pending = 0
+                continue
+            cur.execute(f"DELETE FROM {m.group(1)}" if m else stmt)
+            pending += 1
+            if every and pending >= every:
+                db.commit()
+                commits += 1
+                pending = 0
+        if pending:
+            db.commit()
+            commits += 1
+            pending = 0
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        raise DbError(
+            f"SQL execute failed at statement {number}, rolled back {pending} uncommitted statement(s): {e}; sql={stmt!r}"
+        ) from e
+    finally:
+        try:
+            cur.close()
+        except Exception:
+            pass
+    return count, commits
+
+
+def _is_commit(stmt: str) -> bool:
+    return stmt.lower().split() in (["commit"], ["commit", "work"])
 
 
 def iter_sql_files(directory: str | Path, pattern: str = "*.sql") -> Iterable[Path]:
@@ -109,3 +277,331 @@ def iter_sql_files(directory: str | Path, pattern: str = "*.sql") -> Iterable[Pa
         raise DbError(f"SQL directory not found: {d}")
     yield from sorted(d.glob(pattern))
 
+
+
+# `run-sql --parallel N`: statements (of all given files, in order) form a dependency graph from
+# the tables each one reads and writes; independent ones run concurrently, one pooled connection
+# each, so e.g. the TRUNCATE/INSERT pairs of different ADS tables refresh side by side while an
+# ADS statement joining mdm_project still waits for the MERGE INTO mdm_project before it.
+
+
+@dataclass(frozen=True)
+class SqlStatement:
+    path: Path
+    number: int  # 1-based position in its file
+    sql: str
+
+
+@dataclass(frozen=True)
+class SqlStatementResult:
+    statement: SqlStatement
+    status: str  # SUCCESS | FAILED | SKIPPED
+    seconds: float = 0.0
+    error: str | None = None
+
+
+_TOKEN_RE = re.compile(
+    r"""'(?:[^']|'')*'"""  # string literal (dropped)
+    r'|(?:"[^"]+"|[A-Za-z_][\w$#]*)(?:\s*\.\s*(?:"[^"]+"|[A-Za-z_][\w$#]*))*'  # [schema.]name
+    r"|\d[\w.]*"  # number (dropped)
+    r"|[(),]"
+)
+
+_VERBS = {"select", "insert", "update", "delete", "merge"}
+
+# words that end a FROM list entry instead of being its alias
+_CLAUSE_WORDS = {
+    "where", "group", "order", "having", "union", "intersect", "minus", "except", "connect", "start",
+    "join", "inner", "left", "right", "full", "cross", "outer", "natural", "on", "using", "set",
+    "when", "then", "values", "select", "for", "limit", "offset", "fetch", "with", "partition",
+}
+
+
+def _tokens(sql: str) -> list[str]:
+    out = []
+    for tok in _TOKEN_RE.findall(sql):
+        if tok[0] == "'" or tok[0].isdigit():
+            continue
+        out.append(tok if tok in "()," else tok.lower())
+    return out
+
+
+def _table_name(tok: str) -> str:
+    # schema.table and table are the same object for the default schema; the extra edges that
+    # same-named tables of different schemas would get only serialize more
+    return tok.rsplit(".", 1)[-1].strip().strip('"')
+
+
+def _is_name(tok: str) -> bool:
+    return tok not in ("(", ")", ",")
+
+
+def _skip_parens(toks: list[str], i: int) -> int:
+    """Index after the parenthesized group opening at `toks[i]`."""
+    depth = 0
+    while i < len(toks):
+        if toks[i] == "(":
+            depth += 1
+        elif toks[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _main_verb(toks: list[str]) -> str:
+    if toks[0] != "with":
+        return toks[0]
+    depth = 0
+    for tok in toks[1:]:
+        if tok == "(":
+            depth += 1
+        elif tok == ")":
+            depth -= 1
+        elif depth == 0 and tok in _VERBS:
+            return tok
+    return "with"
+
+
+def _name_after(toks: list[str], i: int, word: str) -> str | None:
+    while i < len(toks):
+        if toks[i] == word:
+            return _table_name(toks[i + 1]) if i + 1 < len(toks) and _is_name(toks[i + 1]) else None
+        i += 1
+    return None
+
+
+def _write_target(toks: list[str]) -> str | None:
+    verb = _main_verb(toks)
+    start = toks.index(verb) if verb in toks else 0
+    if verb in ("insert", "merge"):
+        return _name_after(toks, start, "into")
+    if verb == "update":
+        return _table_name(toks[start + 1]) if start + 1 < len(toks) and _is_name(toks[start + 1]) else None
+    if verb == "delete":
+        i = start + 1
+        if i < len(toks) and toks[i] == "from":
+            i += 1
+        return _table_name(toks[i]) if i < len(toks) and _is_name(toks[i]) else None
+    if verb == "truncate":
+        return _name_after(toks, start, "table")
+    if verb in ("create", "drop", "alter"):
+        for i, tok in enumerate(toks[:8]):
+            if tok == "index":
+                return _name_after(toks, i, "on") if verb == "create" else None
+            if tok in ("table", "view"):
+                return _name_after(toks, i, tok)
+    return None
+
+
+def _cte_names(toks: list[str]) -> set[str]:
+    # `name AS (` or `name (cols) AS (`
+    names = set()
+    for i, tok in enumerate(toks):
+        if not _is_name(tok) or i + 1 >= len(toks):
+            continue
+        j = _skip_parens(toks, i + 1) if toks[i + 1] == "(" else i + 1
+        if j + 1 < len(toks) and toks[j] == "as" and toks[j + 1] == "(":
+            names.add(_table_name(tok))
+    return names
+
+
+def _read_tables(toks: list[str]) -> set[str]:
+    reads = set()
+    for i, tok in enumerate(toks):
+        if tok not in ("from", "join", "using"):
+            continue
+        # a FROM list: `a x, b y, (subquery) z`; nested queries are found at their own FROM
+        j = i + 1
+        while j < len(toks):
+            if toks[j] == "(":
+                j = _skip_parens(toks, j)
+            elif _is_name(toks[j]) and toks[j] not in _CLAUSE_WORDS:
+                reads.add(_table_name(toks[j]))
+                j += 1
+            else:
+                break
+            if j < len(toks) and toks[j] == "as":
+                j += 1
+            if j < len(toks) and _is_name(toks[j]) and toks[j] not in _CLAUSE_WORDS:
+                j += 1  # alias
+            if tok != "from" or j >= len(toks) or toks[j] != ",":
+                break
+            j += 1
+    return reads
+
+
+def statement_tables(sql: str) -> tuple[set[str], set[str]] | None:
+    """(tables read, tables written) by one statement, or None if it can't be told statically.
+
+    A None statement (PL/SQL block, CALL, GRANT, ...) is run as a barrier by
+    `statement_dependencies`.
+    """
+    toks = _tokens(sql)
+    if not toks or toks == ["commit"]:
+        # each statement commits on its own anyway
+        return set(), set()
+    verb = _main_verb(toks)
+    if verb == "select":
+        writes: set[str] = set()
+    else:
+        target = _write_target(toks)
+        if target is None:
+            return None
+        writes = {target}
+    reads = _read_tables(toks) - _cte_names(toks)
+    return reads, writes
+
+
+def statement_dependencies(statements: Sequence[str]) -> list[set[int]]:
+    """For each statement, the indexes of earlier statements it must run after.
+
+    j waits for i < j when i writes a table j reads or writes, or i reads a table j writes
+    (so a TRUNCATE never overtakes a query still reading the old rows).
+    """
+    access = [statement_tables(s) for s in statements]
+    deps: list[set[int]] = []
+    for j, aj in enumerate(access):
+        d = set()
+        for i in range(j):
+            ai = access[i]
+            if ai is None or aj is None:
+                d.add(i)
+                continue
+            ri, wi = ai
+            rj, wj = aj
+            if wi & (rj | wj) or ri & wj:
+                d.add(i)
+        deps.append(d)
+    return deps
+
+
+def _heights(deps: list[set[int]]) -> list[int]:
+    """Statements on the longest chain starting at each statement (itself included)."""
+    height = [1] * len(deps)
+    for j in range(len(deps) - 1, -1, -1):
+        for i in deps[j]:
+            height[i] = max(height[i], height[j] + 1)
+    return height
+
+
+def read_sql_statements(
+    paths: Iterable[Path],
+    watermarks: Mapping[Path, Mapping[str, dt.datetime]] | None = None,
+) -> list[SqlStatement]:
+    out: list[SqlStatement] = []
+    for p in paths:
+        if not p.exists() or not p.is_file():
+            raise DbError(f"SQL file not found: {p}")
+        stmts = _split_sql(render_watermarks(p.read_text(encoding="utf-8"), (watermarks or {}).get(p, {})))
+        out.extend(SqlStatement(path=p, number=n, sql=s) for n, s in enumerate(stmts, start=1))
+    return out
+
+
+def run_sql_parallel(
+    pool: ConnectionPool,
+    statements: Sequence[SqlStatement],
+    workers: int,
+    logger: logging.Logger,
+    continue_on_error: bool = False,
+) -> list[SqlStatementResult]:
+    """Run `statements` on up to `workers` pooled connections, honouring their dependencies.
+
+    Each statement commits on its own, as in `run_sql_text`. Of the ready statements, the one
+    heading the longest remaining chain starts first. After a failure nothing new is started
+    (with `continue_on_error`, only statements depending on the failed one are held back);
+    statements not run are reported as SKIPPED.
+    """
+    deps = statement_dependencies([s.sql for s in statements])
+    height = _heights(deps)
+    waiting = [set(d) for d in deps]
+    dependents: list[list[int]] = [[] for _ in statements]
+    for j, d in enumerate(deps):
+        for i in d:
+            dependents[i].append(j)
+    logger.info(
+        "run-sql parallel statements=%s workers=%s critical_path=%s",
+        len(statements),
+        workers,
+        max(height, default=0),
+    )
+
+    results: list[SqlStatementResult | None] = [None] * len(statements)
+    ready = [(-height[j], j) for j, d in enumerate(waiting) if not d]
+    heapq.heapify(ready)
+    stopped = False
+
+    def _run(s: SqlStatement) -> None:
+        with pool.connection() as db:
+            execute(db, s.sql)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        running: dict[Future, tuple[int, float]] = {}
+        while running or (ready and not stopped):
+            while ready and not stopped and len(running) < workers:
+                _, j = heapq.heappop(ready)
+                running[ex.submit(_run, statements[j])] = (j, time.perf_counter())
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                j, started = running.pop(fut)
+                s = statements[j]
+                seconds = time.perf_counter() - started
+                e = fut.exception()
+                if e is not None:
+                    logger.error("run-sql failed file=%s statement=%s err=%s", s.path, s.number, e)
+                    results[j] = SqlStatementResult(s, "FAILED", seconds, str(e))
+                    stopped = stopped or not continue_on_error
+                    continue
+                logger.debug("run-sql ok file=%s statement=%s seconds=%.2f", s.path, s.number, seconds)
+                results[j] = SqlStatementResult(s, "SUCCESS", seconds)
+                for k in dependents[j]:
+                    waiting[k].discard(j)
+                    if not waiting[k]:
+                        heapq.heappush(ready, (-height[k], k))
+
+    return [r if r is not None else SqlStatementResult(s, "SKIPPED") for s, r in zip(statements, results)]
+
+
+# `build-ads --incremental`: only refresh the tables fed (directly, or through MDM tables) by
+# the tables a load batch wrote to. Statements are kept or dropped per target table, so a
+# TRUNCATE goes with the INSERT that refills it.
+
+
+def plan_incremental(
+    statements: Sequence[SqlStatement],
+    changed: Iterable[str],
+    upstream: Sequence[SqlStatement] = (),
+) -> tuple[list[SqlStatement], dict[str, set[str]]]:
+    """(statements to run, {skipped target table: its source tables}).
+
+    `upstream` statements (e.g. the MDM build) are not run; they only carry changes through
+    the tables they write. Statements whose tables can't be told, or that write nothing, always run.
+    """
+    access = [statement_tables(s.sql) for s in statements]
+    sources: dict[str, set[str]] = {}
+    for a in [statement_tables(s.sql) for s in upstream] + access:
+        if a is None:
+            continue
+        reads, writes = a
+        for w in writes:
+            sources.setdefault(w, set()).update(reads - {w})
+
+    dirty = {_table_name(t.lower()) for t in changed}
+    grew = True
+    while grew:
+        grew = False
+        for target, src in sources.items():
+            if target not in dirty and src & dirty:
+                dirty.add(target)
+                grew = True
+
+    run: list[SqlStatement] = []
+    skipped: dict[str, set[str]] = {}
+    for s, a in zip(statements, access):
+        if a is None or not a[1] or a[1] & dirty:
+            run.append(s)
+        else:
+            for target in a[1]:
+                skipped[target] = sources.get(target, set())
+    return run, skipped
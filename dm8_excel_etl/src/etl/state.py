@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# Small JSON state files under paths.state (batch_size.json, checkpoints.json): a missing or
+# corrupt file reads as {}, writes go to a temp file that replaces the original, and updates are
+# read-modify-write under one lock because parallel jobs (load-ods --jobs) share the files.
+
+_LOCK = threading.Lock()
+
+
+def read_json_state(path: Path) -> dict:
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return raw if isinstance(raw, dict) else {}
+
+
+def write_json_state(path: Path, raw: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(raw, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+@contextmanager
+def update_json_state(path: Path) -> Iterator[dict]:
+    """Yield the file's content for in-place changes; written back (only if changed) on exit."""
+    with _LOCK:
+        raw = read_json_state(path)
+        before = json.dumps(raw, sort_keys=True)
+        yield raw
+        if json.dumps(raw, sort_keys=True) != before:
+            write_json_state(path, raw)
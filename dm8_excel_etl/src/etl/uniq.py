@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+import random
+from operator import itemgetter
+from typing import Any, Collection, Sequence
+
+# `unique:` keys checked while streaming, so duplicate business keys go to badrows instead of
+# failing an executemany deep inside the load.
+#
+# The exact check keeps the key values themselves in a set (~100 bytes per row for a short
+# code). `unique_bloom: N` swaps it for a fixed-size Bloom filter sized for N rows
+# (BLOOM_BITS_PER_KEY = 48 bits, 6 bytes per row; measured false-positive rate ~1e-5); a row
+# it flags may then, rarely, be a false positive, which the badrows message says.
+
+BLOOM_BITS_PER_KEY = 48
+_BLOCK_BITS = 512
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def _pattern_tables() -> list[list[int]]:
+    rnd = random.Random(0x5EED)
+    return [[sum(1 << b for b in rnd.sample(range(_BLOCK_BITS), 7)) for _ in range(1024)] for _ in range(3)]
+
+
+_PATTERNS = _pattern_tables()
+
+
+class KeySet:
+    """Exact set of keys: values are compared, not just hashed (`hash(-1) == hash(-2)`)."""
+
+    exact = True
+
+    def __init__(self) -> None:
+        self._seen: set[Any] = set()
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._seen
+
+    def add(self, key: Any) -> bool:
+        """True if `key` wasn't seen before."""
+        seen = self._seen
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+
+class BloomKeySet:
+    """Blocked Bloom filter over key hashes: fixed memory, no false negatives.
+
+    Each key sets ~21 bits inside one 512-bit block (a Python int), taken from three
+    precomputed pattern tables, so a check is a few int operations instead of k probes.
+    """
+
+    exact = False
+
+    def __init__(self, capacity: int, bits_per_key: int = BLOOM_BITS_PER_KEY) -> None:
+        self.blocks = max(1, math.ceil(max(1, capacity) * bits_per_key / _BLOCK_BITS))
+        self._blocks = [0] * self.blocks
+
+    def _locate(self, key: Any) -> tuple[int, int]:
+        # mix: small ints hash to themselves
+        h = (hash(key) * _GOLDEN) & _MASK64
+        h ^= h >> 29
+        t1, t2, t3 = _PATTERNS
+        mask = t1[(h >> 32) & 1023] | t2[(h >> 42) & 1023] | t3[(h >> 52) & 1023]
+        return (h & 0xFFFFFFFF) % self.blocks, mask
+
+    def __contains__(self, key: Any) -> bool:
+        i, mask = self._locate(key)
+        return self._blocks[i] & mask == mask
+
+    def add(self, key: Any) -> bool:
+        i, mask = self._locate(key)
+        block = self._blocks[i]
+        if block & mask == mask:
+            return False
+        self._blocks[i] = block | mask
+        return True
+
+
+class UniqueCheck:
+    """Checks every declared unique key of a row; one key set per key."""
+
+    def __init__(
+        self,
+        keys: Sequence[Sequence[str]],
+        column_order: Sequence[str],
+        bloom_capacity: int = 0,
+        exact_keys: Collection[Sequence[str]] = (),
+    ) -> None:
+        """`exact_keys` keep an exact set even with `bloom_capacity` (no false positives)."""
+        self.keys = [tuple(k) for k in keys]
+        self._getters = [itemgetter(*(column_order.index(c) for c in key)) for key in self.keys]
+        exact = {tuple(k) for k in exact_keys}
+        self._sets = [
+            BloomKeySet(bloom_capacity) if bloom_capacity and key not in exact else KeySet() for key in self.keys
+        ]
+
+    def check(self, values: Sequence[Any]) -> str | None:
+        """None if `values` is new for every key (and record it), else the badrows message.
+
+        A rejected row records none of its keys, so a later row may still use them.
+        """
+        if len(self.keys) == 1:
+            v = self._getters[0](values)
+            if _blank(v, self.keys[0]) or self._sets[0].add(v):
+                return None
+            return _message(self.keys[0], v, self._sets[0].exact)
+        fresh = []
+        for key, get, seen in zip(self.keys, self._getters, self._sets):
+            v = get(values)
+            if _blank(v, key):
+                continue
+            if v in seen:
+                return _message(key, v, seen.exact)
+            fresh.append((seen, v))
+        for seen, v in fresh:
+            seen.add(v)
+        return None
+
+
+def _blank(v: Any, key: tuple[str, ...]) -> bool:
+    # like a UNIQUE index: a key without any value can't collide
+    return v is None or (len(key) > 1 and all(x is None for x in v))
+
+
+def _message(key: tuple[str, ...], v: Any, exact: bool) -> str:
+    shown = ", ".join(f"{c}={x}" for c, x in zip(key, v if len(key) > 1 else (v,)))
+    if exact:
+        return f"duplicate key ({shown})"
+    return f"duplicate key ({shown}) (Bloom filter, may be a false positive)"
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import datetime as dt
+import posixpath
+import re
+import zipfile
+from typing import Any, Iterator
+from xml.etree.ElementTree import iterparse
+
+# Minimal streaming .xlsx reader (`excel.engine: native`).
+#
+# Produces the same values as `openpyxl.load_workbook(read_only=True, data_only=True)` +
+# `ws.iter_rows(values_only=True)`, but skips cell objects and style resolution: the sheet XML
+# is streamed with `iterparse` and only the requested column indexes are materialized.
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW = _MAIN_NS + "row"
+_VALUE = _MAIN_NS + "v"
+_INLINE = _MAIN_NS + "is"
+_TEXT = _MAIN_NS + "t"
+_RUN = _MAIN_NS + "r"
+_SI = _MAIN_NS + "si"
+_DIMENSION = _MAIN_NS + "dimension"
+
+WINDOWS_EPOCH = dt.datetime(1899, 12, 30)
+MAC_EPOCH = dt.datetime(1904, 1, 1)
+_SECS_PER_DAY = 86400
+
+# Same builtin table / date heuristics as openpyxl (ids 0-49; locale ids are not dates there).
+_BUILTIN_FORMATS = {
+    0: "General", 1: "0", 2: "0.00", 3: "#,##0", 4: "#,##0.00",
+    5: '"$"#,##0_);("$"#,##0)', 6: '"$"#,##0_);[Red]("$"#,##0)',
+    7: '"$"#,##0.00_);("$"#,##0.00)', 8: '"$"#,##0.00_);[Red]("$"#,##0.00)',
+    9: "0%", 10: "0.00%", 11: "0.00E+00", 12: "# ?/?", 13: "# ??/??",
+    14: "mm-dd-yy", 15: "d-mmm-yy", 16: "d-mmm", 17: "mmm-yy", 18: "h:mm AM/PM",
+    19: "h:mm:ss AM/PM", 20: "h:mm", 21: "h:mm:ss", 22: "m/d/yy h:mm",
+    37: "#,##0_);(#,##0)", 38: "#,##0_);[Red](#,##0)", 39: "#,##0.00_);(#,##0.00)",
+    40: "#,##0.00_);[Red](#,##0.00)", 45: "mm:ss", 46: "[h]:mm:ss", 47: "mmss.0",
+    48: "##0.0E+0", 49: "@",
+}
+_STRIP_RE = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_DATE_RE = re.compile(r"(?<![_\\])[dmhysDMHYS]")
+_TIMEDELTA_RE = re.compile(r"\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?", re.IGNORECASE)
+_CELL_REF_RE = re.compile(r"^([A-Z]+)(\d+)$")
+_DIGITS = "0123456789"
+
+
+def _is_date_format(fmt: str | None) -> bool:
+    if fmt is None:
+        return False
+    fmt = _STRIP_RE.sub("", fmt.split(";")[0])
+    return _DATE_RE.search(fmt) is not None
+
+
+def _is_timedelta_format(fmt: str | None) -> bool:
+    if fmt is None:
+        return False
+    return _TIMEDELTA_RE.search(fmt.split(";")[0]) is not None
+
+
+def from_excel(value: float, epoch: dt.datetime = WINDOWS_EPOCH, timedelta: bool = False) -> Any:
+    """Excel serial -> datetime/time/timedelta (mirrors openpyxl.utils.datetime.from_excel)."""
+    if timedelta:
+        td = dt.timedelta(days=value)
+        if td.microseconds:
+            td = dt.timedelta(seconds=td.total_seconds() // 1, microseconds=round(td.microseconds, -3))
+        return td
+    day, fraction = divmod(value, 1)
+    diff = dt.timedelta(milliseconds=round(fraction * _SECS_PER_DAY * 1000))
+    if 0 <= value < 1 and diff.days == 0:
+        mins, seconds = divmod(diff.seconds, 60)
+        hours, mins = divmod(mins, 60)
+        return dt.time(hours, mins, seconds, diff.microseconds)
+    if 0 < value < 60 and epoch == WINDOWS_EPOCH:
+        day += 1
+    return epoch + dt.timedelta(days=day) + diff
+
+
+_COLUMN_CACHE: dict[str, int] = {}
+
+
+def column_index(letters: str) -> int:
+    """`A` -> 0, `AB` -> 27."""
+    idx = _COLUMN_CACHE.get(letters)
+    if idx is None:
+        n = 0
+        for ch in letters:
+            n = n * 26 + (ord(ch) - 64)
+        idx = n - 1
+        _COLUMN_CACHE[letters] = idx
+    return idx
+
+
+def _text_content(node: Any) -> str:
+    # <si>/<is>: direct <t> plus <r><t> runs; phonetic runs (<rPh>) are ignored like openpyxl.
+    parts: list[str] = []
+    for child in node:
+        if child.tag == _TEXT:
+            if child.text is not None:
+                parts.append(child.text)
+        elif child.tag == _RUN:
+            t = child.find(_TEXT)
+            if t is not None and t.text is not None:
+                parts.append(t.text)
+    return "".join(parts)
+
+
+def _rels(zf: zipfile.ZipFile, part: str) -> dict[str, tuple[str, str]]:
+    base, name = posixpath.split(part)
+    rels_path = posixpath.join(base, "_rels", name + ".rels")
+    out: dict[str, tuple[str, str]] = {}
+    try:
+        src = zf.open(rels_path)
+    except KeyError:
+        return out
+    with src:
+        for _, el in iterparse(src):
+            if el.tag == _PKG_REL_NS + "Relationship":
+                target = el.get("Target") or ""
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join(base, target))
+                out[el.get("Id") or ""] = (el.get("Type") or "", target)
+    return out
+
+
+class NativeWorkbook:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._zf = zipfile.ZipFile(path)
+        try:
+            self._load()
+        except Exception:
+            self._zf.close()
+            raise
+
+    def _load(self) -> None:
+        zf = self._zf
+        wb_part = "xl/workbook.xml"
+        for typ, target in _rels(zf, "").values():
+            if typ.endswith("/officeDocument"):
+                wb_part = target
+        rels = _rels(zf, wb_part)
+
+        self.epoch = WINDOWS_EPOCH
+        self.sheets: list[tuple[str, str]] = []
+        self.active_index = 0
+        with zf.open(wb_part) as src:
+            for _, el in iterparse(src):
+                if el.tag == _MAIN_NS + "workbookPr":
+                    if (el.get("date1904") or "").lower() in {"1", "true"}:
+                        self.epoch = MAC_EPOCH
+                elif el.tag == _MAIN_NS + "workbookView":
+                    self.active_index = int(el.get("activeTab") or 0)
+                elif el.tag == _MAIN_NS + "sheet":
+                    rel = rels.get(el.get(_REL_NS + "id") or "")
+                    if rel is not None:
+                        self.sheets.append((el.get("name") or "", rel[1]))
+
+        self.shared_strings: list[str] = []
+        self.date_styles: frozenset[int] = frozenset()
+        self.timedelta_styles: frozenset[int] = frozenset()
+        for typ, target in rels.values():
+            if typ.endswith("/sharedStrings"):
+                self.shared_strings = self._read_shared_strings(target)
+            elif typ.endswith("/styles"):
+                self.date_styles, self.timedelta_styles = self._read_date_styles(target)
+
+    def _read_shared_strings(self, part: str) -> list[str]:
+        strings: list[str] = []
+        with self._zf.open(part) as src:
+            for _, el in iterparse(src):
+                if el.tag == _SI:
+                    strings.append(_text_content(el).replace("x005F_", ""))
+                    el.clear()
+        return strings
+
+    def _read_date_styles(self, part: str) -> tuple[frozenset[int], frozenset[int]]:
+        custom: dict[int, str] = {}
+        xf_formats: list[int] = []
+        with self._zf.open(part) as src:
+            in_cell_xfs = False
+            for event, el in iterparse(src, events=("start", "end")):
+                if el.tag == _MAIN_NS + "cellXfs":
+                    in_cell_xfs = event == "start"
+                elif event == "end" and el.tag == _MAIN_NS + "numFmt":
+                    custom[int(el.get("numFmtId") or 0)] = el.get("formatCode") or ""
+                elif event == "end" and in_cell_xfs and el.tag == _MAIN_NS + "xf":
+                    xf_formats.append(int(el.get("numFmtId") or 0))
+        dates: set[int] = set()
+        timedeltas: set[int] = set()
+        for idx, fmt_id in enumerate(xf_formats):
+            fmt = custom[fmt_id] if fmt_id in custom else _BUILTIN_FORMATS.get(fmt_id)
+            if _is_date_format(fmt):
+                dates.add(idx)
+            if _is_timedelta_format(fmt):
+                timedeltas.add(idx)
+        return frozenset(dates), frozenset(timedeltas)
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return [name for name, _ in self.sheets]
+
+    def sheet_part(self, name: str | None) -> str:
+        if name is None:
+            if not self.sheets:
+                raise KeyError("workbook has no sheets")
+            return self.sheets[min(self.active_index, len(self.sheets) - 1)][1]
+        for sheet_name, part in self.sheets:
+            if sheet_name == name:
+                return part
+        raise KeyError(name)
+
+    def iter_rows(
+        self,
+        part: str,
+        min_row: int = 1,
+        columns: set[int] | None = None,
+    ) -> Iterator[tuple[int, list[Any]]]:
+        """Yield `(row_number, values)` for every row >= min_row, including gap rows (as `[]`).
+
+        `values` is indexed by 0-based column; with `columns` given, only those indexes are
+        materialized (others stay None) and the list stops at `max(columns)`.
+        """
+        shared = self.shared_strings
+        date_styles = self.date_styles
+        timedelta_styles = self.timedelta_styles
+        epoch = self.epoch
+        width = (max(columns) + 1) if columns else 0
+
+        max_row: int | None = None
+        counter = min_row
+        row_no = 0
+        with self._zf.open(part) as src:
+            for _, el in iterparse(src):
+                tag = el.tag
+                if tag != _ROW:
+                    if tag == _DIMENSION:
+                        m = _CELL_REF_RE.match((el.get("ref") or "").split(":")[-1])
+                        if m:
+                            max_row = int(m.group(2))
+                    continue
+
+                r = el.get("r")
+                row_no = int(float(r)) if r else row_no + 1
+                if max_row is not None and row_no > max_row:
+                    break
+                if row_no < min_row:
+                    el.clear()
+                    continue
+                while counter < row_no:
+                    yield counter, []
+                    counter += 1
+
+                values: list[Any] = [None] * width
+                col = -1
+                for c in el:
+                    ref = c.get("r")
+                    col = column_index(ref.rstrip(_DIGITS)) if ref else col + 1
+                    if columns is not None:
+                        if col not in columns:
+                            continue
+                    elif col >= len(values):
+                        values.extend([None] * (col + 1 - len(values)))
+
+                    t = c.get("t")
+                    if t == "inlineStr":
+                        node = c.find(_INLINE)
+                        values[col] = _text_content(node) if node is not None else None
+                        continue
+                    v = c.findtext(_VALUE) or None
+                    if v is None:
+                        continue
+                    if t is None or t == "n":
+                        num: Any = float(v) if ("." in v or "E" in v or "e" in v) else int(v)
+                        s = c.get("s")
+                        style_id = int(s) if s else 0
+                        if style_id in date_styles:
+                            try:
+                                num = from_excel(num, epoch, timedelta=style_id in timedelta_styles)
+                            except (OverflowError, ValueError):
+                                num = "#VALUE!"
+                        values[col] = num
+                    elif t == "s":
+                        values[col] = shared[int(v)]
+                    elif t == "b":
+                        values[col] = bool(int(v))
+                    elif t == "d":
+                        try:
+                            values[col] = dt.datetime.fromisoformat(v.replace("Z", ""))
+                        except ValueError:
+                            values[col] = v
+                    else:  # "str" (formula result), "e" (error)
+                        values[col] = v
+
+                # Rows are cleared once consumed (like openpyxl) so memory stays flat.
+                el.clear()
+                counter = row_no + 1
+                yield row_no, values
+
+        if max_row is not None:
+            while counter <= max_row:
+                yield counter, []
+                counter += 1
+
+    def close(self) -> None:
+        self._zf.close()
@@ -0,0 +1,57 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from etl.batching import AdaptiveBatchSize, load_batch_sizes, save_batch_size
+
+
+class TestAdaptiveBatchSize(unittest.TestCase):
+    def test_slow_start_then_halve_on_drop(self):
+        s = AdaptiveBatchSize(min_size=100, max_size=5000)
+        self.assertEqual(s.size, 100)
+        s.observe(100, 0.1)  # 1000 rows/s
+        self.assertEqual(s.size, 200)
+        s.observe(200, 0.1)  # 2000 rows/s
+        self.assertEqual(s.size, 400)
+        s.observe(400, 0.8)  # 500 rows/s: clear drop
+        self.assertEqual(s.size, 200)
+        s.observe(200, 0.1)  # recovered: additive from now on
+        self.assertEqual(s.size, 300)
+        self.assertEqual((s.settled, s.best_rate, s.samples), (200, 2000.0, 4))
+
+    def test_one_lucky_batch_does_not_settle(self):
+        s = AdaptiveBatchSize(min_size=100, max_size=5000, start=1000)
+        s.observe(1000, 0.1)  # 10000 rows/s: a single outlier
+        self.assertEqual(s.settled, 1000)
+        for rows, seconds in ((500, 0.1), (500, 0.1), (1000, 0.5), (1000, 0.5)):
+            s.observe(rows, seconds)
+        # 1000 rows: median of 10000/2000/2000 rows/s; 500 rows: a steady 5000 rows/s
+        self.assertEqual((s.settled, s.best_rate, s.samples), (500, 5000.0, 5))
+
+    def test_bounds_and_tail_batches(self):
+        s = AdaptiveBatchSize(min_size=100, max_size=250, start=240)
+        s.observe(240, 0.1)
+        self.assertEqual(s.size, 250)
+        s.observe(50, 0.001)  # tail batch: ignored
+        self.assertEqual((s.size, s.samples), (250, 1))
+
+    def test_memory_ceiling(self):
+        s = AdaptiveBatchSize(min_size=10, max_size=100_000, start=50_000, max_bytes=1_000_000)
+        s.limit_memory([("x" * 1000, 1)] * 5, batches_in_flight=2)
+        self.assertLess(s.max_size, 500)
+        self.assertEqual(s.size, s.max_size)
+
+
+class TestBatchSizeState(unittest.TestCase):
+    def test_roundtrip(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "state" / "batch_size.json"
+            self.assertEqual(load_batch_sizes(p), {})
+            save_batch_size(p, "ods_a", 800, 1234.56)
+            save_batch_size(p, "ods_b", 4000, 99.0)
+            save_batch_size(p, "ods_a", 1600, 2000.0)
+            self.assertEqual(load_batch_sizes(p), {"ods_a": 1600, "ods_b": 4000})
+            self.assertEqual(json.loads(p.read_text(encoding="utf-8"))["ods_a"]["rows_per_sec"], 2000.0)
+            p.write_text("not json", encoding="utf-8")
+            self.assertEqual(load_batch_sizes(p), {})
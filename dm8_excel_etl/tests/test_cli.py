@@ -0,0 +1,93 @@
+import datetime as dt
+import logging
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import etl.cli as cli_mod
+from etl.config import AppConfig, OdbcConfig, PathsConfig
+from etl.db import Db
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        if self.conn.fail_on and self.conn.fail_on in sql:
+            raise RuntimeError("boom")
+        self.conn.executed.append(sql)
+        if "FROM etl_mdm_watermark" in sql:
+            self._rows = [("ods_po_exec", dt.datetime(2026, 1, 1))]
+        elif "MAX(etl_time)" in sql:
+            self._rows = [(dt.datetime(2026, 10, 17),)]
+        else:
+            self._rows = []
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.executed = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestBuildMdmWatermarks(unittest.TestCase):
+    def _build(self, d: str, conn: _Conn) -> int:
+        root = Path(d)
+        (root / "sql" / "mdm").mkdir(parents=True)
+        shutil.copy(ROOT / cli_mod.MDM_SQL, root / cli_mod.MDM_SQL)
+        paths = PathsConfig(root=root, inbox=root / "inbox", archive=root / "archive", badrows=root / "badrows", logs=root / "logs")
+        cfg = AppConfig(odbc=OdbcConfig(dsn="dm8", uid=None, pwd=None), paths=paths, jobs=[])
+        originals = cli_mod.load_config, cli_mod.connect
+        cli_mod.load_config = lambda path: cfg
+        cli_mod.connect = lambda odbc: Db(conn=conn, mode="odbc", autocommit=False)
+        try:
+            return cli_mod.main(["build-mdm", "--config", "app.yaml", "--batch-id", "b1"])
+        finally:
+            cli_mod.load_config, cli_mod.connect = originals
+            for handler in logging.getLogger("dm8_excel_etl").handlers:
+                handler.close()
+
+    def _advanced(self, conn: _Conn) -> list[str]:
+        return [sql for sql in conn.executed if sql.startswith("MERGE INTO etl_mdm_watermark")]
+
+    def test_watermarks_advance_after_a_complete_run(self):
+        with tempfile.TemporaryDirectory() as d:
+            conn = _Conn()
+            self.assertEqual(self._build(d, conn), 0)
+            self.assertIn("etl_time > TIMESTAMP '2026-01-01 00:00:00.000000'", "\n".join(conn.executed))
+            self.assertEqual(len(self._advanced(conn)), 4)
+
+    def test_failed_statement_keeps_watermarks(self):
+        with tempfile.TemporaryDirectory() as d:
+            # statement mode: the MERGEs before the failing one stay committed
+            conn = _Conn(fail_on="MERGE INTO mdm_item")
+            self.assertEqual(self._build(d, conn), 1)
+            self.assertTrue(any(sql.startswith("MERGE INTO mdm_project") for sql in conn.executed))
+            self.assertEqual(self._advanced(conn), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
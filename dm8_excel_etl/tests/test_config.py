@@ -71,6 +71,10 @@ class TestConfig(unittest.TestCase):
                     db:
                       dsn: dm8
                       batch_size: 2000
+                      pipeline_depth: 4
+                      sql_commit: 20
+                    excel:
+                      engine: native
                     tables:
                       ods_demo:
                         file: "demo.xlsx"
@@ -85,6 +89,74 @@ class TestConfig(unittest.TestCase):
 
             cfg = load_config(cfg_path)
             self.assertEqual(cfg.odbc.batch_size, 2000)
+            self.assertEqual(cfg.odbc.pipeline_depth, 4)
+            self.assertEqual(cfg.odbc.sql_commit, 20)
             self.assertEqual(len(cfg.jobs), 1)
             self.assertEqual(cfg.jobs[0].table, "ods_demo")
             self.assertEqual(cfg.jobs[0].excel.pattern, "demo.xlsx")
+            self.assertEqual(cfg.jobs[0].excel.engine, "native")
+
+    def test_upsert_keys(self):
+        template = textwrap.dedent(
+            """
+            db:
+              dsn: dm8
+            tables:
+              ods_demo:
+                file: "demo.xlsx"
+                mode: upsert
+                {keys}
+                columns:
+                  - {{excel: "单号", db: "order_no", type: "str"}}
+                  - {{excel: "行号", db: "line_no", type: "str"}}
+                  - {{excel: "AMT", db: "amt", type: "decimal"}}
+            """
+        ).lstrip()
+        with tempfile.TemporaryDirectory() as d:
+            cfg_path = Path(d) / "app.yaml"
+            cfg_path.write_text(template.format(keys='keys: "order_no, line_no"'), encoding="utf-8")
+            self.assertEqual(load_config(cfg_path).jobs[0].keys, ("order_no", "line_no"))
+
+            cfg_path.write_text(template.format(keys=""), encoding="utf-8")
+            with self.assertRaisesRegex(ConfigError, "required for mode: upsert"):
+                load_config(cfg_path)
+
+            cfg_path.write_text(template.format(keys="keys: [order_no, item_code]"), encoding="utf-8")
+            with self.assertRaisesRegex(ConfigError, "item_code"):
+                load_config(cfg_path)
+
+            cfg_path.write_text(template.format(keys='keys: order_no\n    unique: [order_no, line_no]'), encoding="utf-8")
+            self.assertEqual(load_config(cfg_path).jobs[0].unique, (("order_no", "line_no"),))
+
+            cfg_path.write_text(
+                template.format(keys="keys: order_no\n    unique: [[order_no], [line_no, amt]]\n    unique_bloom: 5000000"),
+                encoding="utf-8",
+            )
+            job = load_config(cfg_path).jobs[0]
+            self.assertEqual((job.unique, job.unique_bloom), ((("order_no",), ("line_no", "amt")), 5000000))
+
+    def test_manifest(self):
+        template = textwrap.dedent(
+            """
+            db:
+              dsn: dm8
+            {manifest}
+            tables:
+              ods_demo:
+                file: "demo.xlsx"
+                columns:
+                  - {{excel: "单号", db: "order_no", type: "str"}}
+            """
+        ).lstrip()
+        with tempfile.TemporaryDirectory() as d:
+            cfg_path = Path(d) / "app.yaml"
+            cfg_path.write_text(template.format(manifest=""), encoding="utf-8")
+            self.assertFalse(load_config(cfg_path).manifest.enabled)
+
+            cfg_path.write_text(template.format(manifest="manifest: {duplicates: skip}"), encoding="utf-8")
+            manifest = load_config(cfg_path).manifest
+            self.assertEqual((manifest.enabled, manifest.duplicates, manifest.meta_table), (True, "skip", False))
+
+            cfg_path.write_text(template.format(manifest="manifest: {duplicates: delete}"), encoding="utf-8")
+            with self.assertRaisesRegex(ConfigError, "manifest.duplicates"):
+                load_config(cfg_path)
@@ -2,7 +2,8 @@ import datetime as dt
 import unittest
 
 from etl.config import OdbcConfig
-from etl.db import Db, DbError, adapt_param_rows, adapt_params, connect
+import etl.db as db_mod
+from etl.db import ConnectionPool, Db, DbError, JdbcAdapter, JdbcBatchInsert, adapt_param_rows, adapt_params, connect
 
 
 class TestDb(unittest.TestCase):
@@ -41,3 +42,168 @@ class TestDb(unittest.TestCase):
         )
         self.assertEqual(rows[0][0], "2025-01-02")
         self.assertEqual(rows[1][0], "2025-01-02 03:04:05")
+
+
+class _Conn:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.opened = []
+        original = db_mod.connect
+
+        def fake_connect(odbc):
+            db = Db(conn=_Conn(), mode="odbc", autocommit=False)
+            self.opened.append(db)
+            return db
+
+        db_mod.connect = fake_connect
+        self.addCleanup(setattr, db_mod, "connect", original)
+
+    def test_reuses_and_discards_failed_connections(self):
+        pool = ConnectionPool(OdbcConfig(dsn="dm8", uid=None, pwd=None), size=2)
+        with pool.connection() as a:
+            with pool.connection() as b:
+                self.assertIsNot(a, b)
+        with pool.connection() as c:
+            self.assertIn(c, (a, b))
+        self.assertEqual(len(self.opened), 2)
+
+        with self.assertRaises(RuntimeError):
+            with pool.connection() as d:
+                raise RuntimeError("broken session")
+        self.assertTrue(d.conn.closed)
+        pool.close()
+        self.assertTrue(all(db.conn.closed for db in self.opened))
+
+
+class _FakeStatement:
+    def __init__(self, sql):
+        self.sql = sql
+        self.bound = {}
+        self.batches = []
+        self.executed = []
+        self.closed = False
+
+    def __getattr__(self, name):
+        if not name.startswith("set"):
+            raise AttributeError(name)
+
+        def setter(index, value):
+            if name == "setLong" and not isinstance(value, int):
+                raise TypeError("no matching overloads")
+            self.bound[index] = (name, value)
+
+        return setter
+
+    def addBatch(self):
+        self.batches.append(dict(self.bound))
+        self.bound = {}
+
+    def executeBatch(self):
+        self.executed.append(self.batches)
+        self.batches = []
+
+    def clearBatch(self):
+        self.batches = []
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeJConn:
+    def prepareStatement(self, sql):
+        self.statement = _FakeStatement(sql)
+        return self.statement
+
+
+class _FakeJdbcConn:
+    def __init__(self):
+        self.jconn = _FakeJConn()
+
+
+class _FakeJavaTemporal:
+    def __init__(self, text):
+        self.text = text
+
+    @classmethod
+    def valueOf(cls, text):
+        return cls(text)
+
+    def __eq__(self, other):
+        return (type(self), self.text) == (type(other), other.text)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.text!r})"
+
+
+class _FakeDate(_FakeJavaTemporal):
+    pass
+
+
+class _FakeTimestamp(_FakeJavaTemporal):
+    pass
+
+
+def _fake_jclass(name):
+    return {
+        "java.sql.Types": type("Types", (), {"VARCHAR": 12, "BIGINT": -5, "DECIMAL": 3, "DATE": 91, "TIMESTAMP": 93}),
+        "java.math.BigDecimal": lambda v: ("BigDecimal", v),
+        "java.sql.Date": _FakeDate,
+        "java.sql.Timestamp": _FakeTimestamp,
+    }[name]
+
+
+class TestJdbcAdapter(unittest.TestCase):
+    def test_value_of_per_column(self):
+        adapter = JdbcAdapter(_fake_jclass)
+        adapt = adapter.row_adapter(["int", "date", "datetime", "date"])
+        row = adapt((1, dt.date(2025, 1, 2), dt.datetime(2025, 1, 2, 3, 4, 5, 123456), "2025-01-03"))
+        self.assertEqual(row[0], 1)
+        self.assertEqual(row[1], _FakeDate("2025-01-02"))
+        self.assertEqual(row[2], _FakeTimestamp("2025-01-02 03:04:05.123456"))
+        # wall-clock text: no timezone, no calendar switch
+        self.assertEqual(adapter.date(dt.date(1500, 3, 1)), _FakeDate("1500-03-01"))
+        # not a date (raw default): left to the generic path
+        self.assertEqual(row[3], "2025-01-03")
+        self.assertIsNone(adapter.row_adapter(["int", "str"]))
+
+    def test_adapter_is_cached_only_with_jvm(self):
+        db = Db(conn=None, mode="jdbc", autocommit=False)
+        self.assertFalse(db.jdbc_adapter().jvm)
+        self.assertIsNone(db._jdbc)
+        rows = adapt_param_rows(db, [(dt.date(2025, 1, 2), 1)], ["date", "int"])
+        self.assertEqual(rows, [("2025-01-02", 1)])
+
+
+class TestJdbcBatchInsert(unittest.TestCase):
+    def test_typed_setters_and_batches(self):
+        db = Db(conn=_FakeJdbcConn(), mode="jdbc", autocommit=False)
+        ins = JdbcBatchInsert(
+            db, "INSERT ...", ["int", "decimal", "date", "datetime", "str"], adapter=JdbcAdapter(_fake_jclass)
+        )
+        ins.executemany(
+            [
+                (1, "1.50", dt.date(2025, 1, 2), dt.datetime(2025, 1, 2, 3, 4, 5), "a"),
+                ("7", None, None, None, None),
+            ]
+        )
+        ins.close()
+        ps = db.conn.jconn.statement
+        self.assertEqual(len(ps.executed), 1)
+        first, second = ps.executed[0]
+        self.assertEqual(first[1], ("setLong", 1))
+        self.assertEqual(first[2], ("setBigDecimal", ("BigDecimal", "1.50")))
+        self.assertEqual(first[3], ("setDate", _FakeDate("2025-01-02")))
+        self.assertEqual(first[4], ("setTimestamp", _FakeTimestamp("2025-01-02 03:04:05")))
+        self.assertEqual(first[5], ("setString", "a"))
+        # a value the typed setter rejects falls back to setObject
+        self.assertEqual(second[1], ("setObject", "7"))
+        self.assertEqual(second[2], ("setNull", 3))
+        self.assertEqual(second[5], ("setNull", 12))
+        self.assertTrue(ps.closed)
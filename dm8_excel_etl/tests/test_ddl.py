@@ -0,0 +1,66 @@
+import unittest
+
+from etl.db import Db
+from etl.ddl import IndexDef, table_indexes
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, list(params or [])))
+
+    def fetchall(self):
+        return self.conn.rows
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class TestTableIndexes(unittest.TestCase):
+    def test_groups_columns_and_puts_primary_key_first(self):
+        conn = _Conn(
+            [
+                ("N", "IDX_IO_DATE", "BIZ_DATE", 1, "DESC"),
+                ("N", "IDX_IO_DATE", "ITEM_CODE", 2, "ASC"),
+                ("P", "PK_IO", "ID", 1, "ASC"),
+                ("U", "UK_IO", "DOC_NO", 1, "ASC"),
+            ]
+        )
+        indexes = table_indexes(Db(conn=conn, mode="odbc", autocommit=False), "etl.ods_stock_io_flow")
+        self.assertEqual(
+            indexes,
+            [
+                IndexDef("PK_IO", ("ID",), unique=True, primary=True),
+                IndexDef("IDX_IO_DATE", ("BIZ_DATE", "ITEM_CODE"), descending=(True, False)),
+                IndexDef("UK_IO", ("DOC_NO",), unique=True),
+            ],
+        )
+        sql, params = conn.executed[0]
+        self.assertIn("ALL_INDEXES", sql)
+        self.assertEqual(params.count("ODS_STOCK_IO_FLOW"), 3)
+        self.assertEqual(params.count("ETL"), 5)
+        self.assertEqual(
+            indexes[1].create_sql("ods_stock_io_flow"),
+            "CREATE INDEX IDX_IO_DATE ON ods_stock_io_flow(BIZ_DATE DESC, ITEM_CODE)",
+        )
+        self.assertEqual(indexes[1].drop_sql("etl.ods_stock_io_flow"), "DROP INDEX etl.IDX_IO_DATE")
+        self.assertEqual(
+            indexes[0].drop_sql("etl.ods_stock_io_flow"), "ALTER TABLE etl.ods_stock_io_flow DROP CONSTRAINT PK_IO"
+        )
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from etl.delta import RowHashStore, row_hash
+
+
+class TestRowHashStore(unittest.TestCase):
+    def test_skips_unchanged_rows_after_commit_only(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "rowhash" / "ods_demo.sqlite"
+            store = RowHashStore(path, key_idx=[0])
+            self.assertTrue(store.changed(("A1", "1.50")))
+            store.rollback()  # failed load: nothing remembered
+            self.assertTrue(store.changed(("A1", "1.50")))
+            self.assertTrue(store.changed(("A2", None)))
+            store.commit()
+            store.close()
+
+            store = RowHashStore(path, key_idx=[0])
+            self.assertFalse(store.changed(("A1", "1.50")))
+            self.assertTrue(store.changed(("A2", "")))
+            self.assertEqual(store.skipped, 1)
+            store.close()
+
+    def test_missing_keys_of_a_full_snapshot(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "ods_demo.sqlite"
+            store = RowHashStore(path, key_idx=[0, 1])
+            for row in [("P1", 1, "x"), ("P1", 2, "y"), ("P2", 1, "z")]:
+                store.changed(row)
+            store.commit()
+            store.close()
+
+            store = RowHashStore(path, key_idx=[0, 1], track_seen=True)
+            store.changed(("P1", 1, "x"))
+            store.changed(("P2", 1, "z2"))
+            gone = store.missing_keys()
+            self.assertEqual(gone, [["P1", "2"]])
+            store.forget(gone)
+            store.commit()
+            self.assertEqual(store.missing_keys(), [])
+            store.close()
+
+    def test_decimal_and_str_hash_alike(self):
+        self.assertEqual(row_hash(("A", Decimal("1.50"))), row_hash(("A", "1.50")))
+        self.assertNotEqual(row_hash(("A", None)), row_hash(("A", "")))
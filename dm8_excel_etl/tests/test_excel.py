@@ -1,8 +1,22 @@
 import datetime as dt
+import tempfile
+import tracemalloc
 import unittest
+from dataclasses import dataclass
 from decimal import Decimal
+from pathlib import Path
 
-from etl.excel import convert_value
+from etl.config import ColumnMapping, ExcelConfig
+from etl.csv_parallel import open_parallel_csv, supports_parallel
+from etl.excel import (
+    DateParser,
+    ExcelError,
+    ParsedRow,
+    compile_row_plan,
+    convert_value,
+    iter_column_batches,
+    iter_rows,
+)
 
 
 class TestExcelConvert(unittest.TestCase):
@@ -23,3 +37,290 @@ class TestExcelConvert(unittest.TestCase):
     def test_bool(self):
         self.assertEqual(convert_value("是", "bool"), True)
         self.assertEqual(convert_value("否", "bool"), False)
+
+
+class TestRowPlan(unittest.TestCase):
+    def test_default_required_and_max_length(self):
+        columns = [
+            ColumnMapping(excel="A", db="a", type="str", max_length=3),
+            ColumnMapping(excel="B", db="b", type="int", required=True),
+            ColumnMapping(excel="C", db="c", type="str", default="abcdef", max_length=4),
+            ColumnMapping(excel="D", db="d", type="decimal"),
+        ]
+        plan = compile_row_plan(columns, {"D": 0, "C": 1, "B": 2, "A": 3})
+
+        r = plan.convert(2, ["1,234.50", "", "7", " hello "])
+        self.assertTrue(r.ok)
+        self.assertEqual(r.values, ("hel", 7, "abcd", Decimal("1234.50")))
+        self.assertEqual(r.errors, ())
+
+        r = plan.convert(3, ["x", None])
+        self.assertEqual(r.row_number, 3)
+        self.assertEqual(r.as_dict(["a", "b", "c", "d"]), {"a": None, "b": None, "c": "abcd", "d": None})
+        self.assertEqual(r.errors[0], "B required")
+        self.assertTrue(r.errors[1].startswith("D invalid:"))
+
+    def test_csv_rows(self):
+        columns = [
+            ColumnMapping(excel="ID", db="id", type="int", required=True),
+            ColumnMapping(excel="日期", db="d", type="date"),
+        ]
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "t.csv"
+            p.write_text("ID,日期\n1,2025-01-02\n,2025/01/03\n", encoding="utf-8-sig")
+            _, rows = iter_rows(str(p), ExcelConfig(pattern="*.csv"), columns)
+            rows = list(rows)
+        self.assertEqual([r.row_number for r in rows], [2, 3])
+        self.assertEqual(rows[0].values, (1, dt.date(2025, 1, 2)))
+        self.assertEqual(rows[1].errors, ["ID required"])
+
+    def test_decimal_as_str(self):
+        columns = [ColumnMapping(excel="D", db="d", type="decimal")]
+        self.assertEqual(compile_row_plan(columns, {"D": 0}, decimal_as_str=True).convert(2, ["1,234.50"]).values, ("1234.50",))
+
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "t.csv"
+            p.write_text("D\n1.50\n\n", encoding="utf-8-sig")
+            batch = next(iter_column_batches(str(p), ExcelConfig(pattern="*.csv"), columns, decimal_as_str=True))
+        self.assertEqual(batch.columns["d"], ["1.50", None])
+
+
+@dataclass(frozen=True)
+class _DictRow:
+    # previous ParsedRow layout: one dict + one list per row
+    row_number: int
+    values: dict
+    errors: list
+
+
+class TestParsedRowMemory(unittest.TestCase):
+    ROWS = 100_000
+
+    def _measure(self, fn):
+        tracemalloc.start()
+        try:
+            result = fn()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+        return result, peak, blocks
+
+    def test_slot_rows_use_less_memory_than_dict_rows(self):
+        columns = [
+            ColumnMapping(excel="ID", db="id", type="int", required=True),
+            ColumnMapping(excel="名称", db="name", type="str"),
+            ColumnMapping(excel="数量", db="qty", type="int"),
+            ColumnMapping(excel="日期", db="d", type="date"),
+        ]
+        names = [c.db for c in columns]
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "t.csv"
+            lines = ["ID,名称,数量,日期"] + [f"{i},n{i % 100},{i % 7},2025-01-02" for i in range(self.ROWS)]
+            p.write_text("\n".join(lines) + "\n", encoding="utf-8-sig")
+            cfg = ExcelConfig(pattern="*.csv")
+
+            rows, slot_peak, slot_blocks = self._measure(lambda: list(iter_rows(str(p), cfg, columns)[1]))
+            dict_rows, dict_peak, dict_blocks = self._measure(
+                lambda: [
+                    _DictRow(r.row_number, r.as_dict(names), list(r.errors))
+                    for r in iter_rows(str(p), cfg, columns)[1]
+                ]
+            )
+
+        self.assertEqual(len(rows), self.ROWS)
+        self.assertEqual(len(dict_rows), self.ROWS)
+        self.assertTrue(all(r.errors == () for r in rows))
+        self.assertFalse(hasattr(rows[0], "__dict__"))
+        # values tuple + slotted object (+ the converted values) vs instance dict + values dict + list
+        self.assertLess(slot_peak / self.ROWS, 0.75 * dict_peak / self.ROWS)
+        self.assertLess(slot_blocks / self.ROWS, dict_blocks / self.ROWS - 2)
+
+
+class TestParallelCsv(unittest.TestCase):
+    COLUMNS = [
+        ColumnMapping(excel="ID", db="id", type="int", required=True),
+        ColumnMapping(excel="备注", db="note", type="str"),
+        ColumnMapping(excel="金额", db="amt", type="decimal"),
+    ]
+
+    def _body(self, rows: int = 60) -> str:
+        lines = ["ID,备注,金额"]
+        for i in range(rows):
+            if i % 7 == 0:
+                lines.append(f'{i},"多行\n备注 ""{i}"", 含逗号",{i}.5')
+            elif i % 11 == 0:
+                lines.append(f"x{i},坏行,abc")
+            elif i % 13 == 0:
+                lines.append("")
+            else:
+                lines.append(f"{i},备注{i},{i}")
+        return "\n".join(lines) + "\n"
+
+    def _assert_matches_serial(self, text: str, encoding: str, range_bytes: int = 64):
+        cfg = ExcelConfig(pattern="*.csv", csv_encoding=encoding)
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "t.csv"
+            p.write_bytes(text.encode(encoding))
+            expected = list(iter_rows(str(p), cfg, self.COLUMNS, decimal_as_str=True)[1])
+            opened = open_parallel_csv(str(p), cfg, self.COLUMNS, workers=2, decimal_as_str=True, range_bytes=range_bytes)
+            self.assertIsNotNone(opened)
+            header_index, rows = opened
+            actual = list(rows)
+        self.assertEqual(header_index, {"ID": 0, "备注": 1, "金额": 2})
+        self.assertEqual(actual, expected)
+        self.assertTrue(any(not r.ok for r in actual))
+        self.assertTrue(any("\n" in (r.values[1] or "") for r in actual))
+
+    def test_utf8_sig_and_gbk_match_serial(self):
+        self._assert_matches_serial(self._body(), "utf-8-sig")
+        self._assert_matches_serial(self._body(), "gbk")
+
+    def test_gb18030_refuses_digit_delimiter(self):
+        # "ä" is the four-byte GB18030 sequence 81 30 8A 31: a byte scan for "0" would cut it
+        self.assertEqual("ä".encode("gb18030"), b"\x810\x8a1")
+        self.assertFalse(supports_parallel(ExcelConfig(pattern="*.csv", csv_encoding="gb18030", csv_delimiter="0")))
+        self.assertTrue(supports_parallel(ExcelConfig(pattern="*.csv", csv_encoding="gbk", csv_delimiter="0")))
+        self.assertTrue(supports_parallel(ExcelConfig(pattern="*.csv", csv_encoding="gb18030")))
+
+    def test_stray_quote_falls_back_to_serial(self):
+        # the unquoted `12"` flips quote parity, so some ranges split inside the quoted field
+        text = self._body(20).replace("\n3,备注3,3\n", '\n3,12" 管,3\n')
+        self.assertIn('12"', text)
+        self._assert_matches_serial(text, "utf-8-sig", range_bytes=16)
+
+    def test_small_file_uses_serial_reader(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "t.csv"
+            p.write_text(self._body(5), encoding="utf-8-sig")
+            cfg = ExcelConfig(pattern="*.csv")
+            self.assertIsNone(open_parallel_csv(str(p), cfg, self.COLUMNS, workers=2))
+            rows = list(iter_rows(str(p), ExcelConfig(pattern="*.csv", csv_workers=2), self.COLUMNS)[1])
+        self.assertEqual([r.row_number for r in rows], [2, 3, 4, 5, 6])
+
+
+class TestNativeXlsx(unittest.TestCase):
+    def _write_workbook(self, path: Path, epoch_1904: bool = False) -> None:
+        from openpyxl import Workbook
+        from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+        wb = Workbook()
+        if epoch_1904:
+            wb.epoch = CALENDAR_MAC_1904
+        wb.active.title = "Other"
+        ws = wb.create_sheet("Data")
+        ws.append(["ID", "日期", "金额", "名称", "启用", "未映射"])
+        ws.append([1, dt.datetime(2025, 1, 2, 3, 4, 5), 1.5, "甲", True, "x"])
+        ws.append([2, dt.date(1904, 1, 2), "2,000.10", None, False, "y"])
+        ws.append([None, None, None, None, None, None])
+        ws.append([4, "2025/02/03", 3, "  丙 ", "是", "z"])
+        ws.cell(row=8, column=1, value=8)
+        wb.save(path)
+
+    def test_native_engine_matches_openpyxl(self):
+        columns = [
+            ColumnMapping(excel="ID", db="id", type="int", required=True),
+            ColumnMapping(excel="日期", db="d", type="datetime"),
+            ColumnMapping(excel="金额", db="amt", type="decimal"),
+            ColumnMapping(excel="名称", db="name", type="str"),
+            ColumnMapping(excel="启用", db="flag", type="bool"),
+        ]
+        for epoch_1904 in (False, True):
+            with tempfile.TemporaryDirectory() as d:
+                p = Path(d) / "t.xlsx"
+                self._write_workbook(p, epoch_1904=epoch_1904)
+                expected = list(iter_rows(str(p), ExcelConfig(sheet="Data"), columns)[1])
+                actual = list(iter_rows(str(p), ExcelConfig(sheet="Data", engine="native"), columns)[1])
+            self.assertEqual(actual, expected)
+            self.assertEqual(actual[0].values[1], dt.datetime(2025, 1, 2, 3, 4, 5))
+            self.assertEqual(actual[1].values[1], dt.datetime(1904, 1, 2))
+            self.assertEqual([r.row_number for r in actual], [2, 3, 4, 5, 6, 7, 8])
+
+    def test_native_engine_missing_sheet(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "t.xlsx"
+            self._write_workbook(p)
+            with self.assertRaises(ExcelError):
+                iter_rows(str(p), ExcelConfig(sheet="Nope", engine="native"), [ColumnMapping(excel="ID", db="id")])
+
+
+class TestDateParser(unittest.TestCase):
+    def test_learns_format_and_matches_dateutil(self):
+        from dateutil import parser as dt_parser
+
+        samples = [
+            "2025-01-02",
+            "2025-01-02 03:04:05",
+            "2025-01-02T03:04:05",
+            "2025/1/2",
+            "2025/01/02 03:04:05",
+            "2025.01.02",
+            "2025-01-02 03:04",
+            "20250102",
+            "Jan 2 2025",
+            "2025-01-02 03:04:05.250000",
+        ]
+        for s in samples:
+            p = DateParser("datetime")
+            self.assertEqual(p(s), dt_parser.parse(s), s)
+            self.assertEqual(DateParser("date")(s), dt_parser.parse(s).date(), s)
+
+    def test_each_column_learns_its_own_format(self):
+        columns = [ColumnMapping(excel="A", db="a", type="date"), ColumnMapping(excel="B", db="b", type="date")]
+        plan = compile_row_plan(columns, {"A": 0, "B": 1})
+        self.assertEqual(plan.convert(2, ["2025/01/02", "20250304"]).values, (dt.date(2025, 1, 2), dt.date(2025, 3, 4)))
+        first, second = (step[2] for step in plan.steps)
+        self.assertIsNot(first, second)
+        self.assertEqual((first.fmt, second.fmt), ("%Y/%m/%d", "%Y%m%d"))
+
+    def test_fast_path_and_cache(self):
+        p = DateParser("date")
+        self.assertEqual(p("2025/01/02"), dt.date(2025, 1, 2))
+        self.assertEqual(p.fmt, "%Y/%m/%d")
+        self.assertEqual(p(" 2025/01/02 "), dt.date(2025, 1, 2))
+        self.assertEqual(p("2025-03-04"), dt.date(2025, 3, 4))
+        self.assertEqual(p.fmt, "%Y/%m/%d")
+        self.assertEqual(p.cache_info().hits, 1)
+        self.assertIsNone(p("  "))
+        self.assertEqual(p(dt.datetime(2025, 1, 2, 3, 4)), dt.date(2025, 1, 2))
+        with self.assertRaises(ValueError):
+            p("not a date")
+
+
+class TestColumnBatches(unittest.TestCase):
+    def _assert_matches_rows(self, text: str, columns, batch_rows: int = 3):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "t.csv"
+            p.write_text(text, encoding="utf-8-sig")
+            cfg = ExcelConfig(pattern="*.csv")
+            expected = list(iter_rows(str(p), cfg, columns)[1])
+            batches = list(iter_column_batches(str(p), cfg, columns, batch_rows=batch_rows))
+        self.assertTrue(all(len(b) <= batch_rows for b in batches))
+        actual = []
+        for b in batches:
+            for i, n in enumerate(b.row_numbers):
+                values = tuple(b.columns[c.db][i] for c in columns)
+                actual.append(ParsedRow(row_number=n, values=values, errors=b.errors.get(i, [])))
+                self.assertEqual(b.error_mask[i], i in b.errors)
+        self.assertEqual(actual, expected)
+
+    def test_matches_iter_rows(self):
+        columns = [
+            ColumnMapping(excel="I", db="i", type="int", required=True),
+            ColumnMapping(excel="F", db="f", type="float", default=0.0),
+            ColumnMapping(excel="D", db="d", type="decimal"),
+            ColumnMapping(excel="T", db="t", type="date"),
+        ]
+        self._assert_matches_rows("I,F,D,T\n1, 1.5,1.50,2025-01-02\n2,,x,\n,3,4,2025/01/03\n4,1e2,,\n5,y,6,bad\n", columns)
+        self._assert_matches_rows("I,F,D,T\n1,2,3,2025-01-02\n 4 ,5.5,6,2025-01-03\n", columns)
+
+    def test_pure_python_fallback(self):
+        import etl.excel as excel_mod
+
+        original = excel_mod._numpy
+        excel_mod._numpy = lambda: None
+        try:
+            self.test_matches_iter_rows()
+        finally:
+            excel_mod._numpy = original
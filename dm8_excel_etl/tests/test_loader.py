@@ -0,0 +1,752 @@
+import json
+import queue
+import tempfile
+import threading
+import unittest
+from dataclasses import replace
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+from etl.config import AppConfig, ColumnMapping, ExcelConfig, JobConfig, ManifestConfig, OdbcConfig, PathsConfig
+import etl.db as db_mod
+import etl.loader as loader_mod
+from etl.db import Db, DbError
+from etl.excel import ExcelError
+from etl.loader import LoadError, load_job_file, load_ods
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.fast_executemany = False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, list(params or [])))
+        rows = self.conn.query_rows(sql) if callable(self.conn.query_rows) else self.conn.query_rows
+        self._fetched = rows if sql.lstrip().upper().startswith("SELECT") else []
+
+    def setinputsizes(self, sizes):
+        self.conn.input_sizes.append(list(sizes))
+
+    def columns(self, table=None, schema=None):
+        if self.conn.catalog is None:
+            raise RuntimeError("SQLColumns not supported")
+        self._fetched = self.conn.catalog if table == "ODS_DEMO" else []
+        return self
+
+    def fetchall(self):
+        return self._fetched
+
+    def executemany(self, sql, rows):
+        self.conn.threads.add(threading.current_thread().name)
+        if self.conn.fail_on_batch == len(self.conn.batches) + 1:
+            raise RuntimeError("boom")
+        if self.conn.reject is not None and any(self.conn.reject(row) for row in rows):
+            self.conn.rejected_calls += 1
+            raise self.conn.reject_error
+        self.conn.batches.append((sql, list(rows)))
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self):
+        self.executed = []
+        self.batches = []
+        self.threads = set()
+        self.fail_on_batch = None
+        self.reject = None
+        self.reject_error = RuntimeError("[CODE:-6108] value too large\nsecond line")
+        self.rejected_calls = 0
+        self.catalog = None
+        self.query_rows = []
+        self.input_sizes = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+    @property
+    def inserted(self):
+        return [row for _, rows in self.batches for row in rows]
+
+
+COLUMNS = [
+    ColumnMapping(excel="ID", db="id", type="int", required=True),
+    ColumnMapping(excel="金额", db="amt", type="decimal"),
+    ColumnMapping(excel="名称", db="name", type="str", max_length=4),
+]
+
+CSV_TEXT = "ID,金额,名称\n1,1.50,alpha\n2,x,b\n,,\n3,\"1,000\",c\n,2,d\n4,,\n"
+
+
+def make_env(d: str, columnar: bool = False, mode: str = "append") -> tuple[AppConfig, JobConfig, Path]:
+    root = Path(d)
+    paths = PathsConfig(
+        root=root,
+        inbox=root / "inbox",
+        archive=root / "archive",
+        badrows=root / "badrows",
+        logs=root / "logs",
+    )
+    paths.inbox.mkdir(parents=True)
+    job = JobConfig(
+        name="demo",
+        enabled=True,
+        table="ods_demo",
+        mode=mode,  # type: ignore[arg-type]
+        excel=ExcelConfig(pattern="*.csv", columnar=columnar),
+        columns=COLUMNS,
+    )
+    cfg = AppConfig(odbc=OdbcConfig(dsn="dm8", uid=None, pwd=None), paths=paths, jobs=[job])
+    f = paths.inbox / "demo.csv"
+    f.write_text(CSV_TEXT, encoding="utf-8-sig")
+    return cfg, job, f
+
+
+def _swap_dictionary(blockers):
+    def rows(sql):
+        if "ALL_TRIGGERS" in sql:
+            return blockers
+        if "ALL_TAB_PRIVS" in sql:
+            return [("BI", "SELECT", "NO"), ("report", "SELECT", "YES")]
+        if "COMMENTS" in sql:
+            return [(None, "demo 'ods'"), ("NAME", "名称")]
+        return [("P", "PK_ODS_DEMO", "ID", 1, "ASC"), ("N", "IDX_ODS_DEMO_NAME", "NAME", 1, "ASC")]
+
+    return rows
+
+
+class TestLoadJobFile(unittest.TestCase):
+    def _load(self, columnar: bool, batch_size: int = 2, pipeline_depth: int = 0):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, columnar=columnar)
+            conn = FakeConn()
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            r = load_job_file(db, cfg, job, f, batch_id="b1", batch_size=batch_size, pipeline_depth=pipeline_depth)
+            badrows = r.badrows_csv.read_text(encoding="utf-8-sig") if r.badrows_csv else ""
+            self.assertIsNotNone(r.archived_file)
+            self.assertTrue(r.archived_file.exists())
+        return r, conn, badrows
+
+    def test_row_mode(self):
+        r, conn, badrows = self._load(columnar=False)
+        self.assertEqual((r.total_rows, r.ok_rows, r.bad_rows), (5, 3, 2))
+        self.assertEqual(conn.inserted, [(1, "1.50", "alph"), (3, "1000", "c"), (4, None, None)])
+        self.assertEqual(conn.commits, 1)
+        self.assertIn("金额 invalid", badrows)
+        self.assertIn("ID required", badrows)
+        # no catalog: sizes from the mapping, decimal left to the driver
+        self.assertEqual(conn.input_sizes, [[(db_mod.SQL_BIGINT, 0, 0), None, (db_mod.SQL_WVARCHAR, 4, 0)]])
+
+    def test_catalog_input_sizes_bind_decimal_natively(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d)
+            f.write_text(CSV_TEXT + "5,2.345,名称\n6,-2.345,f\n", encoding="utf-8-sig")
+            conn = FakeConn()
+            conn.catalog = [
+                SimpleNamespace(column_name="ID", data_type=db_mod.SQL_INTEGER, column_size=10, decimal_digits=0),
+                SimpleNamespace(column_name="AMT", data_type=db_mod.SQL_DECIMAL, column_size=18, decimal_digits=2),
+                SimpleNamespace(column_name="NAME", data_type=db_mod.SQL_VARCHAR, column_size=20, decimal_digits=None),
+            ]
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+            self.assertEqual(
+                conn.input_sizes,
+                # character columns bound wide, as without the catalog
+                [[(db_mod.SQL_INTEGER, 10, 0), (db_mod.SQL_DECIMAL, 18, 2), (db_mod.SQL_WVARCHAR, 20, 0)]],
+            )
+            self.assertEqual(
+                conn.inserted,
+                [
+                    (1, Decimal("1.50"), "alph"),
+                    (3, Decimal("1000"), "c"),
+                    (4, None, None),
+                    # more scale than NUMBER(18,2): rounded half-up like DM's cast of a string
+                    (5, Decimal("2.35"), "名称"),
+                    (6, Decimal("-2.35"), "f"),
+                ],
+            )
+
+    def test_decimal_as_str_binds_varchar(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d)
+            # AMT2 is missing from the catalog, so both decimal columns go out as str
+            job = replace(job, columns=[*COLUMNS, ColumnMapping(excel="金额", db="amt2", type="decimal")])
+            conn = FakeConn()
+            conn.catalog = [
+                SimpleNamespace(column_name="ID", data_type=db_mod.SQL_INTEGER, column_size=10, decimal_digits=0),
+                SimpleNamespace(column_name="AMT", data_type=db_mod.SQL_DECIMAL, column_size=18, decimal_digits=2),
+            ]
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+            self.assertEqual(
+                conn.input_sizes,
+                [[(db_mod.SQL_INTEGER, 10, 0), (db_mod.SQL_VARCHAR, 20, 0), (db_mod.SQL_WVARCHAR, 4, 0), None]],
+            )
+            self.assertEqual(conn.inserted[0], (1, "1.50", "alph", "1.50"))
+
+    def test_columnar_mode_matches_row_mode(self):
+        expected = self._load(columnar=False)
+        actual = self._load(columnar=True)
+        self.assertEqual(actual[0].total_rows, expected[0].total_rows)
+        self.assertEqual(actual[0].bad_rows, expected[0].bad_rows)
+        self.assertEqual(actual[1].inserted, expected[1].inserted)
+        self.assertTrue(all(len(rows) <= 2 for _, rows in actual[1].batches))
+        self.assertEqual(actual[2].splitlines()[1:], expected[2].splitlines()[1:])
+
+    def test_auto_batch_size_is_recorded(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d)
+            cfg = AppConfig(
+                odbc=OdbcConfig(dsn="dm8", uid=None, pwd=None, batch_size_min=1, batch_size_max=2),
+                paths=cfg.paths,
+                jobs=cfg.jobs,
+            )
+            conn = FakeConn()
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            r = load_job_file(db, cfg, job, f, batch_id="b1", batch_size="auto")
+            self.assertEqual(conn.inserted, [(1, "1.50", "alph"), (3, "1000", "c"), (4, None, None)])
+            self.assertEqual([len(rows) for _, rows in conn.batches], [1, 2])
+            state = Path(d) / "data" / "state" / "batch_size.json"
+            self.assertIn(r.table, state.read_text(encoding="utf-8"))
+
+    def test_swap_mode_loads_stage_and_renames(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="swap")
+            cfg = replace(cfg, odbc=replace(cfg.odbc, index_parallel=4))
+            conn = FakeConn()
+            conn.query_rows = _swap_dictionary([("VIEW", "ETL.V_DEMO")])
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+            self.assertTrue(all("ods_demo__stg" in sql for sql, _ in conn.batches))
+            ddl = [sql for sql, _ in conn.executed if not sql.startswith("SELECT")]
+            self.assertEqual(
+                ddl,
+                [
+                    "DROP TABLE ods_demo__stg",
+                    "CREATE TABLE ods_demo__stg LIKE ods_demo",
+                    "ALTER TABLE ods_demo__stg ADD CONSTRAINT PK_ODS_DEMO__stg PRIMARY KEY (ID)",
+                    "CREATE INDEX IDX_ODS_DEMO_NAME__stg ON ods_demo__stg(NAME) PARALLEL 4",
+                    "GRANT SELECT ON ods_demo__stg TO BI",
+                    'GRANT SELECT ON ods_demo__stg TO "report" WITH GRANT OPTION',
+                    "COMMENT ON TABLE ods_demo__stg IS 'demo ''ods'''",
+                    "COMMENT ON COLUMN ods_demo__stg.NAME IS '名称'",
+                    "DROP TABLE ods_demo__old",
+                    "ALTER TABLE ods_demo RENAME TO ods_demo__old",
+                    "ALTER TABLE ods_demo__stg RENAME TO ods_demo",
+                    "DROP TABLE ods_demo__old",
+                    "ALTER TABLE ods_demo RENAME CONSTRAINT PK_ODS_DEMO__stg TO PK_ODS_DEMO",
+                    "ALTER INDEX IDX_ODS_DEMO_NAME__stg RENAME TO IDX_ODS_DEMO_NAME",
+                ],
+            )
+
+    def test_swap_mode_refuses_triggers(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="swap")
+            conn = FakeConn()
+            conn.query_rows = _swap_dictionary([("TRIGGER", "TRG_ODS_DEMO")])
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            with self.assertRaisesRegex(DbError, "trigger TRG_ODS_DEMO"):
+                load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+            self.assertEqual([sql for sql, _ in conn.executed if not sql.startswith("SELECT")], [])
+            self.assertEqual(conn.batches, [])
+
+    def test_swap_mode_failure_keeps_live_table(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="swap")
+            conn = FakeConn()
+            conn.fail_on_batch = 2
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            with self.assertRaises(DbError):
+                load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+            ddl = [sql for sql, _ in conn.executed if not sql.startswith("SELECT")]
+            self.assertEqual(ddl[-1], "DROP TABLE ods_demo__stg")
+            self.assertFalse(any("RENAME" in sql for sql in ddl))
+
+    def test_upsert_mode_merges_stage(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="upsert")
+            job = replace(job, keys=("id",))
+            f.write_text(CSV_TEXT + "3,2,dup\n", encoding="utf-8-sig")
+            conn = FakeConn()
+            conn.query_rows = lambda sql: [("ID",), ("ETL_TIME",)] if "TAB_COLUMNS" in sql else [(3, 1, 1)]
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            r = load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+            self.assertEqual((r.inserted_rows, r.updated_rows, r.unchanged_rows), (1, 1, 1))
+            self.assertTrue(all("ods_demo__stg" in sql for sql, _ in conn.batches))
+            # a second row for a key would make the MERGE fail: it goes to badrows instead
+            self.assertEqual([row[0] for row in conn.inserted], [1, 3, 4])
+            self.assertIn("8,duplicate key (id=3),3,2,dup", r.badrows_csv.read_text(encoding="utf-8-sig").replace("\r", ""))
+            ddl = [sql for sql, _ in conn.executed if not sql.startswith("SELECT")]
+            self.assertEqual(ddl[:2], ["TRUNCATE TABLE ods_demo__stg", "DROP TABLE ods_demo__stg"])
+            self.assertEqual(
+                ddl[2],
+                "CREATE GLOBAL TEMPORARY TABLE ods_demo__stg ON COMMIT PRESERVE ROWS"
+                " AS SELECT id, amt, name FROM ods_demo WHERE 1 = 0",
+            )
+            self.assertEqual(
+                ddl[3],
+                "MERGE INTO ods_demo T USING ods_demo__stg S ON (T.id = S.id)"
+                " WHEN MATCHED THEN UPDATE SET T.amt = S.amt, T.name = S.name, T.etl_time = CURRENT_TIMESTAMP"
+                " WHERE DECODE(T.amt, S.amt, 0, 1) = 1 OR DECODE(T.name, S.name, 0, 1) = 1"
+                " WHEN NOT MATCHED THEN INSERT (id, amt, name) VALUES (S.id, S.amt, S.name)",
+            )
+            self.assertEqual(ddl[-2:], ["TRUNCATE TABLE ods_demo__stg", "DROP TABLE ods_demo__stg"])
+
+    def test_upsert_delta_skips_unchanged_rows(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="upsert")
+            job = replace(job, keys=("id",), delta=True)
+            first = FakeConn()
+            first.query_rows = [(3, 3, 0)]
+            load_job_file(Db(conn=first, mode="odbc", autocommit=False), cfg, job, f, batch_id="b1", batch_size=2)
+            self.assertEqual(len(first.inserted), 3)
+
+            f.write_text(CSV_TEXT.replace("4,,", "4,9,"), encoding="utf-8-sig")
+            second = FakeConn()
+            second.query_rows = [(1, 0, 1)]
+            r = load_job_file(Db(conn=second, mode="odbc", autocommit=False), cfg, job, f, batch_id="b2", batch_size=2)
+            self.assertEqual(second.inserted, [(4, "9", None)])
+            self.assertEqual((r.inserted_rows, r.updated_rows, r.unchanged_rows), (0, 1, 2))
+
+            f.write_text(CSV_TEXT.replace("4,,", "4,9,"), encoding="utf-8-sig")
+            third = FakeConn()
+            r = load_job_file(Db(conn=third, mode="odbc", autocommit=False), cfg, job, f, batch_id="b3", batch_size=2)
+            self.assertEqual(third.inserted, [])
+            self.assertFalse(any(sql.startswith("MERGE") for sql, _ in third.executed))
+            self.assertEqual(r.unchanged_rows, 3)
+
+    def test_upsert_delta_deletes_missing_keys(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="upsert")
+            job = replace(job, keys=("id",), delta=True, delta_deletes=True)
+            first = FakeConn()
+            first.query_rows = [(3, 3, 0)]
+            load_job_file(Db(conn=first, mode="odbc", autocommit=False), cfg, job, f, batch_id="b1")
+
+            f.write_text(CSV_TEXT.replace("4,,\n", ""), encoding="utf-8-sig")
+            conn = FakeConn()
+            r = load_job_file(Db(conn=conn, mode="odbc", autocommit=False), cfg, job, f, batch_id="b2")
+            self.assertEqual(conn.batches, [("DELETE FROM ods_demo WHERE id = ?", [("4",)])])
+            self.assertEqual(r.deleted_rows, 1)
+
+    def test_upsert_delta_deletes_keeps_bad_rows(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="upsert")
+            job = replace(job, keys=("id",), delta=True, delta_deletes=True)
+            f.write_text(CSV_TEXT.replace("2,x,b", "2,1,b"), encoding="utf-8-sig")
+            first = FakeConn()
+            first.query_rows = [(4, 4, 0)]
+            load_job_file(Db(conn=first, mode="odbc", autocommit=False), cfg, job, f, batch_id="b1")
+
+            # id 2 is a bad row today (amount invalid): still in the snapshot
+            f.write_text(CSV_TEXT, encoding="utf-8-sig")
+            conn = FakeConn()
+            conn.query_rows = [(0, 0, 0)]
+            r = load_job_file(Db(conn=conn, mode="odbc", autocommit=False), cfg, job, f, batch_id="b2")
+            self.assertFalse(any(sql.startswith("DELETE") for sql, _ in conn.batches))
+            self.assertEqual(r.deleted_rows, 0)
+
+            # an unparseable key could be any row: nothing is deleted
+            f.write_text(CSV_TEXT.replace("4,,\n", "x4,5,\n"), encoding="utf-8-sig")
+            conn = FakeConn()
+            conn.query_rows = [(0, 0, 0)]
+            r = load_job_file(Db(conn=conn, mode="odbc", autocommit=False), cfg, job, f, batch_id="b3")
+            self.assertFalse(any(sql.startswith("DELETE") for sql, _ in conn.batches))
+            self.assertIsNone(r.deleted_rows)
+
+    def test_delta_deletes_rejects_several_files(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="upsert")
+            job = replace(job, keys=("id",), delta=True, delta_deletes=True)
+            (f.parent / "demo2.csv").write_text(CSV_TEXT, encoding="utf-8-sig")
+            cfg = replace(cfg, jobs=[job])
+            with self.assertRaisesRegex(ValueError, "exactly one file"):
+                load_ods(cfg, dry_run=True)
+            self.assertTrue(f.exists())
+
+    def test_dry_run(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d)
+            r = load_job_file(None, cfg, job, f, batch_id="b1", dry_run=True)
+            self.assertEqual((r.total_rows, r.ok_rows, r.bad_rows), (5, 3, 2))
+            self.assertIsNone(r.archived_file)
+            self.assertTrue(f.exists())
+
+    def test_pipelined_matches_serial(self):
+        expected = self._load(columnar=False)
+        for columnar in (False, True):
+            r, conn, badrows = self._load(columnar=columnar, batch_size=1, pipeline_depth=1)
+            self.assertEqual((r.total_rows, r.ok_rows, r.bad_rows), (5, 3, 2))
+            self.assertEqual(conn.inserted, expected[1].inserted)
+            self.assertEqual(len(conn.batches), 3)
+            self.assertEqual(conn.threads, {"dm8-etl-writer"})
+            self.assertEqual(conn.commits, 1)
+
+    def test_pipelined_write_error_rolls_back(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d)
+            conn = FakeConn()
+            conn.fail_on_batch = 2
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            with self.assertRaises(DbError) as ctx:
+                load_job_file(db, cfg, job, f, batch_id="b1", batch_size=1, pipeline_depth=2)
+            self.assertIn("boom", str(ctx.exception))
+            self.assertEqual((conn.commits, conn.rollbacks), (0, 1))
+            self.assertEqual(len(conn.batches), 1)
+            self.assertTrue(f.exists())
+
+
+    def test_commit_every_checkpoints_and_resume(self):
+        for columnar, depth in ((False, 0), (True, 0), (False, 2)):
+            with tempfile.TemporaryDirectory() as d:
+                cfg, job, f = make_env(d, columnar=columnar)
+                conn = FakeConn()
+                conn.fail_on_batch = 2
+                db = Db(conn=conn, mode="odbc", autocommit=False)
+                with self.assertRaises(DbError):
+                    load_job_file(db, cfg, job, f, batch_id="b1", batch_size=1, pipeline_depth=depth, commit_every=1)
+                self.assertEqual((conn.commits, conn.rollbacks), (1, 1))
+                merged = [p for sql, p in conn.executed if sql.startswith("MERGE INTO etl_load_checkpoint")]
+                self.assertEqual([(p[0], p[5]) for p in merged], [("demo", 2)])
+                checkpoints = json.loads((Path(d) / "data/state/checkpoints.json").read_text(encoding="utf-8"))
+                self.assertEqual([cp["row_number"] for cp in checkpoints["demo"].values()], [2])
+
+                conn = FakeConn()
+                db = Db(conn=conn, mode="odbc", autocommit=False)
+                r = load_job_file(
+                    db, cfg, job, f, batch_id="b2", batch_size=1, pipeline_depth=depth, commit_every=1, resume=True
+                )
+                self.assertEqual((r.total_rows, r.ok_rows, r.bad_rows), (5, 3, 2))
+                self.assertEqual(conn.inserted, [(3, "1000", "c"), (4, None, None)])
+                self.assertIn("etl_load_checkpoint", conn.executed[-1][0])
+                self.assertEqual(json.loads((Path(d) / "data/state/checkpoints.json").read_text(encoding="utf-8")), {})
+
+
+    def test_resume_keeps_unique_keys_of_committed_rows(self):
+        for columnar in (False, True):
+            with tempfile.TemporaryDirectory() as d:
+                cfg, job, f = make_env(d, columnar=columnar)
+                job = replace(job, unique=(("id",),))
+                f.write_text("ID,金额,名称\n1,1,a\n2,2,b\n3,3,c\n1,4,d\n", encoding="utf-8-sig")
+                conn = FakeConn()
+                conn.fail_on_batch = 3
+                db = Db(conn=conn, mode="odbc", autocommit=False)
+                with self.assertRaises(DbError):
+                    load_job_file(db, cfg, job, f, batch_id="b1", batch_size=1, commit_every=1)
+
+                conn = FakeConn()
+                db = Db(conn=conn, mode="odbc", autocommit=False)
+                r = load_job_file(db, cfg, job, f, batch_id="b2", batch_size=1, commit_every=1, resume=True)
+                # id=1 was committed before the failure: the row repeating it is still a duplicate
+                self.assertEqual(conn.inserted, [(3, "3", "c")])
+                self.assertEqual((r.total_rows, r.ok_rows, r.bad_rows), (4, 3, 1))
+                badrows = r.badrows_csv.read_text(encoding="utf-8-sig").replace("\r", "")
+                self.assertIn("5,duplicate key (id=1),1,4,d", badrows)
+
+
+    def test_bisect_isolates_rows_rejected_by_db(self):
+        for columnar, depth in ((False, 0), (True, 0), (False, 2)):
+            with tempfile.TemporaryDirectory() as d:
+                cfg, job, f = make_env(d, columnar=columnar)
+                cfg = replace(cfg, odbc=replace(cfg.odbc, on_batch_error="bisect"))
+                conn = FakeConn()
+                conn.reject = lambda row: row[0] == 3
+                db = Db(conn=conn, mode="odbc", autocommit=False)
+                r = load_job_file(db, cfg, job, f, batch_id="b1", batch_size=4, pipeline_depth=depth)
+                self.assertEqual((r.total_rows, r.ok_rows, r.bad_rows), (5, 2, 3))
+                self.assertEqual(conn.inserted, [(1, "1.50", "alph"), (4, None, None)])
+                # [1,3,4] fails -> [1] ok, [3,4] fails -> [3] rejected, [4] ok
+                self.assertEqual(conn.rejected_calls, 3)
+                self.assertEqual([sql for sql, _ in conn.executed].count("ROLLBACK TO SAVEPOINT etl_batch"), 3)
+                badrows = r.badrows_csv.read_text(encoding="utf-8-sig")
+                self.assertIn("5,DB: [CODE:-6108] value too large,3,1000,c", badrows.replace("\r", ""))
+                self.assertEqual(conn.commits, 1)
+
+
+    def test_bisect_stops_when_the_whole_batch_is_refused(self):
+        for error, calls, raised in (
+            (RuntimeError("[CODE:-2106] invalid column name [AMT]"), 3, "both halves of a 3-row batch"),
+            (RuntimeError("08S01", "[08S01] [DM ODBC] Communication link failure"), 1, "Communication link"),
+        ):
+            with tempfile.TemporaryDirectory() as d:
+                cfg, job, f = make_env(d)
+                cfg = replace(cfg, odbc=replace(cfg.odbc, on_batch_error="bisect"))
+                conn = FakeConn()
+                conn.reject = lambda row: True
+                conn.reject_error = error
+                db = Db(conn=conn, mode="odbc", autocommit=False)
+                with self.assertRaisesRegex(Exception, raised):
+                    load_job_file(db, cfg, job, f, batch_id="b1", batch_size=4)
+                # whole batch, then (row-level error only) each half once; no row-by-row retries
+                self.assertEqual(conn.rejected_calls, calls)
+                self.assertEqual(conn.batches, [])
+                self.assertEqual(conn.commits, 0)
+
+    def test_unique_keys_route_duplicates_to_badrows(self):
+        for columnar in (False, True):
+            with tempfile.TemporaryDirectory() as d:
+                cfg, job, f = make_env(d, columnar=columnar)
+                job = replace(job, unique=(("name",),))
+                f.write_text(CSV_TEXT + "5,1,alphabet\n6,2,c\n", encoding="utf-8-sig")
+                conn = FakeConn()
+                db = Db(conn=conn, mode="odbc", autocommit=False)
+                r = load_job_file(db, cfg, job, f, batch_id="b1", batch_size=100)
+                self.assertEqual((r.total_rows, r.ok_rows, r.bad_rows), (7, 3, 4))
+                self.assertEqual(conn.inserted, [(1, "1.50", "alph"), (3, "1000", "c"), (4, None, None)])
+                badrows = r.badrows_csv.read_text(encoding="utf-8-sig").replace("\r", "")
+                self.assertIn("8,duplicate key (name=alph),5,1,alph", badrows)
+                self.assertIn("9,duplicate key (name=c),6,2,c", badrows)
+
+
+    def test_truncate_drops_and_rebuilds_secondary_indexes(self):
+        def dictionary(sql):
+            if "TAB_COLUMNS" in sql:
+                return [("ID",), ("AMT",), ("NAME",)]
+            return [("N", "IDX_DEMO_NAME", "NAME", 1, "ASC"), ("U", "UK_DEMO_ID", "ID", 1, "ASC")]
+
+        for fail in (False, True):
+            with tempfile.TemporaryDirectory() as d:
+                cfg, job, f = make_env(d, mode="truncate")
+                job = replace(job, rebuild_indexes=True)
+                cfg = replace(cfg, odbc=replace(cfg.odbc, index_parallel=4))
+                pending = Path(d) / "data/state/indexes/ods_demo.sql"
+                pending.parent.mkdir(parents=True)
+                pending.write_text("-- left by a killed run\nCREATE INDEX IDX_OLD ON ods_demo(AMT);\n", encoding="utf-8")
+                conn = FakeConn()
+                conn.query_rows = dictionary
+                conn.fail_on_batch = 1 if fail else None
+                db = Db(conn=conn, mode="odbc", autocommit=False)
+                if fail:
+                    with self.assertRaises(DbError):
+                        load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+                else:
+                    load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+                ddl = [sql for sql, _ in conn.executed if not sql.startswith("SELECT")]
+                self.assertEqual(
+                    ddl,
+                    [
+                        "CREATE INDEX IDX_OLD ON ods_demo(AMT)",
+                        "TRUNCATE TABLE ods_demo",
+                        "DROP INDEX IDX_DEMO_NAME",
+                        "CREATE INDEX IDX_DEMO_NAME ON ods_demo(NAME) PARALLEL 4",
+                    ],
+                )
+                self.assertFalse(pending.exists())
+
+    def test_failed_index_restore_keeps_pending_and_stops(self):
+        def dictionary(sql):
+            if "IDX_OLD" in sql:
+                raise RuntimeError("no space left in tablespace")
+            if "TAB_COLUMNS" in sql:
+                return [("ID",), ("AMT",), ("NAME",)]
+            return [("N", "IDX_DEMO_NAME", "NAME", 1, "ASC")]
+
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d, mode="truncate")
+            job = replace(job, rebuild_indexes=True)
+            pending = Path(d) / "data/state/indexes/ods_demo.sql"
+            pending.parent.mkdir(parents=True)
+            pending.write_text(
+                "-- left by a killed run\nCREATE INDEX IDX_DEMO_NAME ON ods_demo(NAME);\nCREATE INDEX IDX_OLD ON ods_demo(AMT);\n",
+                encoding="utf-8",
+            )
+            conn = FakeConn()
+            conn.query_rows = dictionary
+            db = Db(conn=conn, mode="odbc", autocommit=False)
+            with self.assertRaisesRegex(DbError, "could not be restored"):
+                load_job_file(db, cfg, job, f, batch_id="b1", batch_size=2)
+            self.assertEqual(
+                pending.read_text(encoding="utf-8"), "-- left by a killed run\nCREATE INDEX IDX_OLD ON ods_demo(AMT);\n"
+            )
+            self.assertFalse(any(sql.startswith(("DROP", "TRUNCATE")) for sql, _ in conn.executed))
+            self.assertEqual(conn.batches, [])
+
+
+class TestLoadOdsParallel(unittest.TestCase):
+    def setUp(self):
+        self.conns = []
+        original = db_mod.connect
+
+        def fake_connect(odbc):
+            conn = FakeConn()
+            self.conns.append(conn)
+            return Db(conn=conn, mode="odbc", autocommit=False)
+
+        db_mod.connect = fake_connect
+        self.addCleanup(setattr, db_mod, "connect", original)
+
+    def _config(self, d: str, names: list[str]) -> AppConfig:
+        cfg, job, _ = make_env(d)
+        jobs = []
+        for name in names:
+            jobs.append(
+                JobConfig(
+                    name=name,
+                    enabled=True,
+                    table=f"ods_{name}",
+                    mode="append",
+                    excel=ExcelConfig(pattern=f"{name}_*.csv"),
+                    columns=COLUMNS,
+                )
+            )
+            for month in ("01", "02"):
+                (cfg.paths.inbox / f"{name}_{month}.csv").write_text(CSV_TEXT, encoding="utf-8-sig")
+        return AppConfig(odbc=cfg.odbc, paths=cfg.paths, jobs=jobs)
+
+    def _batch_log(self):
+        return [params for conn in self.conns for sql, params in conn.executed if "etl_batch_log" in sql]
+
+    def test_parallel_jobs_match_job_order(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg = self._config(d, ["a", "b", "c"])
+            results = load_ods(cfg, batch_id="b1", batch_size=2, workers=2)
+        self.assertEqual([(r.job, r.file.name) for r in results], [(j, f"{j}_{m}.csv") for j in "abc" for m in ("01", "02")])
+        self.assertTrue(all((r.total_rows, r.ok_rows, r.bad_rows) == (5, 3, 2) for r in results))
+        self.assertLessEqual(len(self.conns), 2)
+        self.assertEqual(sum(len(c.inserted) for c in self.conns), 18)
+        self.assertEqual(sorted(p[1] for p in self._batch_log()), ["a", "a", "b", "b", "c", "c"])
+        self.assertTrue(all(c.commits >= 2 for c in self.conns))
+
+    def test_failed_job_does_not_stop_others(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg = self._config(d, ["a", "b", "c"])
+            (cfg.paths.inbox / "b_01.csv").write_text("X\n1\n", encoding="utf-8-sig")
+            with self.assertRaises(LoadError) as ctx:
+                load_ods(cfg, batch_id="b1", workers=3)
+        self.assertEqual(list(ctx.exception.failures), ["b"])
+        self.assertEqual([r.job for r in ctx.exception.results], ["a", "a", "c", "c"])
+        statuses = sorted((p[1], p[9]) for p in self._batch_log())
+        self.assertEqual(statuses, [("a", "SUCCESS")] * 2 + [("b", "FAILED")] + [("c", "SUCCESS")] * 2)
+
+
+class TestManifest(unittest.TestCase):
+    def _load_ods(self, cfg):
+        conn = FakeConn()
+        original = loader_mod.connect
+        loader_mod.connect = lambda odbc: Db(conn=conn, mode="odbc", autocommit=False)
+        try:
+            return load_ods(cfg, batch_id="b1", batch_size=2), conn
+        finally:
+            loader_mod.connect = original
+
+    def test_skips_files_already_loaded(self):
+        for duplicates in ("archive", "skip"):
+            with tempfile.TemporaryDirectory() as d:
+                cfg, _, f = make_env(d)
+                cfg = replace(cfg, manifest=ManifestConfig(enabled=True, duplicates=duplicates, meta_table=True))
+                results, conn = self._load_ods(cfg)
+                self.assertEqual([r.file.name for r in results], ["demo.csv"])
+                mirrored = [p for sql, p in conn.executed if "etl_file_manifest" in sql]
+                self.assertEqual([(p[0], p[2], p[3]) for p in mirrored], [("demo", "b1", "demo.csv")])
+
+                # the same export dropped again (plus a copy of it) and one new file
+                f.write_text(CSV_TEXT, encoding="utf-8-sig")
+                (cfg.paths.inbox / "demo_copy.csv").write_text(CSV_TEXT, encoding="utf-8-sig")
+                (cfg.paths.inbox / "demo_new.csv").write_text(CSV_TEXT + "9,1,z\n", encoding="utf-8-sig")
+                results, conn = self._load_ods(cfg)
+                self.assertEqual([r.file.name for r in results], ["demo_new.csv"])
+                self.assertEqual(len(conn.inserted), 4)
+                left = sorted(p.name for p in cfg.paths.inbox.iterdir())
+                self.assertEqual(left, [] if duplicates == "archive" else ["demo.csv", "demo_copy.csv"])
+
+    def test_file_is_hashed_once_for_manifest_and_checkpoint(self):
+        import etl.manifest as manifest_mod
+
+        with tempfile.TemporaryDirectory() as d:
+            cfg, _, f = make_env(d)
+            cfg = replace(cfg, manifest=ManifestConfig(enabled=True))
+            hashed = []
+            original = manifest_mod.file_sha256
+            digest = original(f)
+
+            def counting_sha256(path):
+                hashed.append(Path(path).name)
+                return original(path)
+
+            manifest_mod.file_sha256 = loader_mod.file_sha256 = counting_sha256
+            conn = FakeConn()
+            connect = loader_mod.connect
+            loader_mod.connect = lambda odbc: Db(conn=conn, mode="odbc", autocommit=False)
+            try:
+                load_ods(cfg, batch_id="b1", batch_size=2, commit_every=1)
+            finally:
+                manifest_mod.file_sha256 = loader_mod.file_sha256 = original
+                loader_mod.connect = connect
+            self.assertEqual(hashed, ["demo.csv"])
+            checkpoints = [p for sql, p in conn.executed if sql.startswith("MERGE INTO etl_load_checkpoint")]
+            self.assertTrue(checkpoints)
+            self.assertIn(digest, checkpoints[0])
+
+    def test_failed_load_is_not_recorded(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d)
+            cfg = replace(cfg, manifest=ManifestConfig(enabled=True))
+            f.write_text("X\n1\n", encoding="utf-8-sig")
+            with self.assertRaises(ExcelError):
+                self._load_ods(cfg)
+            f.write_text(CSV_TEXT, encoding="utf-8-sig")
+            results, _ = self._load_ods(cfg)
+            self.assertEqual([r.file.name for r in results], ["demo.csv"])
+
+
+class TestParseWorkers(unittest.TestCase):
+    def _run(self, parse_workers: int, broken: bool = False):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d)
+            f.unlink()
+            for i, extra in enumerate(["", "5,2.25,e\n,,\n,,\n", "6,y,f\n"]):
+                (cfg.paths.inbox / f"demo_{i}.csv").write_text(CSV_TEXT + extra, encoding="utf-8-sig")
+            if broken:
+                (cfg.paths.inbox / "demo_1.csv").write_text("X\n1\n", encoding="utf-8-sig")
+            conn = FakeConn()
+            original = loader_mod.connect
+            loader_mod.connect = lambda odbc: Db(conn=conn, mode="odbc", autocommit=False)
+            try:
+                results = load_ods(cfg, batch_id="b1", batch_size=2, parse_workers=parse_workers)
+            finally:
+                loader_mod.connect = original
+            stats = [(r.file.name, r.total_rows, r.ok_rows, r.bad_rows) for r in results]
+            badrows = [r.badrows_csv.read_text(encoding="utf-8-sig") if r.badrows_csv else None for r in results]
+        return stats, badrows, conn.inserted
+
+    def test_matches_serial(self):
+        expected = self._run(parse_workers=1)
+        self.assertEqual([s[1:] for s in expected[0]], [(5, 3, 2), (6, 4, 2), (6, 3, 3)])
+        self.assertEqual(self._run(parse_workers=2), expected)
+
+    def test_worker_sends_bounded_chunks(self):
+        with tempfile.TemporaryDirectory() as d:
+            cfg, job, f = make_env(d)
+            out: queue.Queue = queue.Queue()
+            loader_mod._parse_file(str(f), job.excel, job.columns, out, threading.Event(), chunk_rows=2)
+            chunks = [out.get_nowait() for _ in range(out.qsize())]
+            self.assertIsNone(chunks[-1])
+            self.assertEqual([c.row_numbers for c in chunks[:-1]], [[2, 3], [5, 6], [7]])
+            self.assertEqual(list(chunks[0].errors), [1])
+
+            # the loader gave up: a worker blocked on a full queue returns
+            out = queue.Queue(maxsize=1)
+            stop = threading.Event()
+            stop.set()
+            loader_mod._parse_file(str(f), job.excel, job.columns, out, stop, chunk_rows=2)
+            self.assertEqual(out.get_nowait().row_numbers, [2, 3])
+            self.assertTrue(out.empty())
+
+    def test_parse_error_propagates(self):
+        for parse_workers in (1, 2):
+            with self.assertRaises(ExcelError):
+                self._run(parse_workers=parse_workers, broken=True)
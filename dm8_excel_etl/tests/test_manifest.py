@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import etl.manifest as manifest_mod
+from etl.manifest import FileManifest, file_sha256
+
+
+class TestFileManifest(unittest.TestCase):
+    def test_rehashes_only_when_size_or_mtime_changes(self):
+        with tempfile.TemporaryDirectory() as d:
+            f = Path(d) / "demo.csv"
+            f.write_text("ID\n1\n", encoding="utf-8")
+            reads = []
+            original = manifest_mod.file_sha256
+            manifest_mod.file_sha256 = lambda p: reads.append(p) or original(p)
+            self.addCleanup(setattr, manifest_mod, "file_sha256", original)
+
+            manifest = FileManifest(Path(d) / "state" / "manifest.sqlite")
+            first = manifest.digest(f)
+            self.assertEqual(manifest.digest(f), first)
+            self.assertEqual(len(reads), 1)
+            self.assertEqual(first, (file_sha256(f), f.stat().st_size))
+
+            f.write_text("ID\n2\n", encoding="utf-8")
+            st = f.stat()
+            os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            self.assertNotEqual(manifest.digest(f)[0], first[0])
+            self.assertEqual(len(reads), 2)
+            manifest.close()
+
+    def test_records_loads_per_job(self):
+        with tempfile.TemporaryDirectory() as d:
+            f = Path(d) / "demo.csv"
+            f.write_text("ID\n1\n", encoding="utf-8")
+            path = Path(d) / "manifest.sqlite"
+            manifest = FileManifest(path)
+            digest, size = manifest.digest(f)
+            self.assertIsNone(manifest.loaded("demo", digest))
+            manifest.record("demo", digest, "b1", f, size)
+            manifest.close()
+
+            manifest = FileManifest(path)
+            loaded = manifest.loaded("demo", digest)
+            self.assertEqual((loaded.batch_id, loaded.source_file), ("b1", "demo.csv"))
+            self.assertIsNone(manifest.loaded("other", digest))
+            manifest.close()
@@ -0,0 +1,316 @@
+import datetime as dt
+import logging
+import re
+import threading
+import unittest
+from contextlib import contextmanager
+from pathlib import Path
+
+from etl.db import Db, DbError
+from etl.sql_runner import (
+    SqlStatement,
+    plan_incremental,
+    read_sql_statements,
+    run_sql_parallel,
+    run_sql_text,
+    render_watermarks,
+    statement_dependencies,
+    statement_tables,
+    watermark_sources,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class _Cursor:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def execute(self, sql, params=None):
+        if self.pool.fail_on and self.pool.fail_on in sql:
+            raise RuntimeError("boom")
+        with self.pool.lock:
+            self.pool.executed.append(sql)
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, pool):
+        self.pool = pool
+        self.cursors = 0
+        self.log = []
+
+    def cursor(self):
+        self.cursors += 1
+        return _Cursor(self.pool)
+
+    def commit(self):
+        self.log.append(("commit", len(self.pool.executed)))
+
+    def rollback(self):
+        self.log.append(("rollback", len(self.pool.executed)))
+
+
+class _Pool:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.executed = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        yield Db(conn=_Conn(self), mode="odbc", autocommit=False)
+
+
+def _stmts(*sql):
+    return [SqlStatement(path=Path("x.sql"), number=n, sql=s) for n, s in enumerate(sql, start=1)]
+
+
+class TestStatementTables(unittest.TestCase):
+    def test_truncate_insert(self):
+        self.assertEqual(statement_tables("TRUNCATE TABLE ads_a"), (set(), {"ads_a"}))
+        reads, writes = statement_tables(
+            "INSERT INTO etl.ads_a (x) SELECT p.x FROM ods_p p, ods_q q LEFT JOIN mdm_project m ON m.c = p.c "
+            "WHERE p.s = 'FROM ods_not_a_table'"
+        )
+        self.assertEqual(writes, {"ads_a"})
+        self.assertEqual(reads, {"ods_p", "mdm_project", "ods_q"})
+
+    def test_cte_and_merge(self):
+        reads, writes = statement_tables(
+            "INSERT INTO ads_a WITH agg (k, v) AS (SELECT k, v FROM ods_p) SELECT k, v FROM agg"
+        )
+        self.assertEqual((reads, writes), ({"ods_p"}, {"ads_a"}))
+        reads, writes = statement_tables(
+            "MERGE INTO mdm_item t USING (SELECT c FROM ods_po UNION ALL SELECT c FROM ods_io) s ON (t.c = s.c) "
+            "WHEN NOT MATCHED THEN INSERT (c) VALUES (s.c)"
+        )
+        self.assertEqual((reads, writes), ({"ods_po", "ods_io"}, {"mdm_item"}))
+
+    def test_unknown_statement_is_barrier(self):
+        self.assertIsNone(statement_tables("BEGIN refresh_all(); END"))
+        self.assertEqual(statement_tables("COMMIT"), (set(), set()))
+
+
+class TestDependencies(unittest.TestCase):
+    def test_graph(self):
+        deps = statement_dependencies(
+            [
+                "MERGE INTO mdm_project t USING (SELECT c FROM ods_p) s ON (t.c = s.c) "
+                "WHEN MATCHED THEN UPDATE SET t.n = s.n",
+                "TRUNCATE TABLE ads_a",
+                "INSERT INTO ads_a SELECT * FROM ods_p p JOIN mdm_project m ON m.c = p.c",
+                "TRUNCATE TABLE ads_b",
+                "INSERT INTO ads_b SELECT * FROM ods_q",
+                "TRUNCATE TABLE ods_p",
+                "GRANT SELECT ON ads_a TO bi",
+                "TRUNCATE TABLE ads_c",
+            ]
+        )
+        self.assertEqual(deps[1], set())
+        self.assertEqual(deps[2], {0, 1})
+        self.assertEqual(deps[4], {3})
+        # writing a table that earlier statements read
+        self.assertEqual(deps[5], {0, 2})
+        self.assertEqual(deps[6], {0, 1, 2, 3, 4, 5})
+        self.assertEqual(deps[7], {6})
+
+    def test_ads_script_pairs(self):
+        stmts = read_sql_statements([ROOT / "sql" / "ads" / "01_refresh_ads.sql"])
+        deps = statement_dependencies([s.sql for s in stmts])
+        for j, s in enumerate(stmts):
+            if s.sql.upper().startswith("INSERT"):
+                self.assertEqual(deps[j], {j - 1}, s.sql[:60])
+
+
+class TestRunParallel(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("test_sql_runner")
+        self.logger.addHandler(logging.NullHandler())
+        self.logger.propagate = False
+
+    def test_order_respects_dependencies(self):
+        pool = _Pool()
+        stmts = _stmts(
+            "TRUNCATE TABLE ads_a",
+            "INSERT INTO ads_a SELECT * FROM ods_p",
+            "TRUNCATE TABLE ads_b",
+            "INSERT INTO ads_b SELECT * FROM ads_a",
+        )
+        results = run_sql_parallel(pool, stmts, workers=3, logger=self.logger)
+        self.assertEqual([r.status for r in results], ["SUCCESS"] * 4)
+        order = {sql: i for i, sql in enumerate(pool.executed)}
+        self.assertLess(order[stmts[0].sql], order[stmts[1].sql])
+        self.assertLess(order[stmts[1].sql], order[stmts[3].sql])
+        self.assertLess(order[stmts[2].sql], order[stmts[3].sql])
+
+    def test_failure_skips_dependents(self):
+        stmts = _stmts(
+            "INSERT INTO ads_a SELECT * FROM ods_bad",
+            "INSERT INTO ads_b SELECT * FROM ads_a",
+            "INSERT INTO ads_c SELECT * FROM ods_p",
+        )
+        results = run_sql_parallel(_Pool(fail_on="ods_bad"), stmts, workers=1, logger=self.logger)
+        self.assertEqual([r.status for r in results], ["FAILED", "SKIPPED", "SKIPPED"])
+        self.assertIn("boom", results[0].error)
+
+        results = run_sql_parallel(
+            _Pool(fail_on="ods_bad"), stmts, workers=1, logger=self.logger, continue_on_error=True
+        )
+        self.assertEqual([r.status for r in results], ["FAILED", "SKIPPED", "SUCCESS"])
+
+
+SCRIPT = """
+TRUNCATE TABLE ads_a;
+INSERT INTO ads_a SELECT * FROM ods_p;
+-- @commit
+TRUNCATE TABLE ads_b;
+INSERT INTO ads_b SELECT * FROM ods_q;
+INSERT INTO ads_c SELECT * FROM ods_q;
+COMMIT;
+"""
+
+
+class TestRunTransactional(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("test_sql_runner.transactional")
+
+    def _run(self, commit, fail_on=None, truncate_as_delete=False):
+        pool = _Pool(fail_on=fail_on)
+        conn = _Conn(pool)
+        db = Db(conn=conn, mode="odbc", autocommit=False)
+        count = run_sql_text(db, SCRIPT, commit=commit, truncate_as_delete=truncate_as_delete, logger=self.logger)
+        return count, conn, pool
+
+    def test_statement_mode_unchanged(self):
+        count, conn, pool = self._run("statement")
+        self.assertEqual(count, 6)
+        self.assertEqual(len(conn.log), 6)
+        self.assertIn("TRUNCATE TABLE ads_a", pool.executed)
+
+    def test_file_and_section(self):
+        count, conn, pool = self._run("file")
+        self.assertEqual(count, 6)
+        self.assertEqual(conn.cursors, 1)
+        self.assertEqual(conn.log, [("commit", 5)])
+        self.assertEqual(pool.executed[0], "TRUNCATE TABLE ads_a")
+
+        # opt-in: TRUNCATE becomes a DELETE that rolls back with its unit
+        _, _, pool = self._run("file", truncate_as_delete=True)
+        self.assertEqual(pool.executed[0], "DELETE FROM ads_a")
+
+        _, conn, _ = self._run("section")
+        self.assertEqual(conn.log, [("commit", 2), ("commit", 5)])
+
+        _, conn, _ = self._run(2, truncate_as_delete=True)
+        self.assertEqual(conn.log, [("commit", 2), ("commit", 4), ("commit", 5)])
+        # a TRUNCATE commits implicitly and restarts the count
+        _, conn, _ = self._run(2)
+        self.assertEqual(conn.log, [("commit", 5)])
+
+    def test_failure_rolls_back_unit(self):
+        with self.assertRaisesRegex(DbError, "statement 4, rolled back 1 uncommitted"):
+            self._run("section", fail_on="ads_b SELECT", truncate_as_delete=True)
+        pool = _Pool(fail_on="ads_b SELECT")
+        conn = _Conn(pool)
+        with self.assertRaises(DbError):
+            run_sql_text(Db(conn=conn, mode="odbc", autocommit=False), SCRIPT, commit="section")
+        self.assertEqual(conn.log, [("commit", 2), ("rollback", 3)])
+
+        with self.assertRaisesRegex(DbError, "autocommit"):
+            run_sql_text(Db(conn=_Conn(_Pool()), mode="odbc", autocommit=True), SCRIPT, commit="file")
+
+    def test_only_selected_statements(self):
+        pool = _Pool()
+        conn = _Conn(pool)
+        count = run_sql_text(Db(conn=conn, mode="odbc", autocommit=False), SCRIPT, commit="section", only={3, 4})
+        self.assertEqual(count, 2)
+        self.assertEqual(pool.executed, ["TRUNCATE TABLE ads_b", "INSERT INTO ads_b SELECT * FROM ods_q"])
+        self.assertEqual(conn.log, [("commit", 2)])
+
+    def test_ddl_inside_a_unit_is_reported(self):
+        with self.assertLogs(self.logger, "WARNING") as logs:
+            count, _, pool = self._run("file")
+        # TRUNCATE ads_a opens the unit; TRUNCATE ads_b commits INSERT INTO ads_a implicitly
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("statement 3 is DDL and commits the 1 statement(s) before it", logs.output[0])
+        self.assertIn("TRUNCATE TABLE ads_b", pool.executed)
+
+        script = "INSERT INTO ads_a SELECT * FROM ods_p;\nCREATE INDEX ix_a ON ads_a (k);\n"
+        with self.assertLogs(self.logger, "WARNING") as logs:
+            run_sql_text(Db(conn=_Conn(_Pool()), mode="odbc", autocommit=False), script, commit="file", logger=self.logger)
+        self.assertIn("statement 2 is DDL", logs.output[0])
+
+    def test_markers_come_from_the_parsed_statements(self):
+        script = (
+            "INSERT INTO ads_a SELECT '-- @commit' FROM ods_p;\n"
+            "/* -- @commit */ INSERT INTO ads_b SELECT * FROM ods_q; -- @commit\n"
+            "INSERT INTO ads_c SELECT * FROM ods_q;\n"
+        )
+        pool = _Pool()
+        conn = _Conn(pool)
+        run_sql_text(Db(conn=conn, mode="odbc", autocommit=False), script, commit="section", only={2, 3})
+        self.assertEqual(pool.executed, ["INSERT INTO ads_b SELECT * FROM ods_q", "INSERT INTO ads_c SELECT * FROM ods_q"])
+        self.assertEqual(conn.log, [("commit", 1), ("commit", 2)])
+
+        inside = "INSERT INTO ads_a\n-- @commit\nSELECT * FROM ods_p;\n"
+        with self.assertRaisesRegex(DbError, "line 2 is inside a statement"):
+            run_sql_text(Db(conn=_Conn(_Pool()), mode="odbc", autocommit=False), inside, commit="section")
+
+
+class TestPlanIncremental(unittest.TestCase):
+    def test_ads_script(self):
+        ads = read_sql_statements([ROOT / "sql" / "ads" / "01_refresh_ads.sql"])
+        mdm = read_sql_statements([ROOT / "sql" / "mdm" / "01_build_mdm.sql"])
+        run, skipped = plan_incremental(ads, {"ETL.ODS_STOCK_ONHAND"}, upstream=mdm)
+
+        targets = {w for s in run for w in (statement_tables(s.sql) or (set(), set()))[1]}
+        # direct readers, and readers of mdm_item / mdm_project (built from ods_stock_onhand)
+        self.assertIn("ads_stock_overview", targets)
+        self.assertIn("ads_item_overview_kpi", targets)
+        self.assertIn("ads_proj_budget_kpi", targets)
+        self.assertNotIn("ads_io_daily_trend", targets)
+        self.assertEqual(skipped["ads_io_daily_trend"], {"ods_stock_io_flow"})
+        self.assertEqual(skipped["ads_dept_budget_kpi"], {"ods_proj_budget_exec_dtl"})
+        # TRUNCATE and INSERT of a table stay together; COMMIT always runs
+        self.assertEqual(sum(1 for s in run if "ads_stock_overview" in s.sql), 2)
+        self.assertEqual(run[-1].sql, "COMMIT")
+
+        run, skipped = plan_incremental(ads, set(), upstream=mdm)
+        self.assertEqual([s.sql for s in run], ["COMMIT"])
+
+
+class TestWatermarks(unittest.TestCase):
+    def test_render(self):
+        sql = "SELECT c FROM ods_a WHERE etl_time > {{watermark:ods_a}} UNION ALL SELECT c FROM ods_b WHERE etl_time > {{ watermark: ODS_B }}"
+        self.assertEqual(watermark_sources(sql), ["ods_a", "ods_b"])
+        rendered = render_watermarks(sql, {"ods_a": dt.datetime(2026, 10, 17, 23, 5, 1, 250000)})
+        self.assertIn("etl_time > TIMESTAMP '2026-10-17 23:05:01.250000'", rendered)
+        self.assertIn("etl_time > TIMESTAMP '1900-01-01 00:00:00.000000'", rendered)
+        # the comment form keeps a hand-run file valid; the default literal is replaced with it
+        sql = "WHERE etl_time > /*{{watermark:ods_a}}*/ TIMESTAMP '1900-01-01 00:00:00' AND x = 1"
+        self.assertEqual(watermark_sources(sql), ["ods_a"])
+        self.assertEqual(
+            render_watermarks(sql, {"ods_a": dt.datetime(2026, 10, 17)}),
+            "WHERE etl_time > TIMESTAMP '2026-10-17 00:00:00.000000' AND x = 1",
+        )
+
+    def test_mdm_script(self):
+        path = ROOT / "sql" / "mdm" / "01_build_mdm.sql"
+        raw = path.read_text(encoding="utf-8")
+        # every placeholder sits in a comment before a default literal, so disql can run the file
+        commented = re.findall(r"/\*\{\{watermark:ods_\w+\}\}\*/ TIMESTAMP '1900-01-01 00:00:00'", raw)
+        self.assertEqual(len(commented), raw.count("{{watermark:ods_"))
+        self.assertEqual(
+            sorted(watermark_sources(raw)),
+            ["ods_po_exec", "ods_proj_budget_exec_dtl", "ods_stock_io_flow", "ods_stock_onhand"],
+        )
+        for s in read_sql_statements([path], watermarks={path: {"ods_po_exec": dt.datetime(2026, 1, 1)}}):
+            self.assertNotIn("{{", s.sql)
+            self.assertEqual("etl_time > TIMESTAMP" in s.sql, s.sql != "COMMIT")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from etl.state import read_json_state, update_json_state
+
+
+class TestJsonState(unittest.TestCase):
+    def test_corrupt_or_missing_file_reads_empty(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "state" / "x.json"
+            self.assertEqual(read_json_state(path), {})
+            path.parent.mkdir()
+            path.write_text("[1, 2", encoding="utf-8")
+            self.assertEqual(read_json_state(path), {})
+            path.write_text("[1, 2]", encoding="utf-8")
+            self.assertEqual(read_json_state(path), {})
+
+    def test_update_writes_only_changes(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "state" / "x.json"
+            with update_json_state(path) as raw:
+                raw["demo"] = {"n": 1}
+            self.assertEqual(read_json_state(path), {"demo": {"n": 1}})
+            self.assertFalse(path.with_suffix(".json.tmp").exists())
+
+            path.write_text('{"demo": {"n": 1}}', encoding="utf-8")
+            with update_json_state(path) as raw:
+                raw["demo"]["n"] = 1
+            # unchanged: the hand-written layout is left as it was
+            self.assertEqual(path.read_text(encoding="utf-8"), '{"demo": {"n": 1}}')
+
+
+if __name__ == "__main__":
+    unittest.main()
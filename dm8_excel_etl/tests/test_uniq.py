@@ -0,0 +1,50 @@
+import unittest
+
+from etl.uniq import BloomKeySet, UniqueCheck
+
+
+class TestUniqueCheck(unittest.TestCase):
+    def test_single_key(self):
+        check = UniqueCheck([("proj_code",)], ["proj_code", "name"])
+        self.assertIsNone(check.check(("P001", "a")))
+        self.assertIsNone(check.check((None, "b")))
+        self.assertIsNone(check.check((None, "c")))
+        self.assertEqual(check.check(("P001", "d")), "duplicate key (proj_code=P001)")
+
+    def test_exact_check_compares_values_not_hashes(self):
+        self.assertEqual(hash((-1,)), hash((-2,)))
+        check = UniqueCheck([("a", "b")], ["a", "b"])
+        self.assertIsNone(check.check((-1, 0)))
+        self.assertIsNone(check.check((-2, 0)))
+        self.assertEqual(check.check((-2, 0)), "duplicate key (a=-2, b=0)")
+        single = UniqueCheck([("a",)], ["a"])
+        self.assertIsNone(single.check((-1,)))
+        self.assertIsNone(single.check((-2,)))
+
+    def test_rejected_row_records_none_of_its_keys(self):
+        check = UniqueCheck([("doc_no",), ("order_no", "line_no")], ["doc_no", "order_no", "line_no"])
+        self.assertIsNone(check.check(("D1", "O1", 1)))
+        self.assertEqual(check.check(("D2", "O1", 1)), "duplicate key (order_no=O1, line_no=1)")
+        # D2 was not recorded by the rejected row
+        self.assertIsNone(check.check(("D2", "O1", 2)))
+        self.assertIsNone(check.check(("D3", None, None)))
+        self.assertIsNone(check.check(("D4", None, None)))
+
+    def test_bloom_filter(self):
+        bloom = BloomKeySet(10_000)
+        self.assertEqual(bloom.blocks, 10_000 * 48 // 512 + 1)
+        added = [bloom.add(i) for i in range(10_000)]
+        self.assertEqual(sum(added), 10_000)
+        self.assertTrue(all(i in bloom for i in range(10_000)))
+        self.assertFalse(bloom.add(42))
+        self.assertEqual(sum(i in bloom for i in range(10_000, 20_000)), 0)
+
+        check = UniqueCheck([("proj_code",)], ["proj_code"], bloom_capacity=100)
+        self.assertIsNone(check.check(("P001",)))
+        self.assertIn("may be a false positive", check.check(("P001",)))
+
+    def test_exact_keys_ignore_bloom(self):
+        check = UniqueCheck([("doc_no",), ("order_no",)], ["doc_no", "order_no"], 100, exact_keys=[("order_no",)])
+        self.assertIsNone(check.check(("D1", "O1")))
+        self.assertIn("Bloom filter", check.check(("D1", "O2")))
+        self.assertEqual(check.check(("D2", "O1")), "duplicate key (order_no=O1)")